@@ -1,3 +1,22 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import OutboxMessage
+from .outbox import requeue
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'created_at', 'available_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'body')
+    readonly_fields = ('subject', 'body', 'from_email', 'to', 'reply_to', 'status', 'attempts',
+                       'available_at', 'locked_by', 'locked_at', 'last_error', 'created_at', 'sent_at')
+    actions = ['requeue_messages']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Re-queue selected unsent messages')
+    def requeue_messages(self, request, queryset):
+        count = requeue(queryset)
+        self.message_user(request, f'{count} message(s) re-queued.')
@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from contact.outbox import process_batch, release_stale_claims
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbox emails, retrying failures with exponential backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages sent over one SMTP connection')
+        parser.add_argument('--max-attempts', type=int, default=settings.CONTACT_OUTBOX_MAX_ATTEMPTS,
+                            help='Failures before a message is moved to the dead-letter state')
+        parser.add_argument('--once', action='store_true', help='Drain the due messages and exit instead of polling')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the outbox is empty')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['max_attempts'] < 1:
+            raise CommandError('--batch-size and --max-attempts must be positive integers.')
+        try:
+            while True:
+                released = release_stale_claims()
+                if released:
+                    self.stdout.write(self.style.WARNING(f'Released {released} stale claims.'))
+                result = process_batch(options['batch_size'], options['max_attempts'])
+                if result:
+                    self.stdout.write(
+                        f'Sent {result.sent}, retrying {result.retried}, dead-lettered {result.dead}.'
+                    )
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping outbox worker.')
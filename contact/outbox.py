@@ -0,0 +1,169 @@
+"""
+Database-backed outbox for outgoing email.
+
+Request handlers call ``enqueue`` and return straight away; the
+``process_outbox`` management command sends queued messages in batches,
+one SMTP connection per batch.
+
+A message that fails to send is rescheduled with exponential backoff
+(``RETRY_BASE_SECONDS * 2 ** (attempts - 1)``, capped and jittered). After
+``CONTACT_OUTBOX_MAX_ATTEMPTS`` failures it is parked in the dead-letter
+state, where it stays visible in the admin and can be re-queued there.
+
+Workers claim a batch by flipping it to ``sending`` inside a transaction
+(``SELECT ... FOR UPDATE SKIP LOCKED`` where the database supports it). The
+flip is a conditional ``UPDATE ... WHERE status = 'pending'`` that stamps a
+per-claim token, and the worker sends only the rows carrying its token, so
+on SQLite too several workers never pick the same message. Claims older than
+``LOCK_TIMEOUT`` belong to a crashed worker and are released again.
+"""
+
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60 * 6
+RETRY_JITTER = 0.1
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+
+@dataclass
+class OutboxResult:
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+
+    def __bool__(self):
+        return bool(self.sent or self.retried or self.dead)
+
+
+def enqueue(subject, body, to, reply_to=(), from_email=None):
+    """Queue an email for the worker and return the ``OutboxMessage``."""
+    return OutboxMessage.objects.create(
+        # Header injection is rejected at send time, which would only dead-letter the message.
+        subject=' '.join(subject.splitlines()),
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        reply_to=list(reply_to),
+    )
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next try after ``attempts`` failures."""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(1 - RETRY_JITTER, 1 + RETRY_JITTER)
+
+
+def release_stale_claims(now=None):
+    """Return messages claimed by a worker that died mid-batch to the queue."""
+    now = now or timezone.now()
+    return OutboxMessage.objects.filter(
+        status=OutboxMessage.Status.SENDING, locked_at__lt=now - LOCK_TIMEOUT
+    ).update(status=OutboxMessage.Status.PENDING, locked_by='', locked_at=None)
+
+
+def claim_batch(batch_size, now=None):
+    """
+    Mark up to ``batch_size`` due messages as sending and return them. Only
+    messages this call actually flipped are returned: without row locks
+    another worker may have claimed some of the candidates first.
+    """
+    now = now or timezone.now()
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        due = OutboxMessage.objects.filter(
+            status=OutboxMessage.Status.PENDING, available_at__lte=now
+        ).order_by('available_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('pk', flat=True)[:batch_size])
+        OutboxMessage.objects.filter(pk__in=ids, status=OutboxMessage.Status.PENDING).update(
+            status=OutboxMessage.Status.SENDING, locked_by=token, locked_at=now
+        )
+    return list(OutboxMessage.objects.filter(
+        pk__in=ids, status=OutboxMessage.Status.SENDING, locked_by=token,
+    ).order_by('available_at', 'id'))
+
+
+def _as_email(message, email_connection):
+    return EmailMessage(
+        subject=message.subject,
+        body=message.body,
+        from_email=message.from_email,
+        to=message.to,
+        reply_to=message.reply_to or None,
+        connection=email_connection,
+    )
+
+
+def process_batch(batch_size=50, max_attempts=None, connection_factory=get_connection):
+    """Send one batch of due messages and record each outcome."""
+    max_attempts = max_attempts or settings.CONTACT_OUTBOX_MAX_ATTEMPTS
+    batch = claim_batch(batch_size)
+    result = OutboxResult()
+    if not batch:
+        return result
+
+    def fail(message, exc):
+        message.attempts += 1
+        message.last_error = f'{type(exc).__name__}: {exc}'[:2000]
+        message.locked_by = ''
+        message.locked_at = None
+        if message.attempts >= max_attempts:
+            message.status = OutboxMessage.Status.DEAD
+            result.dead += 1
+        else:
+            message.status = OutboxMessage.Status.PENDING
+            message.available_at = timezone.now() + timedelta(seconds=retry_delay(message.attempts))
+            result.retried += 1
+
+    try:
+        email_connection = connection_factory()
+        email_connection.open()
+    except Exception as exc:
+        # The server is unreachable: every message in the batch counts as a failed attempt.
+        for message in batch:
+            fail(message, exc)
+    else:
+        try:
+            for message in batch:
+                try:
+                    email_connection.send_messages([_as_email(message, email_connection)])
+                except Exception as exc:
+                    fail(message, exc)
+                else:
+                    message.attempts += 1
+                    message.status = OutboxMessage.Status.SENT
+                    message.sent_at = timezone.now()
+                    message.locked_by = ''
+                    message.locked_at = None
+                    message.last_error = ''
+                    result.sent += 1
+        finally:
+            email_connection.close()
+
+    OutboxMessage.objects.bulk_update(
+        batch, ['status', 'attempts', 'available_at', 'locked_by', 'locked_at', 'last_error', 'sent_at']
+    )
+    return result
+
+
+def requeue(queryset):
+    """Give dead-letter (or any unsent) messages a fresh set of attempts."""
+    return queryset.exclude(status=OutboxMessage.Status.SENT).update(
+        status=OutboxMessage.Status.PENDING,
+        attempts=0,
+        available_at=timezone.now(),
+        locked_by='',
+        locked_at=None,
+    )
@@ -1,3 +1,91 @@
-from django.test import TestCase
+from datetime import timedelta
+from smtplib import SMTPException
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail import get_connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import OutboxMessage
+from .outbox import LOCK_TIMEOUT, claim_batch, enqueue, process_batch, release_stale_claims, requeue
+
+
+class FailingConnection:
+    """Email connection whose server rejects every message"""
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise SMTPException('451 try again later')
+
+
+def make_due(message):
+    OutboxMessage.objects.filter(pk=message.pk).update(available_at=timezone.now())
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.message = enqueue('Hello\nBcc: victim@example.com', 'Body', ['office@example.com'], ['member@example.com'])
+
+    def test_sends_and_records(self):
+        result = process_batch(connection_factory=get_connection)
+        self.assertEqual(result.sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Hello Bcc: victim@example.com')
+        self.message.refresh_from_db()
+        self.assertEqual(self.message.status, OutboxMessage.Status.SENT)
+        self.assertEqual((self.message.locked_by, self.message.locked_at), ('', None))
+
+    def test_claimed_messages_are_not_claimed_again(self):
+        self.assertEqual([message.pk for message in claim_batch(10)], [self.message.pk])
+        self.assertEqual(claim_batch(10), [])
+        self.assertEqual(process_batch().sent, 0)
+
+    def test_stale_claims_are_released(self):
+        claim_batch(10)
+        self.assertEqual(release_stale_claims(), 0)
+        self.assertEqual(release_stale_claims(now=timezone.now() + LOCK_TIMEOUT + timedelta(seconds=1)), 1)
+        self.message.refresh_from_db()
+        self.assertEqual(self.message.status, OutboxMessage.Status.PENDING)
+
+    @override_settings(CONTACT_OUTBOX_MAX_ATTEMPTS=4)
+    def test_failures_back_off_then_dead_letter(self):
+        delays = []
+        for attempt in range(1, 4):
+            started = timezone.now()
+            result = process_batch(connection_factory=FailingConnection)
+            self.assertEqual(result.retried, 1)
+            self.message.refresh_from_db()
+            self.assertEqual(self.message.status, OutboxMessage.Status.PENDING)
+            self.assertEqual(self.message.attempts, attempt)
+            self.assertIn('451 try again later', self.message.last_error)
+            delays.append(self.message.available_at - started)
+            # Not due again until the backoff has passed
+            self.assertEqual(claim_batch(10), [])
+            make_due(self.message)
+        self.assertEqual(delays, sorted(delays))
+        self.assertGreater(delays[-1], delays[0] * 3)
+
+        result = process_batch(connection_factory=FailingConnection)
+        self.assertEqual(result.dead, 1)
+        self.message.refresh_from_db()
+        self.assertEqual(self.message.status, OutboxMessage.Status.DEAD)
+        self.assertEqual(self.message.attempts, 4)
+
+        self.assertEqual(requeue(OutboxMessage.objects.all()), 1)
+        self.assertEqual(process_batch(connection_factory=get_connection).sent, 1)
+
+    def test_unreachable_server_fails_whole_batch(self):
+        enqueue('Second', 'Body', ['office@example.com'])
+
+        def unreachable():
+            raise ConnectionRefusedError('connection refused')
+
+        result = process_batch(connection_factory=unreachable)
+        self.assertEqual(result.retried, 2)
+        self.assertFalse(OutboxMessage.objects.exclude(status=OutboxMessage.Status.PENDING).exists())
@@ -1,8 +1,9 @@
 from django.http import JsonResponse
 from django.shortcuts import render
-from django.core.mail import send_mail
-from django.conf import settings
 from .forms import ContactForm
+from .outbox import enqueue
+
+CONTACT_RECIPIENTS = ['admin@bhanjyang.coop.np']
 
 def contact_view(request):
     """
@@ -19,7 +20,7 @@ def contact_view(request):
         form = ContactForm(request.POST)
 
         if form.is_valid():
-            # Form is valid, proceed to send email
+            # Form is valid, proceed to queue the email
             name = form.cleaned_data['name']
             from_email = form.cleaned_data['email']
             phone = form.cleaned_data.get('phone', 'N/A') # Safely get optional phone
@@ -39,24 +40,17 @@ def contact_view(request):
             {message_body}
             """
             
-            try:
-                # Send the email using settings from settings.py
-                send_mail(
-                    subject=full_subject,
-                    message=full_message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=['admin@bhanjyang.coop.np'],
-                    fail_silently=False,
-                )
-                return JsonResponse({
-                    'success': True,
-                    'message': 'Thank you! Your message has been sent successfully.'
-                })
-            except Exception as e:
-                return JsonResponse({
-                    'success': False,
-                    'message': f'An error occurred: {e}'
-                }, status=500)
+            # Queue the email for the process_outbox worker instead of blocking on SMTP here
+            enqueue(
+                subject=full_subject,
+                body=full_message,
+                to=CONTACT_RECIPIENTS,
+                reply_to=[from_email],
+            )
+            return JsonResponse({
+                'success': True,
+                'message': 'Thank you! Your message has been sent successfully.'
+            })
         else:
             # Form is invalid, return errors
             return JsonResponse({
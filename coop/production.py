@@ -52,6 +52,46 @@ except:
         }
     }
 
+# Cache Configuration
+# CACHE_BACKEND selects a backend shared by every gunicorn worker:
+#   file      - a directory on local disk (default; fine for a single server)
+#   memcached - CACHE_LOCATION like 127.0.0.1:11211
+#   redis     - CACHE_LOCATION like redis://127.0.0.1:6379/1
+# Without CACHE_LOCATION each backend uses its local default below.
+CACHE_BACKENDS = {
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+}
+CACHE_LOCATIONS = {
+    'file': str(BASE_DIR / 'cache'),
+    'memcached': '127.0.0.1:11211',
+    'redis': 'redis://127.0.0.1:6379/1',
+    'locmem': '',
+}
+CACHE_BACKEND = config('CACHE_BACKEND', default='file')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': config('CACHE_LOCATION', default=CACHE_LOCATIONS[CACHE_BACKEND]),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'KEY_PREFIX': 'bhanjyang',
+        'OPTIONS': {'MAX_ENTRIES': 10000} if CACHE_BACKEND in ('file', 'locmem') else {},
+    }
+}
+
+# Templates: parse each template once per worker (cached loader, which
+# replaces APP_DIRS) and compile them all at startup (coop/wsgi.py).
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATE_WARMUP = config('TEMPLATE_WARMUP', default=True, cast=bool)
+
 # Static Files Configuration
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
-from decouple import config # <-- Import config
+from decouple import Csv, config # <-- Import config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,11 +46,18 @@ INSTALLED_APPS = [
     'team',
     'downloads',
     'services',
+    'jobs',
+    'images',
+    'counters',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files in production
+    # Above the page cache, so pages served from it are counted too
+    'counters.middleware.CounterMiddleware',
+    # Above the session/CSRF middleware so it sees the cookies and Vary they add
+    'main.middleware.PageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -71,11 +78,32 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'main.context_processors.fragment_cache',
+            ],
+        },
+    },
+    {
+        # Optional Jinja2 path for the hot pages listed in JINJA2_PAGES
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [BASE_DIR / 'jinja2'],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'environment': 'main.jinja_env.environment',
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'main.context_processors.fragment_cache',
             ],
         },
     },
 ]
 
+# Templates rendered by their Jinja2 port instead of the Django template
+# language, e.g. JINJA2_PAGES=main/index.html,services/savings_accounts.html
+# (`manage.py benchmark_pages` checks a port renders the same page).
+JINJA2_PAGES = config('JINJA2_PAGES', default='', cast=Csv())
+
 WSGI_APPLICATION = 'coop.wsgi.application'
 
 
@@ -89,6 +117,30 @@ DATABASES = {
     }
 }
 
+# Cache (see main/caching.py for the model-versioned helpers)
+# Local memory is per process, which is fine for runserver; production.py
+# switches to a backend shared by all workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bhanjyang-dev',
+        'TIMEOUT': 300,
+    }
+}
+
+# Identifies the deployed code (e.g. the git commit). It is mixed into page
+# ETags (main/conditional.py), so browsers refetch pages after a deploy.
+RELEASE = config('RELEASE', default='')
+
+# Lifetime of the cached header/footer fragments in templates/partials
+# (0 renders them on every request). They are also retired by a new
+# RELEASE or `manage.py warm_templates --bump-site-version`.
+FRAGMENT_CACHE_TIMEOUT = config('FRAGMENT_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
+# Compile every template when a WSGI worker starts (main/templating.py);
+# only useful with the cached template loader, see production.py.
+TEMPLATE_WARMUP = config('TEMPLATE_WARMUP', default=False, cast=bool)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -125,7 +177,12 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+# `manage.py optimize_static` writes recompressed images (same paths) and their
+# AVIF/WebP siblings under OPTIMIZED_STATIC_ROOT/files. Listed first, so those
+# copies shadow the originals in collectstatic and {% static %}.
+OPTIMIZED_STATIC_ROOT = BASE_DIR / 'static_optimized'
 STATICFILES_DIRS = [
+    *([OPTIMIZED_STATIC_ROOT / 'files'] if (OPTIMIZED_STATIC_ROOT / 'files').is_dir() else []),
     BASE_DIR / 'static',
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
@@ -134,6 +191,31 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Responsive variants of uploaded photos (images app): widths in pixels, and
+# formats in preference order. Formats this Pillow build cannot encode are skipped.
+IMAGE_VARIANT_WIDTHS = config('IMAGE_VARIANT_WIDTHS', default='128,256,480,960,1600', cast=Csv(int))
+IMAGE_VARIANT_FORMATS = config('IMAGE_VARIANT_FORMATS', default='avif,webp,jpeg', cast=Csv())
+
+# On-demand thumbnails at MEDIA_URL/thumb/<width>x<height>/<path> (images/thumbnails.py).
+# Only these sizes are rendered; a height of 0 keeps the aspect ratio. Rendered
+# files live in THUMBNAIL_CACHE_DIR, least recently used evicted beyond the cap.
+THUMBNAIL_SIZES = config('THUMBNAIL_SIZES', default='128x128,144x144,256x256,288x288,480x0,960x0', cast=Csv())
+THUMBNAIL_CACHE_DIR = config('THUMBNAIL_CACHE_DIR', default=str(BASE_DIR / 'thumbnail_cache'))
+THUMBNAIL_CACHE_MAX_BYTES = config('THUMBNAIL_CACHE_MAX_BYTES', default=512 * 1024 * 1024, cast=int)
+
+# How /downloads/<id>/file/ hands the bytes over (downloads/serving.py):
+# '' streams from Django, 'nginx' sets X-Accel-Redirect to
+# DOWNLOADS_ACCEL_PREFIX + the file's storage name (an `internal` location
+# aliased to MEDIA_ROOT), 'sendfile' sets X-Sendfile for Apache/lighttpd.
+DOWNLOADS_ACCEL = config('DOWNLOADS_ACCEL', default='')
+DOWNLOADS_ACCEL_PREFIX = config('DOWNLOADS_ACCEL_PREFIX', default='/protected-media/')
+
+# Download and article view counters (counters app) are tallied in memory and
+# written every COUNTER_FLUSH_INTERVAL seconds, or sooner once this many
+# distinct counters are pending.
+COUNTER_FLUSH_INTERVAL = config('COUNTER_FLUSH_INTERVAL', default=30, cast=int)
+COUNTER_FLUSH_MAX_PENDING = config('COUNTER_FLUSH_MAX_PENDING', default=500, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -188,4 +270,46 @@ else:
     print("--------------------------------------------------")
     print(" Emails are being printed to the console (Dev Mode) ")
     print(" To send real emails, set SEND_REAL_EMAILS=True in .env ")
-    print("--------------------------------------------------")
\ No newline at end of file
+    print("--------------------------------------------------")
+# Public base URL used in links inside emails (no trailing slash)
+SITE_URL = config('SITE_URL', default='http://localhost:8000')
+
+# Newsletter dispatch (updates/newsletter.py): recipients per SMTP connection
+# and the maximum sending rate in messages per second (0 disables the throttle)
+NEWSLETTER_BATCH_SIZE = config('NEWSLETTER_BATCH_SIZE', default=100, cast=int)
+NEWSLETTER_MAX_PER_SECOND = config('NEWSLETTER_MAX_PER_SECOND', default=5, cast=float)
+
+# Contact form outbox (contact/outbox.py): messages are retried with
+# exponential backoff and moved to the dead-letter state after this many attempts
+CONTACT_OUTBOX_MAX_ATTEMPTS = config('CONTACT_OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+
+# Background jobs (jobs/worker.py): a running job not finished within the
+# lease is assumed lost and retried; processes started by run_worker
+JOB_LEASE_SECONDS = config('JOB_LEASE_SECONDS', default=900, cast=int)
+JOB_WORKER_PROCESSES = config('JOB_WORKER_PROCESSES', default=2, cast=int)
+
+# Anonymous full-page cache (main/middleware.py). Rules are (path regex, TTL
+# in seconds); the first match wins and a TTL of None never caches. Stale
+# pages are served for PAGE_CACHE_STALE_SECONDS past their TTL while one
+# request refreshes them. Saving a model purges the URL prefixes listed for
+# its app.
+PAGE_CACHE_ENABLED = config('PAGE_CACHE_ENABLED', default=True, cast=bool)
+PAGE_CACHE_RULES = [
+    (r'^/updates/(search|subscribe|feed)/', None),
+    (r'^/updates/category/[^/]+/feed/', None),
+    (r'^/services/.*(calculator|ladder|projection|schedule)/', None),
+    (r'^/downloads/\d+/file/', None),
+    # Upcoming/past split moves with the clock
+    (r'^/updates/events/', 60),
+    (r'^/updates/', 300),
+    (r'^/(services|team|downloads)/', 600),
+    (r'^/(about/)?$', 600),
+]
+PAGE_CACHE_STALE_SECONDS = config('PAGE_CACHE_STALE_SECONDS', default=300, cast=int)
+PAGE_CACHE_BACKGROUND_REFRESH = config('PAGE_CACHE_BACKGROUND_REFRESH', default=True, cast=bool)
+PAGE_CACHE_PURGE_PREFIXES = {
+    'services': ['/services/'],
+    'updates': ['/updates/'],
+    'team': ['/team/', '/about/'],
+    'downloads': ['/downloads/'],
+}
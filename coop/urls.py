@@ -11,6 +11,8 @@ urlpatterns = [
     path('team/', include('team.urls')),
     path('downloads/', include('downloads.urls')),
     path('services/', include('services.urls')),
+    # On-demand thumbnails; ahead of the DEBUG media route below, which would also match
+    path(f"{settings.MEDIA_URL.strip('/')}/thumb/", include('images.urls')),
     path('', include('main.urls')), # This should be the last one
 ]
 
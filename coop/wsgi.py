@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'coop.settings')
 
 application = get_wsgi_application()
+
+if settings.TEMPLATE_WARMUP:
+    # Compile every template before the first request reaches this worker
+    from main.templating import warm_templates
+    warm_templates()
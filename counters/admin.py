@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import DailyCount
+from .reports import top_reports
+
+
+@admin.register(DailyCount)
+class DailyCountAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'day', 'count')
+    list_filter = ('kind', 'day')
+    date_hierarchy = 'day'
+    readonly_fields = ('kind', 'object_id', 'day', 'count')
+
+    def has_add_permission(self, request):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        # Top-N tables above the raw per-day rows
+        extra_context = {**(extra_context or {}), 'top_reports': top_reports()}
+        return super().changelist_view(request, extra_context=extra_context)
@@ -0,0 +1,127 @@
+"""
+Buffered usage counters.
+
+``increment(obj)`` adds one to an in-process tally. It takes a lock and
+does a dict update; no query runs on the request path. A daemon thread
+flushes the tally every ``COUNTER_FLUSH_INTERVAL`` seconds, or sooner once
+``COUNTER_FLUSH_MAX_PENDING`` distinct counters are waiting. The flush is
+one transaction of upserts into ``DailyCount``:
+
+    INSERT ... ON CONFLICT (kind, object_id, day) DO UPDATE SET count = count + excluded.count
+
+The database sees one write per counter per interval instead of one
+``UPDATE`` per request, so SQLite's single writer lock is taken a few times
+a minute rather than on every download. Each worker process keeps its own
+tally; the upserts add up, so workers never overwrite each other.
+
+Counts are not lost on a graceful shutdown: ``flush`` is registered with
+``atexit``, which gunicorn workers run when they exit after ``SIGTERM`` or
+a ``max_requests`` restart. A failed flush merges its batch back into the
+tally for the next attempt. Only a hard kill loses the last interval.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from .models import DailyCount
+
+logger = logging.getLogger(__name__)
+
+_pending = Counter()
+_lock = threading.Lock()
+_wake = threading.Event()
+_flusher = {'pid': None}
+
+
+def increment(obj, amount=1):
+    """Count a view or download of the model instance ``obj``."""
+    increment_key(obj._meta.label_lower, obj.pk, amount)
+
+
+def increment_key(kind, object_id, amount=1):
+    key = (kind, int(object_id), timezone.localdate())
+    with _lock:
+        _pending[key] += amount
+        backlog = len(_pending)
+    _ensure_flusher()
+    if backlog >= settings.COUNTER_FLUSH_MAX_PENDING:
+        _wake.set()
+
+
+def pending():
+    """Counts not yet written, as ``{(kind, object_id, day): count}``."""
+    with _lock:
+        return dict(_pending)
+
+
+def _upsert_sql():
+    table = connection.ops.quote_name(DailyCount._meta.db_table)
+    kind, object_id, day, count = (
+        connection.ops.quote_name(DailyCount._meta.get_field(name).column)
+        for name in ('kind', 'object_id', 'day', 'count')
+    )
+    return (
+        f'INSERT INTO {table} ({kind}, {object_id}, {day}, {count}) VALUES (%s, %s, %s, %s) '
+        f'ON CONFLICT ({kind}, {object_id}, {day}) DO UPDATE SET {count} = {table}.{count} + excluded.{count}'
+    )
+
+
+def flush():
+    """Write every pending count in one transaction; return how many counters were written."""
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+    if not batch:
+        return 0
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.executemany(_upsert_sql(), [
+                    (kind, object_id, connection.ops.adapt_datefield_value(day), count)
+                    for (kind, object_id, day), count in batch.items()
+                ])
+    except Exception:
+        with _lock:
+            _pending.update(batch)
+        raise
+    return len(batch)
+
+
+def _run_flusher():
+    while True:
+        _wake.wait(settings.COUNTER_FLUSH_INTERVAL)
+        _wake.clear()
+        try:
+            flush()
+        except Exception:
+            logger.exception('Flushing usage counters failed; will retry')
+        finally:
+            connections.close_all()
+
+
+def _ensure_flusher():
+    # One flusher per process; a forked worker starts its own
+    if _flusher['pid'] == os.getpid():
+        return
+    with _lock:
+        if _flusher['pid'] == os.getpid():
+            return
+        _flusher['pid'] = os.getpid()
+    threading.Thread(target=_run_flusher, name='counter-flusher', daemon=True).start()
+
+
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception:
+        logger.exception('Could not flush usage counters at exit')
+
+
+atexit.register(_flush_at_exit)
@@ -0,0 +1,40 @@
+"""
+Counting page views and downloads, including pages served from the page cache.
+
+A view marks its response with ``count_response(response, obj)``; this
+middleware increments the counter and removes the marker before the
+response leaves. It sits above ``PageCacheMiddleware``. Cached copies
+keep the marker, so a page cache hit still counts even though the view
+does not run. Conditional ``304`` responses carry no marker and do not
+count: the browser already had the page. Neither do ``HEAD`` requests or
+user agents that look like crawlers.
+"""
+
+import re
+
+from .buffer import increment_key
+
+MARKER = 'X-Count-View'
+BOT_RE = re.compile(r'bot|crawl|spider|slurp|preview|monitor|curl|wget', re.IGNORECASE)
+
+
+def count_response(response, obj):
+    """Have ``CounterMiddleware`` count this response as a view of ``obj``."""
+    response[MARKER] = f'{obj._meta.label_lower}:{obj.pk}'
+    return response
+
+
+class CounterMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        marker = response.get(MARKER)
+        if marker is None:
+            return response
+        del response[MARKER]
+        if request.method == 'GET' and not BOT_RE.search(request.headers.get('User-Agent', '')):
+            kind, _, object_id = marker.rpartition(':')
+            increment_key(kind, object_id)
+        return response
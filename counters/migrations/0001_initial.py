@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(help_text='Model label, e.g. downloads.download', max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('day', models.DateField()),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-day', '-count'],
+                'indexes': [models.Index(fields=['kind', 'day'], name='daily_count_kind_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'day'), name='daily_count_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class DailyCount(models.Model):
+    """How often an object was viewed or downloaded on one day (written by counters/buffer.py)"""
+    kind = models.CharField(max_length=100, help_text="Model label, e.g. downloads.download")
+    object_id = models.PositiveBigIntegerField()
+    day = models.DateField()
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day', '-count']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id', 'day'], name='daily_count_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'day'], name='daily_count_kind_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}#{self.object_id} on {self.day}: {self.count}"
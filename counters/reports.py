@@ -0,0 +1,36 @@
+"""Top-N usage reports over ``DailyCount`` for the admin."""
+
+from datetime import timedelta
+
+from django.apps import apps
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import DailyCount
+
+# Counted models and how their rows are labelled in reports
+REPORTED_KINDS = (
+    ('downloads.download', 'Downloads'),
+    ('updates.newsarticle', 'News article views'),
+)
+PERIODS = ((7, 'Last 7 days'), (30, 'Last 30 days'), (None, 'All time'))
+
+
+def top(kind, days=None, limit=10):
+    """``[(object, total), ...]`` with the highest totals for ``kind`` over the last ``days`` days."""
+    counts = DailyCount.objects.filter(kind=kind)
+    if days is not None:
+        counts = counts.filter(day__gt=timezone.localdate() - timedelta(days=days))
+    rows = list(
+        counts.order_by().values('object_id').annotate(total=Sum('count')).order_by('-total', 'object_id')[:limit]
+    )
+    objects = apps.get_model(kind)._default_manager.in_bulk([row['object_id'] for row in rows])
+    # Deleted objects keep their counts; show their id instead
+    return [(objects.get(row['object_id'], f"#{row['object_id']} (deleted)"), row['total']) for row in rows]
+
+
+def top_reports(limit=10):
+    return [
+        {'title': title, 'periods': [(label, top(kind, days, limit)) for days, label in PERIODS]}
+        for kind, title in REPORTED_KINDS
+    ]
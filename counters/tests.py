@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from updates.models import Category, NewsArticle
+
+from . import buffer
+from .models import DailyCount
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'counter-tests'}}
+
+
+class BufferedCounterTestCase(TestCase):
+    def setUp(self):
+        # Flush explicitly instead of from the background thread
+        patcher = mock.patch.object(buffer, '_ensure_flusher')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        buffer._pending.clear()
+        self.addCleanup(buffer._pending.clear)
+
+    def counts(self):
+        return {(row.kind, row.object_id): row.count for row in DailyCount.objects.all()}
+
+
+class FlushTests(BufferedCounterTestCase):
+    def test_increments_are_summed_into_one_row(self):
+        buffer.increment_key('downloads.download', 7)
+        buffer.increment_key('downloads.download', 7)
+        buffer.increment_key('downloads.download', 8, amount=3)
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(self.counts(), {('downloads.download', 7): 2, ('downloads.download', 8): 3})
+        self.assertEqual(buffer.pending(), {})
+
+    def test_later_flush_adds_to_existing_row(self):
+        buffer.increment_key('downloads.download', 7)
+        buffer.flush()
+        buffer.increment_key('downloads.download', 7)
+        buffer.increment_key('downloads.download', 7)
+        buffer.flush()
+        self.assertEqual(self.counts(), {('downloads.download', 7): 3})
+        self.assertEqual(DailyCount.objects.get().day, timezone.localdate())
+
+    def test_failed_flush_keeps_pending_counts(self):
+        buffer.increment_key('downloads.download', 7)
+        with mock.patch.object(buffer, '_upsert_sql', return_value='INSERT INTO no_such_table VALUES (%s, %s, %s, %s)'):
+            with self.assertRaises(DatabaseError):
+                buffer.flush()
+        buffer.increment_key('downloads.download', 7)
+        self.assertEqual(sum(buffer.pending().values()), 2)
+        buffer.flush()
+        self.assertEqual(self.counts(), {('downloads.download', 7): 2})
+
+    def test_nothing_pending(self):
+        self.assertEqual(buffer.flush(), 0)
+
+
+@override_settings(CACHES=LOCMEM, PAGE_CACHE_ENABLED=True)
+class CounterMiddlewareTests(BufferedCounterTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.article = NewsArticle.objects.create(
+            title='Annual meeting', content='Minutes of the meeting.', status=NewsArticle.Status.PUBLISHED,
+            author=User.objects.create(username='editor'), category=Category.objects.create(name='Notices'),
+        )
+        cls.url = cls.article.get_absolute_url()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def views(self):
+        return buffer.pending().get(('updates.newsarticle', self.article.pk, timezone.localdate()), 0)
+
+    def test_cached_page_hit_still_counts(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.assertEqual(second['X-Page-Cache'], 'HIT')
+        self.assertNotIn('X-Count-View', first)
+        self.assertNotIn('X-Count-View', second)
+        self.assertEqual(self.views(), 2)
+
+    def test_not_modified_is_not_counted(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.views(), 1)
+
+    def test_head_and_bots_are_not_counted(self):
+        self.client.head(self.url)
+        self.client.get(self.url, headers={'User-Agent': 'Mozilla/5.0 (compatible; Googlebot/2.1)'})
+        self.assertEqual(self.views(), 0)
@@ -58,6 +58,14 @@ def run_migrations():
     )
 
 
+def optimize_static():
+    """Recompress static images and write their AVIF/WebP siblings."""
+    return run_command(
+        "python manage.py optimize_static",
+        "Optimizing static images"
+    )
+
+
 def collect_static():
     """Collect static files."""
     return run_command(
@@ -66,6 +74,14 @@ def collect_static():
     )
 
 
+def refresh_templates():
+    """Check that every template compiles and retire cached header/footer fragments."""
+    return run_command(
+        "python manage.py warm_templates --bump-site-version",
+        "Compiling templates and refreshing cached fragments"
+    )
+
+
 def check_system():
     """Run Django system check."""
     return run_command(
@@ -114,10 +130,18 @@ def main():
     if not run_migrations():
         sys.exit(1)
     
+    # Optimize static images (before collecting, so the optimized copies are collected)
+    if not optimize_static():
+        sys.exit(1)
+    
     # Collect static files
     if not collect_static():
         sys.exit(1)
     
+    # Compile templates
+    if not refresh_templates():
+        sys.exit(1)
+    
     # Check system
     if not check_system():
         print("⚠️  System check warnings - review before production deployment")
@@ -131,7 +155,10 @@ def main():
     print("2. Set up environment variables in .env file")
     print("3. Configure your database")
     print("4. Set up SSL certificates")
-    print("5. Test your deployment")
+    print("5. Run the background processes next to gunicorn (see README, Processes):")
+    print("   python manage.py run_worker       # image variants, related articles")
+    print("   python manage.py process_outbox   # contact-form emails")
+    print("6. Test your deployment")
     
     print("\nFor production deployment:")
     print("- Set DEBUG=False in environment variables")
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:40
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def start_from_upload_time(apps, schema_editor):
+    Download = apps.get_model('downloads', 'Download')
+    Download.objects.update(updated_at=F('uploaded_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('downloads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='download',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(start_from_upload_time, migrations.RunPython.noop),
+    ]
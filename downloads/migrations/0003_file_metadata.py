@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:31
+
+import posixpath
+
+from django.db import migrations, models
+
+from downloads.serving import file_digest
+
+
+def describe_existing_files(apps, schema_editor):
+    Download = apps.get_model('downloads', 'Download')
+    for download in Download.objects.exclude(file=''):
+        try:
+            download.content_hash, download.file_size = file_digest(download.file)
+        except OSError:
+            # Missing from storage; the hash is filled in when the file is re-uploaded
+            continue
+        finally:
+            download.file.close()
+        download.original_name = posixpath.basename(download.file.name)
+        download.save(update_fields=['content_hash', 'file_size', 'original_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('downloads', '0002_download_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='download',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the file, used as its ETag', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='download',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='download',
+            name='original_name',
+            field=models.CharField(blank=True, editable=False, help_text='Name the file was uploaded with', max_length=255),
+        ),
+        migrations.RunPython(describe_existing_files, migrations.RunPython.noop),
+    ]
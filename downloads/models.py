@@ -1,6 +1,11 @@
 # downloads/models.py
 
+import posixpath
+
 from django.db import models
+from django.urls import reverse
+
+from .serving import file_digest
 
 class Download(models.Model):
     """
@@ -10,6 +15,11 @@ class Download(models.Model):
     description = models.TextField(blank=True, help_text="छोटो विवरण")
     file = models.FileField(upload_to='downloads/', help_text="अपलोड गर्ने फाइल")
     uploaded_at = models.DateTimeField(auto_now_add=True, help_text="अपलोड गरिएको मिति")
+    updated_at = models.DateTimeField(auto_now=True)
+    # Filled from the file on upload (see downloads/serving.py)
+    original_name = models.CharField(max_length=255, blank=True, editable=False, help_text="Name the file was uploaded with")
+    content_hash = models.CharField(max_length=64, blank=True, editable=False, help_text="SHA-256 of the file, used as its ETag")
+    file_size = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
     file_type = models.CharField(
         max_length=10,
         blank=True,
@@ -33,4 +43,12 @@ class Download(models.Model):
             # Extract file extension from the file name
             extension = self.file.name.split('.')[-1].lower()
             self.file_type = extension
-        super().save(*args, **kwargs)
\ No newline at end of file
+        if self.file and (not self.file._committed or not self.content_hash):
+            # A new upload: storage may rename it, so keep the name the user chose
+            if not self.file._committed:
+                self.original_name = posixpath.basename(self.file.name)
+            self.content_hash, self.file_size = file_digest(self.file)
+        super().save(*args, **kwargs)
+
+    def get_absolute_url(self):
+        return reverse('downloads:file', args=[self.pk])
\ No newline at end of file
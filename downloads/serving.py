@@ -0,0 +1,181 @@
+"""
+Serving download files: ``/downloads/<id>/file/``.
+
+Every response carries a strong ETag (the SHA-256 of the file, stored on the
+row when it is uploaded), ``Last-Modified``, ``Accept-Ranges: bytes`` and a
+``Content-Disposition`` with the name the file was uploaded under, so
+browsers can revalidate with a 304 and resume interrupted downloads.
+
+How the bytes are sent depends on ``DOWNLOADS_ACCEL``:
+
+* ``'nginx'``: an empty response with ``X-Accel-Redirect`` pointing at
+  ``DOWNLOADS_ACCEL_PREFIX`` + the storage name. nginx sends the file
+  (and handles ``Range`` itself) from an internal location such as::
+
+      location /protected-media/ { internal; alias /srv/bhanjyang/media/; }
+
+* ``'sendfile'``: an empty response with ``X-Sendfile`` set to the file's
+  path, for Apache mod_xsendfile or lighttpd.
+* ``''`` (default): the file is streamed by Django. A ``Range`` request for
+  one byte range is answered with ``206 Partial Content``. Requests with
+  several ranges get the whole file, which the RFC allows. With a
+  ``wsgi.file_wrapper`` that uses sendfile (gunicorn), the kernel copies
+  the bytes, including for ranges.
+"""
+
+import hashlib
+import mimetypes
+import posixpath
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def file_digest(file):
+    """``(sha256 hex digest, size in bytes)`` of an open Django ``File``."""
+    sha = hashlib.sha256()
+    size = 0
+    file.seek(0)
+    for chunk in file.chunks(CHUNK_SIZE):
+        sha.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    return sha.hexdigest(), size
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` (inclusive) for a single-range ``Range`` header, ``None``
+    to send the whole file, or ``False`` when the range is unsatisfiable.
+    Invalid headers, such as ``bytes=100-50``, are ignored as the RFC requires.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first and last and int(first) > int(last):
+        return None
+    if size == 0:
+        # No byte of an empty file can be addressed; send the (empty) whole
+        return None
+    if not first:
+        # "bytes=-500": the last 500 bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    if start >= size:
+        return False
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def starts_at_first_byte(request):
+    """
+    False for a ``Range`` request that skips the start of the file: a resumed
+    download or one part of a parallel one. Decided from the request alone,
+    since with ``DOWNLOADS_ACCEL`` the proxy answers the range, not Django.
+    """
+    header = request.headers.get('Range')
+    return not header or header.replace(' ', '').startswith('bytes=0-')
+
+
+class FileRange:
+    """
+    File-like view of bytes ``start``-``end`` of ``handle``. ``FileResponse``
+    reads no further than ``end``. ``fileno`` lets sendfile-capable servers
+    send the range straight from the current offset, limited by ``Content-Length``.
+    """
+
+    def __init__(self, handle, start, end):
+        self.handle = handle
+        self.remaining = end - start + 1
+        handle.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.handle.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.handle.fileno()
+
+    def close(self):
+        self.handle.close()
+
+
+def _if_range_matches(request, etag, last_modified):
+    """False when an ``If-Range`` validator no longer matches, so the whole file is sent."""
+    validator = request.headers.get('If-Range')
+    if not validator:
+        return True
+    if validator.startswith('"'):
+        return validator == etag
+    stamp = parse_http_date_safe(validator)
+    return stamp is not None and last_modified is not None and int(last_modified.timestamp()) <= stamp
+
+
+def serve_download(request, download):
+    """Response for ``download.file`` honouring conditional and range requests."""
+    etag = f'"{download.content_hash}"' if download.content_hash else None
+    last_modified = download.updated_at
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is None:
+        response = _file_response(request, download, etag, last_modified)
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Accept-Ranges'] = 'bytes'
+    # Revalidate on every use: the URL stays the same when the file is replaced
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def _file_response(request, download, etag, last_modified):
+    filename = download.original_name or posixpath.basename(download.file.name)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    accel = settings.DOWNLOADS_ACCEL
+
+    if accel in ('nginx', 'sendfile'):
+        response = HttpResponse(content_type=content_type)
+        if accel == 'nginx':
+            response['X-Accel-Redirect'] = settings.DOWNLOADS_ACCEL_PREFIX + download.file.name
+        else:
+            response['X-Sendfile'] = download.file.path
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        return response
+
+    handle = download.file.storage.open(download.file.name, 'rb')
+    size = download.file_size if download.file_size is not None else download.file.storage.size(download.file.name)
+    byte_range = None
+    if 'Range' in request.headers and _if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(request.headers['Range'], size)
+    if byte_range is False:
+        handle.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        return FileResponse(handle, as_attachment=True, filename=filename, content_type=content_type)
+
+    start, end = byte_range
+    response = FileResponse(
+        FileRange(handle, start, end), status=206, as_attachment=True, filename=filename,
+        content_type=content_type,
+    )
+    response['Content-Length'] = end - start + 1
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -1,3 +1,111 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.http import http_date
+
+from .models import Download
+from .serving import parse_range
+
+CONTENT = bytes(range(256)) * 4
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_satisfiable_ranges(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=900-5000', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+
+    def test_ignored_ranges_send_whole_file(self):
+        for header in ('bytes=100-50', 'bytes=-', 'bytes=0-1,5-9', 'items=0-9', 'bytes=a-b'):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 1000))
+
+    def test_unsatisfiable_ranges(self):
+        self.assertIs(parse_range('bytes=1000-', 1000), False)
+        self.assertIs(parse_range('bytes=-0', 1000), False)
+
+    def test_empty_file(self):
+        for header in ('bytes=-10', 'bytes=0-', 'bytes=0-0'):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 0))
+
+
+class DownloadFileViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media = override_settings(MEDIA_ROOT=cls.media_root, DOWNLOADS_ACCEL='', PAGE_CACHE_ENABLED=False)
+        cls.media.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.download = Download(title='Form')
+        self.download.file.save('form.pdf', ContentFile(CONTENT))
+        self.url = f'/downloads/{self.download.pk}/file/'
+        patcher = mock.patch('counters.middleware.increment_key')
+        self.increment = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_range_request(self):
+        response, body = self.get(Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(CONTENT)}')
+        self.assertEqual(body, CONTENT[10:20])
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.get(Range=f'bytes={len(CONTENT)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_inverted_range_sends_whole_file(self):
+        response, body = self.get(Range='bytes=100-50')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, CONTENT)
+
+    def test_if_range(self):
+        etag = f'"{self.download.content_hash}"'
+        response, body = self.get(Range='bytes=0-9', **{'If-Range': etag})
+        self.assertEqual((response.status_code, body), (206, CONTENT[:10]))
+
+        response, body = self.get(Range='bytes=0-9', **{'If-Range': '"stale"'})
+        self.assertEqual((response.status_code, body), (200, CONTENT))
+
+        stamp = http_date(self.download.updated_at.timestamp() - 3600)
+        response, body = self.get(Range='bytes=0-9', **{'If-Range': stamp})
+        self.assertEqual((response.status_code, body), (200, CONTENT))
+
+    def test_not_modified(self):
+        response, _ = self.get(**{'If-None-Match': f'"{self.download.content_hash}"'})
+        self.assertEqual(response.status_code, 304)
+        self.increment.assert_not_called()
+
+    def test_counts_whole_and_first_range_only(self):
+        self.get()
+        self.get(Range='bytes=0-99')
+        self.get(Range='bytes=100-')
+        self.assertEqual(self.increment.call_count, 2)
+
+    @override_settings(DOWNLOADS_ACCEL='nginx')
+    def test_offloaded_range_is_not_counted(self):
+        response, _ = self.get(Range='bytes=100-')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('X-Accel-Redirect', response)
+        self.increment.assert_not_called()
+        self.get()
+        self.assertEqual(self.increment.call_count, 1)
@@ -7,4 +7,5 @@ app_name = 'downloads' # Namespace for this app's URLs
 
 urlpatterns = [
     path('', views.download_center_view, name='download_center'),
+    path('<int:pk>/file/', views.download_file_view, name='file'),
 ]
\ No newline at end of file
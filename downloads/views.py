@@ -1,14 +1,35 @@
 # downloads/views.py
 
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
+from django.views.decorators.http import require_safe
+from counters.middleware import count_response
+from main.caching import cached_queryset
+from main.conditional import content_condition
 from .models import Download
+from .serving import serve_download, starts_at_first_byte
 
+@content_condition(Download)
 def download_center_view(request):
     """
     Renders the download center page, displaying all available downloadable files.
     """
-    downloads = Download.objects.all() # Fetch all Download objects from the database
+    # Fetch all Download objects; cached until a download is added, edited or removed
+    downloads = cached_queryset('downloads:all', Download.objects.all())
     context = {
         'downloads': downloads,
     }
     return render(request, 'downloads/download.html', context)
+
+
+@require_safe
+def download_file_view(request, pk):
+    """
+    Serves one download with Range/ETag support, offloading the bytes to
+    the front proxy when DOWNLOADS_ACCEL is set (see downloads/serving.py).
+    """
+    download = get_object_or_404(Download, pk=pk)
+    response = serve_download(request, download)
+    # Count each download once: not its resumed or parallel byte ranges, nor 304s
+    if response.status_code in (200, 206) and starts_at_first_byte(request):
+        count_response(response, download)
+    return response
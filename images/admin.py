@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from .models import ImageVariant
+
+
+@admin.register(ImageVariant)
+class ImageVariantAdmin(admin.ModelAdmin):
+    list_display = ('source', 'format', 'width', 'height', 'size', 'created_at')
+    list_filter = ('format', 'width')
+    search_fields = ('source',)
+    readonly_fields = ('source', 'width', 'height', 'format', 'file', 'size', 'created_at')
+
+    def has_add_permission(self, request):
+        return False
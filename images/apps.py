@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ImagesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'images'
+    verbose_name = 'Image Variants'
+
+    def ready(self):
+        from .signals import connect_image_sources
+        connect_image_sources()
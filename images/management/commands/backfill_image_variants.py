@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from images.models import ImageVariant
+from images.processing import describe_source, render_variants, setup_worker
+from images.variants import delete_variants, intrinsic_fields, record_variants, refresh_pages, source_fields
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate responsive AVIF/WebP/JPEG variants, and the stored size and placeholder, '
+        'for every uploaded image that lacks them'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Worker processes encoding images (default: one per CPU)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate variants for images that already have them',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Also delete variants whose original image is no longer referenced',
+        )
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1:
+            raise CommandError('--processes must be a positive integer.')
+
+        sources = {}
+        undescribed = {}
+        for model, field in source_fields():
+            names = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            for name in names.values_list(field, flat=True):
+                sources.setdefault(name, model)
+            width_field = intrinsic_fields(field)[0]
+            for name in names.filter(**{f'{width_field}__isnull': True}).values_list(field, flat=True):
+                undescribed.setdefault(name, []).append((model, field))
+
+        done = set() if options['force'] else set(ImageVariant.objects.values_list('source', flat=True).distinct())
+        pending = [name for name in sources if name not in done]
+        self.stdout.write(
+            f'{len(pending)} of {len(sources)} images need variants, '
+            f'{len(undescribed)} need their size and placeholder.'
+        )
+
+        changed = set()
+        failed = []
+        if pending or undescribed:
+            # Spawned children do not inherit connections; close ours so none is shared either.
+            connections.close_all()
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(options['processes'], mp_context=context, initializer=setup_worker) as pool:
+                futures = {pool.submit(render_variants, name): ('variants', name) for name in pending}
+                futures.update({pool.submit(describe_source, name): ('describe', name) for name in undescribed})
+                for future in as_completed(futures):
+                    kind, name = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        failed.append(kind)
+                        self.stderr.write(f'{name}: {exc}')
+                        continue
+                    if kind == 'variants':
+                        record_variants(name, result)
+                        changed.add(sources[name])
+                        detail = f'{len(result)} variants'
+                    else:
+                        for model, field in undescribed[name]:
+                            model.objects.filter(**{field: name}).update(**dict(zip(intrinsic_fields(field), result)))
+                            changed.add(model)
+                        detail = f'{result[0]}x{result[1]}, placeholder {len(result[2])} bytes'
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'{name}: {detail}')
+
+        pruned = 0
+        if options['prune']:
+            orphans = set(ImageVariant.objects.values_list('source', flat=True).distinct()) - set(sources)
+            for name in orphans:
+                delete_variants(name)
+            pruned = len(orphans)
+
+        for model in changed:
+            refresh_pages(model)
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated variants for {len(pending) - failed.count("variants")} images, '
+            f'described {len(undescribed) - failed.count("describe")}'
+            f'{f", pruned {pruned}" if options["prune"] else ""}'
+            f'{f", {len(failed)} failed" if failed else ""}.'
+        ))
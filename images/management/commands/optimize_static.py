@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from images.static_assets import manifest_path, optimize_static
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompress static PNG/JPEG images and write AVIF/WebP siblings at responsive widths. '
+        'Unchanged images are skipped. Run before collectstatic.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-process every image, even when its hash is unchanged',
+        )
+
+    def handle(self, *args, **options):
+        optimized, skipped, removed = optimize_static(
+            force=options['force'],
+            stdout=self.stdout if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Optimized {optimized} images, {skipped} unchanged, {removed} removed. Manifest: {manifest_path()}'
+        ))
@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class ImageVariant(models.Model):
+    """A resized/re-encoded copy of an uploaded image (see images/processing.py)"""
+    class Format(models.TextChoices):
+        AVIF = 'avif', 'AVIF'
+        WEBP = 'webp', 'WebP'
+        JPEG = 'jpeg', 'JPEG'
+
+    source = models.CharField(max_length=255, help_text="Storage name of the original image")
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    format = models.CharField(max_length=4, choices=Format.choices)
+    file = models.FileField(max_length=255)
+    size = models.PositiveIntegerField(help_text="File size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['source', 'format', 'width']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'format', 'width'], name='image_variant_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} ({self.format}, {self.width}px)"
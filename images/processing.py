@@ -0,0 +1,177 @@
+"""
+Resizing and encoding of image variants.
+
+Nothing here touches the database, so ``render_variants`` can run in the
+spawned pool workers of ``backfill_image_variants`` as well as in web and
+job-worker processes. Variants are written next to the original in the same
+storage, as ``<name>.w<width>.<ext>`` with the source's own extension kept
+(``person_photos/3.jpg`` -> ``person_photos/3.jpg.w256.webp``), so ``3.jpg``
+and ``3.png`` never write over each other's variants.
+
+Widths come from ``IMAGE_VARIANT_WIDTHS``. Only widths below the original
+are produced (never upscaled). If the original is no wider than the largest
+configured width, its own width is added, so every image gets a
+full-size AVIF/WebP copy.
+
+``render_thumbnail`` produces the single exact-size images served by the
+on-demand thumbnail view (images/thumbnails.py), and ``describe_image`` the
+intrinsic size and tiny inline placeholder stored on each image's row.
+"""
+
+import base64
+import io
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+# Pillow format name, MIME type, file extension and encoder options per variant format
+FORMATS = {
+    'avif': ('AVIF', 'image/avif', 'avif', {'quality': 55, 'speed': 6}),
+    'webp': ('WEBP', 'image/webp', 'webp', {'quality': 78, 'method': 4}),
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+# Width of the inline placeholder; browsers blur it when stretching it over the image box
+PLACEHOLDER_WIDTH = 16
+# Pillow feature flag that must be present to encode each format
+_FEATURES = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def available_formats():
+    """Configured formats this Pillow build can encode, in preference order."""
+    return [fmt for fmt in settings.IMAGE_VARIANT_FORMATS if fmt in FORMATS and features.check(_FEATURES[fmt])]
+
+
+def variant_name(source, width, fmt):
+    return f'{source}.w{width}.{FORMATS[fmt][2]}'
+
+
+def target_widths(original_width, widths=None):
+    widths = sorted(widths or settings.IMAGE_VARIANT_WIDTHS)
+    targets = [width for width in widths if width < original_width]
+    if original_width <= widths[-1]:
+        targets.append(original_width)
+    return targets
+
+
+def _prepare(image, fmt):
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+    if not has_alpha:
+        return image.convert('RGB') if image.mode != 'RGB' else image
+    image = image.convert('RGBA')
+    if fmt != 'jpeg':
+        return image
+    # JPEG has no alpha channel: flatten onto white.
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def _oriented_size(image):
+    """``(width, height)`` of ``image`` once its EXIF orientation is applied."""
+    if image.getexif().get(0x0112, 1) < 5:
+        return image.size
+    return image.height, image.width
+
+
+def _decode(image, scale):
+    """Load ``image`` upright, letting the JPEG decoder shrink it when ``scale`` (< 1) allows."""
+    if image.format == 'JPEG' and scale < 1:
+        # Downscales by a power of two while staying at or above the requested scale.
+        image.draft('RGB', (int(image.width * scale) or 1, int(image.height * scale) or 1))
+    image = ImageOps.exif_transpose(image)
+    image.load()
+    return image
+
+
+def _encode(image, fmt, icc_profile=None):
+    pil_format, _, _, options = FORMATS[fmt]
+    buffer = io.BytesIO()
+    extra = {'icc_profile': icc_profile} if icc_profile else {}
+    _prepare(image, fmt).save(buffer, pil_format, **options, **extra)
+    return buffer.getvalue()
+
+
+def render_variants(source, storage=None, widths=None, formats=None, target_storage=None):
+    """
+    Write every variant of the image ``source`` (a storage name) and return
+    one dict per file: ``width``, ``height``, ``format``, ``name``, ``size``.
+    Variants go to ``storage`` unless a separate ``target_storage`` is given.
+    """
+    storage = storage or default_storage
+    target_storage = target_storage or storage
+    formats = formats or available_formats()
+    with storage.open(source, 'rb') as handle:
+        image = Image.open(handle)
+        original_width = _oriented_size(image)[0]
+        targets = target_widths(original_width, widths)
+        image = _decode(image, max(targets) / original_width if targets else 1)
+        icc_profile = image.info.get('icc_profile')
+
+    rendered = []
+    for width in sorted(targets, reverse=True):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if (width, height) == image.size else image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        for fmt in formats:
+            data = _encode(resized, fmt, icc_profile)
+            name = variant_name(source, width, fmt)
+            if target_storage.exists(name):
+                target_storage.delete(name)
+            name = target_storage.save(name, ContentFile(data))
+            rendered.append({'width': width, 'height': height, 'format': fmt, 'name': name, 'size': len(data)})
+    return rendered
+
+
+def render_thumbnail(source, width, height, fmt, storage=None):
+    """
+    Encoded bytes of ``source`` scaled to ``width`` and cropped to ``height``
+    around the centre (``height`` 0 keeps the aspect ratio). Never upscales.
+    """
+    storage = storage or default_storage
+    with storage.open(source, 'rb') as handle:
+        image = Image.open(handle)
+        original_width, original_height = _oriented_size(image)
+        scale = max(width / original_width, height / original_height)
+        image = _decode(image, scale)
+        icc_profile = image.info.get('icc_profile')
+
+    if scale >= 1:
+        # Too small to shrink: crop the largest box with the requested aspect ratio.
+        if height:
+            ratio = min(image.width / width, image.height / height)
+            image = ImageOps.fit(image, (round(width * ratio), round(height * ratio)), Image.LANCZOS)
+    elif height:
+        image = ImageOps.fit(image, (width, height), Image.LANCZOS)
+    else:
+        size = (width, max(1, round(image.height * width / image.width)))
+        image = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+    return _encode(image, fmt, icc_profile)
+
+
+def describe_image(handle):
+    """
+    ``(width, height, placeholder)`` for an open image file: its size once
+    upright, and a ``PLACEHOLDER_WIDTH`` pixel wide WebP as a ``data:`` URI
+    (a few hundred bytes) to show while the real image loads.
+    """
+    image = Image.open(handle)
+    width, height = _oriented_size(image)
+    image = _decode(image, PLACEHOLDER_WIDTH * 4 / width)
+    size = (PLACEHOLDER_WIDTH, max(1, round(PLACEHOLDER_WIDTH * height / width)))
+    tiny = _prepare(image.resize(size, Image.BOX), 'webp')
+    buffer = io.BytesIO()
+    tiny.save(buffer, 'WEBP', quality=40, method=6)
+    return width, height, 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def describe_source(source, storage=None):
+    """``describe_image`` for the stored file ``source``."""
+    with (storage or default_storage).open(source, 'rb') as handle:
+        return describe_image(handle)
+
+
+def setup_worker():
+    """Pool initializer: spawned children start without Django configured."""
+    import django
+    django.setup()
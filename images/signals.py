@@ -0,0 +1,80 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from PIL import UnidentifiedImageError
+
+from .models import ImageVariant
+from .processing import describe_image
+from .variants import delete_variants, describe, intrinsic_fields, source_fields
+
+
+def _image(sender, instance):
+    return getattr(instance, _fields[sender])
+
+
+def describe_upload(sender, instance, raw=False, **kwargs):
+    """Store the size and placeholder of a newly uploaded or reassigned image."""
+    field = _fields[sender]
+    image = getattr(instance, field)
+    if raw:
+        return
+    previous = None
+    if instance.pk is not None:
+        previous = sender._default_manager.filter(pk=instance.pk).values_list(field, flat=True).first()
+    # Read by queue_variants once the row is saved
+    instance._replaced_image = previous if previous and previous != image.name else None
+    if not image:
+        describe(instance, field, None)
+        return
+    stored_width = getattr(instance, intrinsic_fields(field)[0])
+    if image._committed and stored_width is not None and previous == image.name:
+        return
+    try:
+        if image._committed:
+            with image.storage.open(image.name, 'rb') as handle:
+                values = describe_image(handle)
+        else:
+            # Not written to storage yet: read the upload itself
+            image.file.seek(0)
+            values = describe_image(image.file)
+            image.file.seek(0)
+    except (OSError, UnidentifiedImageError):
+        values = None
+    describe(instance, field, values)
+
+
+def queue_variants(sender, instance, raw=False, **kwargs):
+    """
+    Generate variants (on the job queue) for an image that has none yet, and
+    drop those of the file it replaced.
+    """
+    if raw:
+        return
+    replaced = getattr(instance, '_replaced_image', None)
+    if replaced:
+        instance._replaced_image = None
+        transaction.on_commit(partial(delete_variants, replaced))
+    image = _image(sender, instance)
+    if not image or ImageVariant.objects.filter(source=image.name).exists():
+        return
+    from .tasks import generate_image_variants
+    transaction.on_commit(partial(generate_image_variants.enqueue, image.name, sender._meta.label))
+
+
+def remove_variants(sender, instance, **kwargs):
+    image = _image(sender, instance)
+    if image:
+        transaction.on_commit(partial(delete_variants, image.name))
+
+
+_fields = {}
+
+
+def connect_image_sources():
+    for model, field in source_fields():
+        _fields[model] = field
+        uid = f'image_variants_{model._meta.label_lower}'
+        pre_save.connect(describe_upload, sender=model, dispatch_uid=f'{uid}_describe')
+        post_save.connect(queue_variants, sender=model, dispatch_uid=f'{uid}_save')
+        post_delete.connect(remove_variants, sender=model, dispatch_uid=f'{uid}_delete')
@@ -0,0 +1,204 @@
+"""
+Optimized copies of the PNG/JPEG files under static/ (``manage.py optimize_static``).
+
+For every static image found by the staticfiles finders, the command writes
+to ``OPTIMIZED_STATIC_ROOT/files``:
+
+* the same path, recompressed, if that saves at least ``MIN_SAVING``: PNGs
+  are re-encoded losslessly at maximum compression, or quantized to a
+  256-colour palette when that is visually identical (RMS error under
+  ``PALETTE_MAX_RMS``, e.g. flat artwork and patterns); JPEGs are re-encoded
+  progressive at quality 85. The directory comes first in
+  ``STATICFILES_DIRS``, so collectstatic and ``{% static %}`` pick the
+  smaller file up without template changes.
+* AVIF and WebP siblings at ``IMAGE_VARIANT_WIDTHS`` (``<path>.w<width>.<ext>``),
+  for the ``{% static_picture %}`` and ``{% static_background %}`` tags.
+
+``OPTIMIZED_STATIC_ROOT/manifest.json`` records, per source path, a hash of
+the file and of the encoder settings, its size and the files written. On the
+next run sources whose hash is unchanged are skipped, and outputs of removed
+sources are deleted. Run it before ``collectstatic`` (deploy.py does).
+"""
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.files.storage import FileSystemStorage
+from PIL import Image, ImageChops, ImageStat
+
+from .processing import FORMATS, available_formats, render_variants
+
+SOURCE_SUFFIXES = ('.png', '.jpg', '.jpeg')
+SIBLING_FORMATS = ('avif', 'webp')
+# Recompressed originals must be at least this much smaller to replace the source
+MIN_SAVING = 0.05
+PALETTE_MAX_RMS = 2.0
+JPEG_OPTIONS = {'quality': 85, 'optimize': True, 'progressive': True}
+# Bump when output names or encoding change so every source is redone
+OUTPUT_VERSION = 2
+
+
+def output_dir():
+    return Path(settings.OPTIMIZED_STATIC_ROOT) / 'files'
+
+
+def manifest_path():
+    return Path(settings.OPTIMIZED_STATIC_ROOT) / 'manifest.json'
+
+
+def _settings_fingerprint():
+    formats = [fmt for fmt in SIBLING_FORMATS if fmt in available_formats()]
+    return repr((OUTPUT_VERSION, sorted(settings.IMAGE_VARIANT_WIDTHS), formats,
+                 [FORMATS[fmt][3] for fmt in formats], MIN_SAVING, PALETTE_MAX_RMS, JPEG_OPTIONS))
+
+
+def source_images():
+    """``{path: storage}`` for every static image, first finder winning as in collectstatic."""
+    found = {}
+    skip = os.path.realpath(output_dir())
+    for finder in finders.get_finders():
+        for path, storage in finder.list(['CVS', '.*', '*~']):
+            if not path.lower().endswith(SOURCE_SUFFIXES) or path in found:
+                continue
+            if os.path.realpath(getattr(storage, 'location', '')) == skip:
+                continue
+            found[path] = storage
+    return found
+
+
+def _digest(storage, path):
+    sha = hashlib.sha256(_settings_fingerprint().encode())
+    with storage.open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _palette(image):
+    """``image`` as a 256-colour palette PNG if that is visually lossless, else ``None``."""
+    if image.mode not in ('RGB', 'RGBA'):
+        return None
+    quantized = image.quantize(256, method=Image.Quantize.FASTOCTREE if image.mode == 'RGBA' else Image.Quantize.MEDIANCUT)
+    difference = ImageChops.difference(image, quantized.convert(image.mode))
+    if max(ImageStat.Stat(difference).rms) > PALETTE_MAX_RMS:
+        return None
+    return quantized
+
+
+def recompress(data):
+    """Smallest acceptable re-encoding of a PNG/JPEG, or ``None`` if nothing beats ``data``."""
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    candidates = []
+    if image.format == 'PNG':
+        for candidate in (_palette(image), image):
+            if candidate is None:
+                continue
+            buffer = io.BytesIO()
+            candidate.save(buffer, 'PNG', optimize=True)
+            candidates.append(buffer.getvalue())
+    elif image.format == 'JPEG':
+        buffer = io.BytesIO()
+        extra = {'icc_profile': image.info['icc_profile']} if image.info.get('icc_profile') else {}
+        image.save(buffer, 'JPEG', exif=image.info.get('exif', b''), **JPEG_OPTIONS, **extra)
+        candidates.append(buffer.getvalue())
+    best = min(candidates, key=len, default=None)
+    if best is None or len(best) > len(data) * (1 - MIN_SAVING):
+        return None
+    return best
+
+
+def optimize_image(path, storage, target):
+    """Write the optimized copy and siblings of ``path``; return its manifest entry."""
+    with storage.open(path, 'rb') as handle:
+        data = handle.read()
+    with Image.open(io.BytesIO(data)) as image:
+        width, height = image.size
+
+    entry = {'width': width, 'height': height, 'size': len(data), 'files': [], 'variants': {}}
+    smaller = recompress(data)
+    if smaller is not None:
+        target_file = Path(target.path(path))
+        target_file.parent.mkdir(parents=True, exist_ok=True)
+        target_file.write_bytes(smaller)
+        entry['optimized_size'] = len(smaller)
+        entry['files'].append(path)
+
+    formats = [fmt for fmt in SIBLING_FORMATS if fmt in available_formats()]
+    for item in render_variants(path, storage=storage, formats=formats, target_storage=target):
+        entry['variants'].setdefault(item['format'], []).append([item['width'], item['name']])
+        entry['files'].append(item['name'])
+    for candidates in entry['variants'].values():
+        candidates.sort()
+    return entry
+
+
+def _remove(target, entry):
+    for name in entry.get('files', []):
+        if target.exists(name):
+            target.delete(name)
+
+
+def optimize_static(force=False, stdout=None):
+    """Bring ``OPTIMIZED_STATIC_ROOT`` up to date; return ``(optimized, skipped, removed)``."""
+    target = FileSystemStorage(location=output_dir())
+    old = read_manifest()
+    manifest = {}
+    optimized = skipped = 0
+    for path, storage in sorted(source_images().items()):
+        digest = _digest(storage, path)
+        previous = old.get(path)
+        if (not force and previous and previous['hash'] == digest
+                and all(target.exists(name) for name in previous['files'])):
+            manifest[path] = previous
+            skipped += 1
+            continue
+        if previous:
+            _remove(target, previous)
+        manifest[path] = {'hash': digest, **optimize_image(path, storage, target)}
+        optimized += 1
+        if stdout:
+            entry = manifest[path]
+            stdout.write(f"{path}: {entry['size']} -> {entry.get('optimized_size', entry['size'])} bytes, "
+                         f"{len(entry['files'])} files")
+
+    removed = [path for path in old if path not in manifest]
+    for path in removed:
+        _remove(target, old[path])
+    write_manifest(manifest)
+    return optimized, skipped, len(removed)
+
+
+def read_manifest():
+    try:
+        with open(manifest_path()) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {}
+
+
+def write_manifest(manifest):
+    path = manifest_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+
+_loaded = {'mtime': None, 'manifest': {}}
+
+
+def static_image(path):
+    """Manifest entry for the static image ``path``, or ``None`` if it has not been optimized."""
+    try:
+        mtime = os.stat(manifest_path()).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if mtime != _loaded['mtime']:
+        _loaded.update(mtime=mtime, manifest=read_manifest())
+    return _loaded['manifest'].get(path)
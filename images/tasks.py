@@ -0,0 +1,13 @@
+from django.apps import apps
+
+from jobs.registry import task
+
+from .variants import generate_variants, refresh_pages
+
+
+@task
+def generate_image_variants(source, model_label=None):
+    count = generate_variants(source)
+    if model_label:
+        refresh_pages(apps.get_model(model_label))
+    return {'source': source, 'variants': count}
@@ -0,0 +1,149 @@
+import mimetypes
+
+from django import template
+from django.conf import settings
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from images.processing import FORMATS
+from images.static_assets import static_image
+from images.thumbnails import parse_size, thumbnail_url
+from images.variants import intrinsic_fields, variants_for
+
+register = template.Library()
+
+
+def _srcset(candidates):
+    return ', '.join(f'{url} {width}w' for width, url in candidates)
+
+
+def _intrinsic(image):
+    """``(width, height, placeholder)`` stored beside ``image`` on its row, if any."""
+    instance = getattr(image, 'instance', None)
+    names = intrinsic_fields(image.field.name) if hasattr(image, 'field') else ()
+    values = tuple(getattr(instance, name, None) for name in names)
+    return values if len(values) == 3 else (None, None, '')
+
+
+def _with_placeholder(attrs, placeholder):
+    """Paint the inline preview behind the ``<img>`` until the image covers it."""
+    if placeholder:
+        style = f"background: center / cover no-repeat url('{placeholder}');"
+        attrs['style'] = f"{style} {attrs['style']}" if attrs.get('style') else style
+    return attrs
+
+
+@register.simple_tag
+def picture(image, sizes='100vw', alt='', fallback=None, **attrs):
+    """
+    ``<picture>`` for an uploaded image, with AVIF/WebP sources and a JPEG
+    ``srcset`` so the browser downloads the smallest file that fills ``sizes``:
+
+        {% picture person.photo sizes='128px' alt=person.full_name class='rounded-full' %}
+
+    Images whose variants have not been generated yet (and empty fields, with
+    ``fallback`` as a static path) render as a plain ``<img>``. Any other
+    keyword becomes an attribute of the ``<img>``. The stored intrinsic size
+    and placeholder become ``width``/``height`` and an inline background.
+    """
+    attrs = {'alt': alt, 'loading': 'lazy', 'decoding': 'async', **attrs}
+    if not image:
+        src = static(fallback) if fallback else ''
+        return format_html('<img src="{}"{}>', src, flatatt(attrs))
+
+    width, height, placeholder = _intrinsic(image)
+    if width and height:
+        # Lets the browser reserve the image's box before it loads
+        attrs.setdefault('width', width)
+        attrs.setdefault('height', height)
+    _with_placeholder(attrs, placeholder)
+
+    variants = variants_for(image.name)
+    fallback_candidates = variants.get('jpeg')
+    if not variants or not fallback_candidates:
+        return format_html('<img src="{}"{}>', image.url, flatatt(attrs))
+
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((FORMATS[fmt][1], _srcset(variants[fmt]), sizes) for fmt in ('avif', 'webp') if fmt in variants),
+    )
+    _, url = fallback_candidates[-1]
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        sources, url, _srcset(fallback_candidates), sizes, flatatt(attrs),
+    )
+
+
+@register.simple_tag
+def thumbnail(image, size, alt='', fallback=None, **attrs):
+    """
+    ``<img>`` of an uploaded image cropped to exactly ``size`` (one of
+    ``THUMBNAIL_SIZES``), with a 2x candidate when that size is listed too:
+
+        {% thumbnail person.photo '128x128' alt=person.full_name class='rounded-full' %}
+    """
+    width, height = parse_size(size)
+    attrs = {'alt': alt, 'width': width, 'loading': 'lazy', 'decoding': 'async', **attrs}
+    if height:
+        attrs.setdefault('height', height)
+    if not image:
+        return format_html('<img src="{}"{}>', static(fallback) if fallback else '', flatatt(attrs))
+
+    intrinsic_width, intrinsic_height, placeholder = _intrinsic(image)
+    if not height and intrinsic_width and intrinsic_height:
+        attrs.setdefault('height', round(min(width, intrinsic_width) * intrinsic_height / intrinsic_width))
+    _with_placeholder(attrs, placeholder)
+
+    double = f'{width * 2}x{height * 2}'
+    if double in settings.THUMBNAIL_SIZES:
+        attrs['srcset'] = f'{thumbnail_url(image, size)} 1x, {thumbnail_url(image, double)} 2x'
+    return format_html('<img src="{}"{}>', thumbnail_url(image, size), flatatt(attrs))
+
+
+def _static_srcset(candidates):
+    return ', '.join(f'{static(name)} {width}w' for width, name in candidates)
+
+
+@register.simple_tag
+def static_picture(path, sizes='100vw', alt='', **attrs):
+    """
+    ``<picture>`` for a static image, with the AVIF/WebP siblings written by
+    ``manage.py optimize_static`` and the (recompressed) original as fallback:
+
+        {% static_picture 'images/hero_services_illustration.png' sizes='(min-width: 768px) 50vw, 100vw' alt='...' %}
+
+    Before the command has run it is a plain ``<img>``.
+    """
+    attrs = {'alt': alt, **attrs}
+    entry = static_image(path)
+    if entry is None:
+        return format_html('<img src="{}"{}>', static(path), flatatt(attrs))
+    attrs.update(width=entry['width'], height=entry['height'])
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((FORMATS[fmt][1], _static_srcset(entry['variants'][fmt]), sizes)
+         for fmt in ('avif', 'webp') if fmt in entry['variants']),
+    )
+    return format_html('<picture>{}<img src="{}"{}></picture>', sources, static(path), flatatt(attrs))
+
+
+@register.simple_tag
+def static_background(path):
+    """
+    ``style`` declarations for a static background image: the original for
+    old browsers, then a CSS ``image-set()`` of the largest AVIF/WebP siblings:
+
+        <div class="bg-cover" style="{% static_background 'images/pattern-light.png' %}"></div>
+    """
+    declaration = format_html("background-image: url('{}');", static(path))
+    entry = static_image(path)
+    if entry is None:
+        return declaration
+    options = [
+        (static(entry['variants'][fmt][-1][1]), FORMATS[fmt][1])
+        for fmt in ('avif', 'webp') if fmt in entry['variants']
+    ]
+    options.append((static(path), mimetypes.guess_type(path)[0]))
+    image_set = format_html_join(', ', "url('{}') type('{}')", options)
+    return format_html('{} background-image: image-set({});', declaration, image_set)
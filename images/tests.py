@@ -0,0 +1,183 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from team.models import Person
+
+from . import static_assets, thumbnails
+from .models import ImageVariant
+from .processing import render_variants, variant_name
+from .variants import generate_variants, record_variants
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'image-tests'}}
+
+
+def image_bytes(fmt, size=(96, 64), color=(200, 40, 40), **options):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def noise_png(size=(64, 64)):
+    buffer = io.BytesIO()
+    Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3)).save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+class TempDirMixin:
+    def make_dir(self):
+        path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        return path
+
+
+class RecompressTests(SimpleTestCase):
+    def test_uncompressed_png_is_replaced(self):
+        data = image_bytes('PNG', size=(200, 200), compress_level=0)
+        smaller = static_assets.recompress(data)
+        self.assertIsNotNone(smaller)
+        self.assertLess(len(smaller), len(data) * (1 - static_assets.MIN_SAVING))
+
+    def test_no_result_below_min_saving(self):
+        self.assertIsNone(static_assets.recompress(noise_png()))
+
+
+@override_settings(
+    STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+    IMAGE_VARIANT_WIDTHS=[32, 64],
+)
+class OptimizeStaticTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        self.source = self.make_dir()
+        (self.source / 'img').mkdir()
+        (self.source / 'img' / 'logo.png').write_bytes(image_bytes('PNG', compress_level=0))
+        (self.source / 'img' / 'logo.jpg').write_bytes(image_bytes('JPEG', quality=100))
+        settings = override_settings(STATICFILES_DIRS=[self.source], OPTIMIZED_STATIC_ROOT=self.make_dir())
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def outputs(self, path):
+        target = static_assets.output_dir()
+        return [target / name for name in static_assets.read_manifest()[path]['files']]
+
+    def test_unchanged_sources_are_skipped(self):
+        self.assertEqual(static_assets.optimize_static(), (2, 0, 0))
+        png_files = self.outputs('img/logo.png')
+        self.assertIn(static_assets.output_dir() / 'img/logo.png.w64.webp', png_files)
+        self.assertTrue(all(path.exists() for path in png_files))
+        # Same stem, different extension: no shared outputs
+        self.assertFalse(set(png_files) & set(self.outputs('img/logo.jpg')))
+
+        self.assertEqual(static_assets.optimize_static(), (0, 2, 0))
+
+    def test_changed_source_or_settings_reprocess(self):
+        static_assets.optimize_static()
+        (self.source / 'img' / 'logo.png').write_bytes(image_bytes('PNG', color=(0, 0, 255), compress_level=0))
+        self.assertEqual(static_assets.optimize_static(), (1, 1, 0))
+        with mock.patch.object(static_assets, 'OUTPUT_VERSION', static_assets.OUTPUT_VERSION + 1):
+            self.assertEqual(static_assets.optimize_static(), (2, 0, 0))
+
+    def test_removed_source_outputs_are_deleted(self):
+        static_assets.optimize_static()
+        jpg_files = self.outputs('img/logo.jpg')
+        (self.source / 'img' / 'logo.jpg').unlink()
+        self.assertEqual(static_assets.optimize_static(), (0, 1, 1))
+        self.assertNotIn('img/logo.jpg', static_assets.read_manifest())
+        self.assertFalse(any(path.exists() for path in jpg_files))
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=[32, 64], IMAGE_VARIANT_FORMATS=['webp'])
+class VariantTests(TempDirMixin, TestCase):
+    def setUp(self):
+        settings = override_settings(MEDIA_ROOT=self.make_dir(), CACHES=LOCMEM)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.clear()
+
+    def save(self, name, fmt):
+        return default_storage.save(name, ContentFile(image_bytes(fmt)))
+
+    def test_names_keep_the_source_extension(self):
+        self.assertEqual(variant_name('person_photos/3.jpg', 256, 'webp'), 'person_photos/3.jpg.w256.webp')
+        storage = FileSystemStorage(location=self.make_dir())
+        for name in ('3.jpg', '3.png'):
+            storage.save(name, ContentFile(image_bytes('PNG' if name.endswith('png') else 'JPEG')))
+        jpg = {item['name'] for item in render_variants('3.jpg', storage=storage, formats=['webp'])}
+        png = {item['name'] for item in render_variants('3.png', storage=storage, formats=['webp'])}
+        self.assertEqual(jpg, {'3.jpg.w32.webp', '3.jpg.w64.webp'})
+        self.assertFalse(jpg & png)
+
+    def test_record_replaces_rows_and_stale_files(self):
+        source = self.save('person_photos/a.jpg', 'JPEG')
+        self.assertEqual(generate_variants(source), 2)
+        files = set(ImageVariant.objects.values_list('file', flat=True))
+
+        kept = render_variants(source, widths=[32], formats=['webp'])
+        record_variants(source, kept)
+        self.assertEqual(list(ImageVariant.objects.values_list('file', flat=True)), [kept[0]['name']])
+        for name in files - {kept[0]['name']}:
+            self.assertFalse(default_storage.exists(name))
+
+    def test_replaced_image_loses_its_variants(self):
+        person = Person.objects.create(full_name='Ram', photo=self.save('person_photos/old.jpg', 'JPEG'))
+        generate_variants('person_photos/old.jpg')
+        old_files = list(ImageVariant.objects.values_list('file', flat=True))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            person.bio = 'Unchanged photo'
+            person.save()
+        self.assertEqual(ImageVariant.objects.filter(source='person_photos/old.jpg').count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            person.photo = self.save('person_photos/new.png', 'PNG')
+            person.save()
+        self.assertFalse(ImageVariant.objects.filter(source='person_photos/old.jpg').exists())
+        self.assertFalse(any(default_storage.exists(name) for name in old_files))
+
+
+@override_settings(CACHES=LOCMEM)
+class ThumbnailCacheTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        self.root = self.make_dir()
+        settings = override_settings(THUMBNAIL_CACHE_DIR=str(self.root), THUMBNAIL_CACHE_MAX_BYTES=1000)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.clear()
+
+    def add(self, name, size, age):
+        path = self.root / name[:2] / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'x' * size)
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+        return path
+
+    def test_evicts_least_recently_used_down_to_target(self):
+        oldest = self.add('aa1.webp', 400, age=300)
+        older = self.add('bb1.webp', 400, age=200)
+        newest = self.add('cc1.webp', 400, age=100)
+        self.assertEqual(thumbnails.evict(), (1, 800))
+        self.assertEqual([oldest.exists(), older.exists(), newest.exists()], [False, True, True])
+
+    def test_account_measures_once_then_evicts_over_cap(self):
+        oldest = self.add('aa1.webp', 500, age=300)
+        self.add('bb1.webp', 300, age=200)
+        thumbnails._account(300)
+        self.assertEqual(cache.get(thumbnails.BYTES_KEY), 800)
+        self.assertTrue(oldest.exists())
+
+        self.add('cc1.webp', 300, age=0)
+        thumbnails._account(300)
+        self.assertFalse(oldest.exists())
+        self.assertEqual(cache.get(thumbnails.BYTES_KEY), 600)
+        self.assertIsNone(cache.get(thumbnails.EVICTION_LOCK))
@@ -0,0 +1,182 @@
+"""
+On-demand thumbnails: ``/media/thumb/<w>x<h>/<path>``.
+
+The first request for a size renders it with ``processing.render_thumbnail``
+and writes it to a disk cache under ``THUMBNAIL_CACHE_DIR``. Later requests
+send the file as it is. Files are content-addressed: the name hashes the
+source path, its size and modification time, the box and the format, so a
+replaced original never serves an old thumbnail. Uploads are never
+overwritten in place (storage adds a suffix to a taken name), so responses
+can be cached by browsers for a year.
+
+* Only sizes listed in ``THUMBNAIL_SIZES`` are rendered, and only for files
+  under the ``upload_to`` directories of the image fields in
+  ``variants.IMAGE_SOURCES``, so the cache cannot be filled with arbitrary
+  sizes or files.
+* Concurrent first requests for one thumbnail share a single render, in
+  this process and across processes (``main.caching.get_or_compute``).
+* The cache is LRU with a size cap: a hit refreshes the file's mtime (at
+  most hourly), and once ``THUMBNAIL_CACHE_MAX_BYTES`` is exceeded the
+  least recently used files are deleted until it is 90% full.
+* AVIF or WebP is served to browsers that accept it, JPEG otherwise
+  (``Vary: Accept``).
+"""
+
+import hashlib
+import os
+import posixpath
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+from main.caching import get_or_compute
+
+from .processing import FORMATS, available_formats, render_thumbnail
+
+BYTES_KEY = 'images:thumbnails:bytes'
+EVICTION_LOCK = 'images:thumbnails:evicting'
+# A hit refreshes the file's mtime (its LRU position) at most this often
+TOUCH_INTERVAL = 60 * 60
+# Eviction stops once the cache is down to this share of the cap
+EVICT_TO = 0.9
+
+
+class ThumbnailNotAllowed(ValueError):
+    """Raised for a size or path the thumbnail view does not serve"""
+
+
+def parse_size(size):
+    """``'128x128'`` -> ``(128, 128)``; raises ``ThumbnailNotAllowed`` unless listed."""
+    if size not in settings.THUMBNAIL_SIZES:
+        raise ThumbnailNotAllowed(f'Size {size} is not in THUMBNAIL_SIZES')
+    width, height = size.split('x')
+    return int(width), int(height)
+
+
+def _allowed_prefixes():
+    from .variants import source_fields
+
+    return tuple(
+        model._meta.get_field(field).upload_to.rstrip('/') + '/'
+        for model, field in source_fields()
+    )
+
+
+def check_source(source):
+    if posixpath.normpath(source) != source or source.startswith(('/', '..')) or not source.startswith(_allowed_prefixes()):
+        raise ThumbnailNotAllowed(f'{source} is not an uploaded image')
+
+
+def thumbnail_url(image, size):
+    return reverse('images:thumbnail', kwargs={'size': size, 'source': image.name})
+
+
+def negotiate_format(accept):
+    """Best format the browser's ``Accept`` header allows; JPEG is always acceptable."""
+    for fmt in available_formats():
+        if fmt == 'jpeg' or FORMATS[fmt][1] in accept:
+            return fmt
+    return 'jpeg'
+
+
+def cache_dir():
+    return Path(settings.THUMBNAIL_CACHE_DIR)
+
+
+def _cache_path(source, width, height, fmt, storage):
+    stamp = storage.get_modified_time(source).timestamp()
+    fingerprint = f'{source}|{storage.size(source)}|{stamp}|{width}x{height}|{fmt}|{FORMATS[fmt][3]}'
+    digest = hashlib.sha256(fingerprint.encode()).hexdigest()
+    return cache_dir() / digest[:2] / f'{digest}.{FORMATS[fmt][2]}'
+
+
+def _touch(path):
+    try:
+        if time.time() - path.stat().st_mtime > TOUCH_INTERVAL:
+            os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def _write(path, data):
+    """Write ``data`` to ``path`` atomically, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def cache_size():
+    return sum(entry.stat().st_size for entry in cache_dir().rglob('*') if entry.is_file())
+
+
+def evict(max_bytes=None):
+    """Delete least recently used thumbnails until the cache is under ``EVICT_TO`` of the cap."""
+    max_bytes = settings.THUMBNAIL_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    files = []
+    for entry in cache_dir().rglob('*'):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        if entry.is_file() and entry.suffix != '.tmp':
+            files.append((stat.st_mtime, stat.st_size, entry))
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    if total > max_bytes:
+        files.sort()
+        for _, size, entry in files:
+            if total <= max_bytes * EVICT_TO:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+    cache.set(BYTES_KEY, total, None)
+    return removed, total
+
+
+def _account(size):
+    # Running total shared by all processes, so eviction only scans the directory when needed
+    try:
+        total = cache.incr(BYTES_KEY, size)
+    except ValueError:
+        # First write since the cache was cleared: measure the directory once
+        total = cache_size()
+        cache.set(BYTES_KEY, total, None)
+    if total > settings.THUMBNAIL_CACHE_MAX_BYTES and cache.add(EVICTION_LOCK, 1, 60):
+        try:
+            evict()
+        finally:
+            cache.delete(EVICTION_LOCK)
+
+
+def get_thumbnail(source, width, height, fmt, storage=None):
+    """Path of the cached thumbnail, rendering it first if needed."""
+    storage = storage or default_storage
+    path = _cache_path(source, width, height, fmt, storage)
+    if path.exists():
+        _touch(path)
+        return path
+
+    def render():
+        if not path.exists():
+            data = render_thumbnail(source, width, height, fmt, storage)
+            _write(path, data)
+            _account(len(data))
+        return str(path)
+
+    get_or_compute(f'images:thumb:{path.stem}', render, timeout=60, beta=0)
+    if not path.exists():
+        # Evicted between the render and now
+        render()
+    return path
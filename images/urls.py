@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'images'
+
+urlpatterns = [
+    # e.g. /media/thumb/128x128/person_photos/3.jpg
+    path('<str:size>/<path:source>', views.thumbnail_view, name='thumbnail'),
+]
@@ -0,0 +1,102 @@
+"""
+Variant records and lookups.
+
+``IMAGE_SOURCES`` lists the image fields that get responsive variants. Each
+also has ``<field>_width``, ``<field>_height`` and ``<field>_placeholder``
+columns, filled when the file is saved (images/signals.py), so pages can
+reserve the image's box and show a blurred preview before it loads.
+Saving a row with a new file queues ``images.generate_image_variants`` on the
+job queue (see images/signals.py), and ``manage.py backfill_image_variants``
+covers existing media. ``variants_for`` is what the ``{% picture %}`` tag
+reads. It is one cache lookup per image, cleared when that image's variants
+are rewritten.
+"""
+
+import hashlib
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+
+from main.caching import bump_version, get_or_compute
+from main.middleware import purge_app
+
+from .models import ImageVariant
+from .processing import render_variants
+
+IMAGE_SOURCES = (
+    ('team.Person', 'photo'),
+    ('updates.NewsArticle', 'image'),
+    ('services.MemberRelief', 'image'),
+)
+LOOKUP_TIMEOUT = 60 * 60 * 24
+
+
+def source_fields():
+    """``(model, field_name)`` for every image field that gets variants."""
+    return [(apps.get_model(label), field) for label, field in IMAGE_SOURCES]
+
+
+def intrinsic_fields(field):
+    """Names of the width, height and placeholder columns stored beside the image ``field``."""
+    return f'{field}_width', f'{field}_height', f'{field}_placeholder'
+
+
+def describe(instance, field, values):
+    """Set ``describe_image``'s ``(width, height, placeholder)`` on ``instance``; ``None`` clears them."""
+    for name, value in zip(intrinsic_fields(field), values or (None, None, '')):
+        setattr(instance, name, value)
+
+
+def _lookup_key(source):
+    return f'images:variants:{hashlib.sha256(source.encode()).hexdigest()}'
+
+
+def variants_for(source):
+    """``{format: [(width, url), ...]}`` for the image ``source``, narrowest first."""
+    def load():
+        found = {}
+        for variant in ImageVariant.objects.filter(source=source).order_by('width'):
+            found.setdefault(variant.format, []).append((variant.width, variant.file.url))
+        return found
+
+    return get_or_compute(_lookup_key(source), load, LOOKUP_TIMEOUT)
+
+
+@transaction.atomic
+def record_variants(source, rendered):
+    """Replace the rows for ``source`` with the files ``render_variants`` just wrote."""
+    keep = {item['name'] for item in rendered}
+    for variant in ImageVariant.objects.filter(source=source):
+        if variant.file.name not in keep:
+            variant.file.delete(save=False)
+    ImageVariant.objects.filter(source=source).delete()
+    ImageVariant.objects.bulk_create([
+        ImageVariant(
+            source=source, width=item['width'], height=item['height'],
+            format=item['format'], file=item['name'], size=item['size'],
+        )
+        for item in rendered
+    ])
+    transaction.on_commit(lambda: cache.delete(_lookup_key(source)))
+
+
+def generate_variants(source):
+    rendered = render_variants(source)
+    record_variants(source, rendered)
+    return len(rendered)
+
+
+@transaction.atomic
+def delete_variants(source):
+    """Remove the variant files and rows of ``source``."""
+    for variant in ImageVariant.objects.filter(source=source):
+        variant.file.delete(save=False)
+    ImageVariant.objects.filter(source=source).delete()
+    transaction.on_commit(lambda: cache.delete(_lookup_key(source)))
+
+
+def refresh_pages(model):
+    """Make cached pages and ETags for ``model`` pick up new variants."""
+    bump_version(model)
+    purge_app(model._meta.app_label)
@@ -0,0 +1,44 @@
+from django.http import FileResponse, Http404
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_safe
+from PIL import UnidentifiedImageError
+
+from .processing import FORMATS
+from .thumbnails import ThumbnailNotAllowed, check_source, get_thumbnail, negotiate_format, parse_size
+
+ONE_YEAR = 60 * 60 * 24 * 365
+
+
+@require_safe
+def thumbnail_view(request, size, source):
+    """Serve ``source`` resized to ``size`` from the thumbnail cache (see images/thumbnails.py)."""
+    try:
+        width, height = parse_size(size)
+        check_source(source)
+    except ThumbnailNotAllowed as exc:
+        raise Http404(str(exc))
+    fmt = negotiate_format(request.headers.get('Accept', ''))
+
+    for _ in range(2):
+        try:
+            path = get_thumbnail(source, width, height, fmt)
+            handle = open(path, 'rb')
+        except FileNotFoundError:
+            # Either the original is gone, or the thumbnail was evicted just now: try once more
+            continue
+        except UnidentifiedImageError:
+            raise Http404(f'{source} is not an image')
+        break
+    else:
+        raise Http404(f'{source} does not exist')
+
+    etag = f'"{path.stem[:32]}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        handle.close()
+    else:
+        response = FileResponse(handle, content_type=FORMATS[fmt][1])
+        response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=ONE_YEAR, immutable=True)
+    patch_vary_headers(response, ['Accept'])
+    return response
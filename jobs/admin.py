@@ -0,0 +1,21 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'queue', 'status', 'priority', 'attempts', 'run_at', 'finished_at', 'duration')
+    list_filter = ('status', 'queue', 'name')
+    search_fields = ('name',)
+    readonly_fields = ('locked_by', 'locked_at', 'result', 'last_error', 'created_at',
+                       'started_at', 'finished_at', 'duration', 'attempts')
+    actions = ['retry_jobs']
+
+    @admin.action(description='Run selected jobs again')
+    def retry_jobs(self, request, queryset):
+        count = queryset.exclude(status=Job.Status.RUNNING).update(
+            status=Job.Status.QUEUED, attempts=0, run_at=timezone.now(), finished_at=None,
+        )
+        self.message_user(request, f'{count} job(s) queued.')
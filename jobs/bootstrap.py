@@ -0,0 +1,19 @@
+"""
+Entry point for worker processes started by ``run_worker --processes N``.
+
+Children are spawned from a fresh interpreter, which imports this module
+before Django is set up, so nothing here may import models at module level.
+"""
+
+import os
+import socket
+
+
+def run_worker_process(queues, poll_interval, burst, index):
+    import django
+    django.setup()
+
+    from .worker import Worker
+
+    worker = Worker(queues, name=f'{socket.gethostname()}:{os.getpid()}:{index}', poll_interval=poll_interval)
+    worker.run(burst=burst)
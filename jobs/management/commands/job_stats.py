@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs.metrics import duration_stats
+
+
+class Command(BaseCommand):
+    help = 'Show per-task job counts and durations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24, help='Look back this many hours')
+
+    def handle(self, *args, **options):
+        stats = duration_stats(since=timezone.now() - timedelta(hours=options['hours']))
+        if not stats:
+            self.stdout.write('No jobs in this period.')
+            return
+
+        def seconds(value):
+            return '-' if value is None else f'{value:.3f}'
+
+        header = f"{'task':<40} {'ok':>6} {'failed':>6} {'queued':>6} {'mean':>8} {'p50':>8} {'p95':>8} {'max':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in stats:
+            self.stdout.write(
+                f"{row['name']:<40} {row['succeeded']:>6} {row['failed']:>6} {row['queued']:>6} "
+                f"{seconds(row['mean']):>8} {seconds(row['p50']):>8} {seconds(row['p95']):>8} {seconds(row['max']):>8}"
+            )
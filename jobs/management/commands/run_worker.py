@@ -0,0 +1,68 @@
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from jobs.bootstrap import run_worker_process
+from jobs.registry import registered_queues
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers (no broker needed; jobs are claimed from the database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.JOB_WORKER_PROCESSES,
+                            help='Number of worker processes')
+        parser.add_argument('--queues', default='',
+                            help='Comma-separated queues to take jobs from (default: every queue with a registered task)')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when no job is due')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no job is due instead of polling')
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        queues = [queue.strip() for queue in options['queues'].split(',') if queue.strip()]
+        if not options['queues']:
+            queues = registered_queues() or ['default']
+        if processes < 1 or not queues:
+            raise CommandError('Give at least one process and one queue.')
+        unserved = [queue for queue in registered_queues() if queue not in queues]
+        if unserved:
+            self.stderr.write(self.style.WARNING(
+                f'Jobs on {", ".join(unserved)} will not run: start another worker with --queues for them.'
+            ))
+
+        if processes == 1:
+            count = Worker(queues, poll_interval=options['poll_interval']).run(burst=options['burst'])
+            self.stdout.write(self.style.SUCCESS(f'Worker stopped after {count} jobs.'))
+            return
+
+        # Children start from a fresh interpreter and open their own connections.
+        connections.close_all()
+        context = multiprocessing.get_context('spawn')
+        children = [
+            context.Process(
+                target=run_worker_process,
+                args=(queues, options['poll_interval'], options['burst'], index),
+                name=f'job-worker-{index}',
+            )
+            for index in range(processes)
+        ]
+        for child in children:
+            child.start()
+        self.stdout.write(f'Started {processes} workers on queues: {", ".join(queues)}')
+
+        def forward(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for child in children:
+            child.join()
+        self.stdout.write(self.style.SUCCESS('All workers stopped.'))
@@ -0,0 +1,54 @@
+"""Per-task duration and outcome statistics over finished jobs."""
+
+import statistics
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Job
+
+
+def _percentile(sorted_values, fraction):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method='inclusive')[round(fraction * 100) - 1]
+
+
+def duration_stats(since=None):
+    """
+    Return one dict per task name with run counts and duration percentiles
+    (seconds) for jobs that finished after ``since`` (default: last 24 hours).
+    """
+    since = since or timezone.now() - timedelta(hours=24)
+    durations = {}
+    finished = (
+        Job.objects.filter(finished_at__gte=since, duration__isnull=False)
+        .order_by()
+        .values_list('name', 'status', 'duration')
+        .iterator()
+    )
+    counts = {}
+    for name, status, duration in finished:
+        durations.setdefault(name, []).append(duration)
+        counts.setdefault(name, {Job.Status.SUCCEEDED: 0, Job.Status.FAILED: 0})
+        counts[name][status] = counts[name].get(status, 0) + 1
+
+    queued = dict(
+        Job.objects.filter(status=Job.Status.QUEUED).order_by().values_list('name').annotate(n=Count('id'))
+    )
+
+    stats = []
+    for name in sorted(set(durations) | set(queued)):
+        values = sorted(durations.get(name, []))
+        stats.append({
+            'name': name,
+            'succeeded': counts.get(name, {}).get(Job.Status.SUCCEEDED, 0),
+            'failed': counts.get(name, {}).get(Job.Status.FAILED, 0),
+            'queued': queued.get(name, 0),
+            'mean': statistics.fmean(values) if values else None,
+            'p50': _percentile(values, 0.50) if values else None,
+            'p95': _percentile(values, 0.95) if values else None,
+            'max': values[-1] if values else None,
+        })
+    return stats
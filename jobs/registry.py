@@ -0,0 +1,95 @@
+"""
+Task registry and enqueueing.
+
+Decorate a function in an app's ``tasks.py`` with ``@task`` to make it
+runnable by the worker; ``JobsConfig.ready`` imports every ``tasks``
+module so the registry is complete in web and worker processes alike.
+Arguments are stored as JSON, so pass ids rather than model instances.
+
+    @task(max_attempts=5)
+    def update_related_articles(article_id):
+        ...
+
+    update_related_articles.enqueue(article.pk)
+    enqueue('updates.update_related_articles', args=[article.pk], delay=30, priority=5)
+
+``manage.py run_worker`` serves every queue that has a registered task
+unless ``--queues`` narrows it down.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Job
+
+_registry = {}
+
+
+class UnknownTask(LookupError):
+    """Raised for a task name that no ``@task`` registered"""
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: object
+    queue: str
+    priority: int
+    max_attempts: int
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, **kwargs):
+        """Queue a call with the task's default options."""
+        return enqueue(self, args=args, kwargs=kwargs)
+
+
+def task(func=None, *, name=None, queue='default', priority=0, max_attempts=3):
+    """Register ``func`` as a task named ``<app>.<function>`` unless ``name`` is given."""
+    def register(func):
+        task_name = name or f"{func.__module__.split('.')[0]}.{func.__name__}"
+        registered = Task(task_name, func, queue, priority, max_attempts)
+        _registry[task_name] = registered
+        return registered
+
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownTask(name) from None
+
+
+def registered_tasks():
+    return dict(_registry)
+
+
+def registered_queues():
+    """Names of the queues that registered tasks run on."""
+    return sorted({registered.queue for registered in _registry.values()})
+
+
+def enqueue(task_or_name, args=(), kwargs=None, *, run_at=None, delay=None,
+            priority=None, queue=None, max_attempts=None):
+    """
+    Queue ``task_or_name`` to run with ``args``/``kwargs``. ``run_at`` (a
+    datetime) or ``delay`` (seconds) schedules it for later; the other
+    options override the task's defaults.
+    """
+    registered = task_or_name if isinstance(task_or_name, Task) else get_task(task_or_name)
+    if run_at is None:
+        run_at = timezone.now() + timedelta(seconds=delay or 0)
+    return Job.objects.create(
+        name=registered.name,
+        queue=queue or registered.queue,
+        args=list(args),
+        kwargs=kwargs or {},
+        priority=registered.priority if priority is None else priority,
+        max_attempts=max_attempts or registered.max_attempts,
+        run_at=run_at,
+    )
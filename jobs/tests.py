@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import Job
+from .registry import enqueue, task
+from .worker import Worker, recover_expired
+
+
+@task(name='jobs.test_outlive_lease', max_attempts=3)
+def outlive_lease():
+    """Runs past its lease: another worker recovers and claims the job meanwhile."""
+    Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+    recover_expired(lease_seconds=900)
+    Worker(name='second').claim()
+    return 'late'
+
+
+@task(name='jobs.test_noop')
+def noop():
+    return 'done'
+
+
+class LeaseTests(TestCase):
+    def test_expired_lease_is_requeued(self):
+        job = enqueue('jobs.test_noop')
+        claimed = Worker(name='first').claim()
+        self.assertEqual(claimed.pk, job.pk)
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(recover_expired(lease_seconds=900), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertEqual(job.locked_by, '')
+
+    def test_expired_lease_is_failed_after_last_attempt(self):
+        job = enqueue('jobs.test_noop', max_attempts=1)
+        Worker(name='first').claim()
+        self.assertEqual(recover_expired(now=timezone.now() + timedelta(hours=1)), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+
+    def test_renewed_lease_is_not_recovered(self):
+        job = enqueue('jobs.test_noop')
+        worker = Worker(name='first')
+        worker.claim()
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertTrue(worker.renew_lease(job))
+        self.assertEqual(recover_expired(lease_seconds=900), 0)
+        self.assertFalse(Worker(name='other').renew_lease(job))
+
+    def test_stale_worker_does_not_overwrite_new_owner(self):
+        job = enqueue('jobs.test_outlive_lease')
+        first = Worker(name='first')
+        self.assertFalse(first.execute(first.claim()))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.RUNNING)
+        self.assertEqual(job.locked_by, 'second')
+        self.assertIsNone(job.result)
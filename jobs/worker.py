@@ -0,0 +1,222 @@
+"""
+Job worker.
+
+A worker repeatedly claims the next due job from its queues and runs it.
+The next job is the one with the highest ``priority``, then the oldest
+``run_at``.
+
+Claiming:
+
+* PostgreSQL: ``SELECT ... FOR UPDATE SKIP LOCKED`` inside a transaction, so
+  concurrent workers skip rows another worker is claiming.
+* SQLite (no row locks): pick the next candidate id and flip it to
+  ``running`` with a conditional ``UPDATE ... WHERE status = 'queued'``.
+  If another process won the race the update touches no rows and the
+  worker tries the next candidate.
+
+A failed job goes back to the queue with exponential backoff until it has
+used ``max_attempts``. While a job runs, a heartbeat thread renews its lease
+(``locked_at``) every third of ``JOB_LEASE_SECONDS``, so long jobs keep it;
+a job whose worker died mid-run is recovered once the lease expires. The
+final status is only written while this worker still holds the lease, so a
+job recovered in the meantime is left to whoever has it now. Every attempt
+records its duration for ``manage.py job_stats``.
+"""
+
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .registry import UnknownTask, get_task
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 60 * 60
+CLAIM_RACE_RETRIES = 5
+# How many idle polls between sweeps for expired leases
+RECOVERY_EVERY = 30
+
+
+def retry_delay(attempts):
+    return min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def recover_expired(lease_seconds=None, now=None):
+    """Requeue (or fail) running jobs whose worker stopped renewing them."""
+    lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+    now = now or timezone.now()
+    expired = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=now - timedelta(seconds=lease_seconds))
+    failed = expired.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.Status.FAILED, finished_at=now, locked_by='', locked_at=None,
+        last_error='Worker lease expired before the job finished.',
+    )
+    requeued = expired.update(status=Job.Status.QUEUED, run_at=now, locked_by='', locked_at=None)
+    return failed + requeued
+
+
+class Worker:
+    def __init__(self, queues=('default',), name=None, poll_interval=1.0):
+        self.queues = list(queues)
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll_interval = poll_interval
+        self.stopping = False
+
+    def _due(self, now):
+        return Job.objects.filter(
+            queue__in=self.queues, status=Job.Status.QUEUED, run_at__lte=now,
+        ).order_by('-priority', 'run_at', 'id')
+
+    def _claimed(self, now):
+        return {
+            'status': Job.Status.RUNNING,
+            'locked_by': self.name,
+            'locked_at': now,
+            'started_at': now,
+            'attempts': F('attempts') + 1,
+        }
+
+    def claim(self):
+        """Claim the next due job, or return None when there is nothing to do."""
+        now = timezone.now()
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                pk = self._due(now).select_for_update(skip_locked=True).values_list('pk', flat=True).first()
+                if pk is None:
+                    return None
+                Job.objects.filter(pk=pk).update(**self._claimed(now))
+            return Job.objects.get(pk=pk)
+
+        for _ in range(CLAIM_RACE_RETRIES):
+            pk = self._due(now).values_list('pk', flat=True).first()
+            if pk is None:
+                return None
+            if Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(**self._claimed(now)):
+                return Job.objects.get(pk=pk)
+        return None
+
+    def _held(self, job):
+        """The job's row, as long as this worker still holds its lease."""
+        return Job.objects.filter(pk=job.pk, locked_by=self.name, status=Job.Status.RUNNING)
+
+    def renew_lease(self, job):
+        """Push the lease expiry forward; False once the job is no longer ours."""
+        return bool(self._held(job).update(locked_at=timezone.now()))
+
+    def _heartbeat(self, job, done):
+        interval = settings.JOB_LEASE_SECONDS / 3
+        try:
+            while not done.wait(interval):
+                if not self.renew_lease(job):
+                    logger.warning('Job %s (%s) lost its lease while running', job.pk, job.name)
+                    return
+        except Exception:
+            logger.exception('Renewing the lease of job %s failed', job.pk)
+        finally:
+            connection.close()
+
+    def execute(self, job):
+        """Run a claimed job and record the outcome."""
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, done), daemon=True)
+        heartbeat.start()
+        try:
+            return self._execute(job)
+        finally:
+            done.set()
+            heartbeat.join()
+
+    def _execute(self, job):
+        started = time.perf_counter()
+        try:
+            registered = get_task(job.name)
+            result = registered.func(*job.args, **job.kwargs)
+        except Exception as exc:
+            duration = time.perf_counter() - started
+            permanent = isinstance(exc, UnknownTask) or job.attempts >= job.max_attempts
+            now = timezone.now()
+            self._held(job).update(
+                status=Job.Status.FAILED if permanent else Job.Status.QUEUED,
+                run_at=job.run_at if permanent else now + timedelta(seconds=retry_delay(job.attempts)),
+                finished_at=now if permanent else None,
+                duration=duration,
+                last_error=traceback.format_exc()[-4000:],
+                locked_at=None,
+            )
+            logger.warning('Job %s (%s) failed on attempt %s: %s', job.pk, job.name, job.attempts, exc)
+            return False
+
+        duration = time.perf_counter() - started
+        recorded = self._held(job).update(
+            status=Job.Status.SUCCEEDED,
+            result=_jsonable(result),
+            finished_at=timezone.now(),
+            duration=duration,
+            last_error='',
+            locked_at=None,
+        )
+        if not recorded:
+            logger.warning('Job %s (%s) finished after its lease was taken over; result not recorded', job.pk, job.name)
+            return False
+        logger.info('Job %s (%s) finished in %.3fs', job.pk, job.name, duration)
+        return True
+
+    def run(self, burst=False, max_jobs=None):
+        """
+        Process jobs until stopped (SIGTERM/SIGINT finish the current job
+        first). With ``burst`` the worker exits once no job is due.
+        """
+        self._install_signal_handlers()
+        processed = 0
+        idle_polls = 0
+        recover_expired()
+        while not self.stopping:
+            close_old_connections()
+            job = self.claim()
+            if job is None:
+                if burst:
+                    break
+                idle_polls += 1
+                if idle_polls % RECOVERY_EVERY == 0:
+                    recover_expired()
+                time.sleep(self.poll_interval)
+                continue
+            idle_polls = 0
+            self.execute(job)
+            processed += 1
+            if max_jobs and processed >= max_jobs:
+                break
+        close_old_connections()
+        return processed
+
+    def _install_signal_handlers(self):
+        def stop(signum, frame):
+            self.stopping = True
+
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                signal.signal(signum, stop)
+            except ValueError:
+                # Not the main thread (e.g. run from a test); rely on the caller to stop us.
+                pass
+
+
+def _jsonable(value):
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return repr(value)
+    return value
+
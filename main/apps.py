@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        from .caching import connect_versioned_models
+        from .middleware import connect_page_purge
+        connect_versioned_models()
+        connect_page_purge()
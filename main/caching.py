@@ -0,0 +1,245 @@
+"""
+Model-versioned caching.
+
+Every model in ``VERSIONED_APPS`` has a version number in the shared cache.
+It is bumped (after the transaction commits) whenever a row of that model is
+saved or deleted. Cache keys built by the helpers here embed the current
+versions of the models a value depends on, so an edit makes every dependent
+entry unreachable at once: editors see their change on the next request,
+readers keep hitting the cache in between, and nothing has to track which
+keys to delete. Stale entries simply expire.
+
+    downloads = cached_queryset('downloads:all', Download.objects.all())
+
+    context['rates'] = cached('services:rates', [SavingsAccount, LoanType], build_rates)
+
+In templates, ``{% model_versions 'team.Staff' as v %}`` from the
+``model_cache`` library gives a token to pass to ``{% cache %}``. Site-wide
+fragments (header, footer) vary on ``site_version()`` instead: the release
+plus a counter that ``manage.py warm_templates --bump-site-version`` moves.
+
+``get_or_compute`` (behind ``cached``) keeps a miss from turning into a
+stampede:
+
+* inside a process, concurrent callers for the same key wait for a single
+  computation (single-flight);
+* across processes, only the caller that wins a short lease in the shared
+  cache computes, while the others poll for its result;
+* shortly before expiry a caller may recompute early, with a probability
+  that rises as expiry nears and with the value's cost (the "XFetch"
+  scheme), so hot keys are usually refreshed before they vanish.
+"""
+
+import hashlib
+import math
+import random
+import threading
+import time
+from typing import Any, NamedTuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+VERSIONED_APPS = ('services', 'updates', 'team', 'downloads')
+VERSION_KEY_PREFIX = 'model-version'
+SITE_VERSION_KEY = 'site-version'
+DEFAULT_TIMEOUT = 60 * 60
+# memcached rejects keys over 250 bytes
+MAX_KEY_LENGTH = 200
+# How long a computing process may hold a key's lease, and how long other
+# processes wait for its result before computing themselves.
+LEASE_SECONDS = 30
+LEASE_WAIT_SECONDS = 10
+LEASE_POLL_SECONDS = 0.05
+# XFetch aggressiveness: 1.0 is the standard choice, higher refreshes earlier.
+EARLY_RECOMPUTE_BETA = 1.0
+
+
+def _model(model_or_label):
+    if isinstance(model_or_label, str):
+        return apps.get_model(model_or_label)
+    return model_or_label
+
+
+def version_key(model):
+    return f'{VERSION_KEY_PREFIX}:{_model(model)._meta.label_lower}'
+
+
+def get_versions(*models):
+    """Current version of each model, fetched in one cache round-trip."""
+    keys = [version_key(model) for model in models]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        # Seed with a timestamp so a cache flush never re-issues an old version.
+        seed = time.time_ns()
+        for key in missing:
+            cache.add(key, seed, None)
+        found.update(cache.get_many(missing))
+    return tuple(found.get(key, 0) for key in keys)
+
+
+def version_token(*models):
+    """Short string that changes whenever any of ``models`` changes."""
+    return '.'.join(str(version) for version in get_versions(*models))
+
+
+def _incr(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, None)
+        return version
+
+
+def bump_version(model):
+    return _incr(version_key(model))
+
+
+def site_version():
+    """Token for fragments shared by every page; changes on deploy and on ``bump_site_version``."""
+    version = cache.get(SITE_VERSION_KEY)
+    if version is None:
+        cache.add(SITE_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(SITE_VERSION_KEY, 0)
+    return f'{settings.RELEASE}.{version}'
+
+
+def bump_site_version():
+    return _incr(SITE_VERSION_KEY)
+
+
+def cache_key(name, models, *parts):
+    """Key for ``name`` that embeds the versions of ``models`` and any extra ``parts``."""
+    key = ':'.join([name, version_token(*models), *(str(part) for part in parts)])
+    if len(key) > MAX_KEY_LENGTH:
+        key = f'{name[:64]}:{hashlib.sha256(key.encode()).hexdigest()}'
+    return key
+
+
+class _Entry(NamedTuple):
+    value: Any
+    # Seconds the last computation took
+    cost: float
+    expires_at: float
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _single_flight(key, compute):
+    """Run ``compute`` once for all threads of this process asking for ``key`` at the same time."""
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    try:
+        flight.value = compute()
+    except Exception as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+    return flight.value
+
+
+def _expires_early(entry, beta):
+    if beta <= 0 or entry.expires_at == math.inf:
+        return False
+    return time.time() - entry.cost * beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+
+def _compute_and_store(key, compute, timeout):
+    started = time.monotonic()
+    value = compute()
+    expires_at = math.inf if timeout is None else time.time() + timeout
+    cache.set(key, _Entry(value, time.monotonic() - started, expires_at), timeout)
+    return value
+
+
+def _compute_under_lease(key, compute, timeout, current):
+    lock_key = f'{key}:lease'
+    if cache.add(lock_key, 1, LEASE_SECONDS):
+        try:
+            return _compute_and_store(key, compute, timeout)
+        finally:
+            cache.delete(lock_key)
+
+    # Another process is computing. An early refresh keeps serving the
+    # current value; a true miss waits for the other process's result.
+    if current is not None:
+        return current.value
+    deadline = time.monotonic() + LEASE_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(LEASE_POLL_SECONDS)
+        entry = cache.get(key)
+        if isinstance(entry, _Entry):
+            return entry.value
+    # The lease holder is slow or died; compute rather than fail the request.
+    return _compute_and_store(key, compute, timeout)
+
+
+def get_or_compute(key, compute, timeout=DEFAULT_TIMEOUT, beta=EARLY_RECOMPUTE_BETA):
+    """
+    Return the value cached under ``key``, calling ``compute()`` to fill it.
+    Concurrent misses for the same key, in this process or others sharing
+    the cache, result in a single ``compute()`` call. ``None`` is a valid
+    value.
+    """
+    entry = cache.get(key)
+    if not isinstance(entry, _Entry):
+        entry = None
+    elif not _expires_early(entry, beta):
+        return entry.value
+    return _single_flight(key, lambda: _compute_under_lease(key, compute, timeout, entry))
+
+
+def cached(name, models, compute, parts=(), timeout=DEFAULT_TIMEOUT):
+    """
+    Return the cached result of ``compute()`` for the current versions of
+    ``models``; ``parts`` (e.g. a page number) further distinguish the key.
+    """
+    return get_or_compute(cache_key(name, models, *parts), compute, timeout)
+
+
+def cached_queryset(name, queryset, models=None, parts=(), timeout=DEFAULT_TIMEOUT):
+    """
+    Evaluate ``queryset`` once per version and return the rows as a list.
+    ``models`` defaults to the queryset's model; include any models pulled
+    in with ``select_related``/``prefetch_related`` as well.
+    """
+    return cached(name, models or [queryset.model], lambda: list(queryset), parts, timeout)
+
+
+def invalidate_model(sender, **kwargs):
+    """Signal receiver: bump ``sender``'s version once the write is committed."""
+    transaction.on_commit(lambda: bump_version(sender))
+
+
+def connect_versioned_models():
+    for label in VERSIONED_APPS:
+        for model in apps.get_app_config(label).get_models():
+            uid = f'model_version_{model._meta.label_lower}'
+            post_save.connect(invalidate_model, sender=model, dispatch_uid=f'{uid}_save')
+            post_delete.connect(invalidate_model, sender=model, dispatch_uid=f'{uid}_delete')
@@ -0,0 +1,58 @@
+"""
+HTTP validators for content pages.
+
+``content_condition(*models)`` returns Django's ``condition`` decorator
+wired to validators derived from the models a page renders:
+
+* ETag: a hash of the models' cache versions (``main.caching``, one cache
+  read and no query), the release, the active language and anything the
+  optional ``extra(request, *args, **kwargs)`` adds. Versions move on every
+  save and delete, so a 304 never hides an edit.
+* Last-Modified: the newest ``updated_at`` across the models, found with one
+  ``Max`` aggregate per model. The result is cached per version, so it is
+  only queried after an edit. It cannot see deletions, but browsers send
+  ``If-None-Match`` along with ``If-Modified-Since``, and the ETag wins.
+
+Pages whose output also depends on something else (the clock, say) pass
+``extra``. They then get only an ETag, because a modification date cannot
+express that dependency.
+
+When a validator matches, the view is not called and nothing is rendered.
+Set ``RELEASE`` on each deploy so changed templates also invalidate
+copies held by browsers.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import translation
+from django.views.decorators.http import condition
+
+from .caching import cached, version_token
+
+
+def _last_modified(models):
+    def newest():
+        stamps = [
+            model.objects.order_by().aggregate(newest=Max('updated_at'))['newest']
+            for model in models
+            if any(field.name == 'updated_at' for field in model._meta.get_fields())
+        ]
+        return max((stamp for stamp in stamps if stamp is not None), default=None)
+
+    return cached('conditional:last-modified', models, newest)
+
+
+def content_condition(*models, extra=None):
+    """``condition`` decorator whose validators change whenever ``models`` do."""
+    def etag(request, *args, **kwargs):
+        parts = [settings.RELEASE, translation.get_language() or '', version_token(*models)]
+        if extra is not None:
+            parts.append(str(extra(request, *args, **kwargs)))
+        return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
+
+    def last_modified(request, *args, **kwargs):
+        return _last_modified(models)
+
+    return condition(etag_func=etag, last_modified_func=None if extra else last_modified)
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .caching import site_version
+
+
+def fragment_cache(request):
+    """Timeout and site version for the ``{% cache %}`` fragments in ``templates/partials``."""
+    return {
+        'fragment_cache_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+        # Only looked up (once) by pages that render a cached fragment
+        'site_version': SimpleLazyObject(site_version),
+    }
@@ -0,0 +1,56 @@
+"""
+Jinja2 environment for the optional Jinja2 rendering path.
+
+Pages listed in ``JINJA2_PAGES`` render from the Jinja2 ports under
+``jinja2/`` and ``<app>/jinja2/``; everything else stays on the Django
+template language (see ``main.templating.engine_for``). The environment
+mirrors DTL closely enough that a port renders byte-for-byte the same page:
+
+* ``finalize`` renders every ``{{ value }}`` as DTL does: localtime,
+  localize, then Django's escaping (``&#x27;`` rather than ``&#39;``).
+* ``static()``/``url()`` stand in for ``{% static %}``/``{% url %}``, and the
+  ``linebreaks``/``floatformat`` filters are Django's own.
+* ``include_dtl()`` renders a DTL partial (the header and footer, with their
+  fragment caching), so there is one source for the shared chrome.
+"""
+
+from django.templatetags.static import static
+from django.template.defaultfilters import floatformat, linebreaks_filter
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.formats import localize
+from django.utils.html import conditional_escape
+from django.utils.timezone import template_localtime
+from jinja2 import Environment, pass_context
+
+
+def render_value(value):
+    """Same text DTL's ``{{ value }}`` produces (with autoescaping on)."""
+    if hasattr(value, '__html__'):
+        return value
+    return conditional_escape(str(localize(template_localtime(value))))
+
+
+def url(viewname, *args, **kwargs):
+    return reverse(viewname, args=args or None, kwargs=kwargs or None)
+
+
+@pass_context
+def include_dtl(context, template_name):
+    # The partials only need the request and the context processors' variables
+    return render_to_string(template_name, request=context.get('request'), using='django')
+
+
+def environment(**options):
+    options.setdefault('keep_trailing_newline', True)
+    env = Environment(finalize=render_value, **options)
+    env.globals.update({
+        'static': static,
+        'url': url,
+        'include_dtl': include_dtl,
+    })
+    env.filters.update({
+        'linebreaks': lambda value: linebreaks_filter(value, autoescape=True),
+        'floatformat': floatformat,
+    })
+    return env
@@ -0,0 +1,136 @@
+import copy
+import statistics
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.backends.jinja2 import Jinja2
+from django.test import Client
+from django.test.utils import override_settings
+
+from main.templating import jinja2_ports, warm_templates
+
+DEFAULT_PATHS = [
+    '/', '/about/', '/services/', '/services/savings/', '/updates/',
+    '/updates/all-news/', '/updates/events/', '/team/', '/downloads/', '/contact/',
+]
+SOURCE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def _templates(loaders):
+    templates = copy.deepcopy(settings.TEMPLATES)
+    templates[0]['APP_DIRS'] = False
+    templates[0]['OPTIONS']['loaders'] = loaders
+    return templates
+
+
+def benchmark_modes():
+    """Settings for each configuration being compared, in report order."""
+    cached_loader = _templates([('django.template.loaders.cached.Loader', SOURCE_LOADERS)])
+    return {
+        # Templates re-read and re-parsed on every request, fragments rendered every time
+        'before': {'TEMPLATES': _templates(SOURCE_LOADERS), 'FRAGMENT_CACHE_TIMEOUT': 0},
+        # Production setup: cached loader, warmed at startup, fragments cached
+        'after': {'TEMPLATES': cached_loader, 'JINJA2_PAGES': []},
+        # As 'after', with every page that has a Jinja2 port rendered by Jinja2
+        'jinja2': {'TEMPLATES': cached_loader, 'JINJA2_PAGES': jinja2_ports(engines['jinja2'])},
+    }
+
+
+@contextmanager
+def recording_jinja2_pages(names):
+    """Add the name of every page template the Jinja2 backend loads to ``names``."""
+    get_template = Jinja2.get_template
+
+    def recording(backend, template_name):
+        names.add(template_name)
+        return get_template(backend, template_name)
+
+    with mock.patch.object(Jinja2, 'get_template', recording):
+        yield
+
+
+class Command(BaseCommand):
+    help = (
+        'Time full page renders (middleware, view, template) under each template configuration '
+        'and check every configuration produces the same HTML. The full-page cache is bypassed; '
+        'data caches are warmed first so only rendering differs. The after->jinja2 column is only '
+        'filled in for pages with a Jinja2 port, and the gain there is small: about 1.0x on / and '
+        '1.3x on /services/savings/ when last measured.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help=f'Paths to request (default: {" ".join(DEFAULT_PATHS)})')
+        parser.add_argument('--requests', type=int, default=100, help='Timed requests per path and mode (default 100)')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per path first (default 5)')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or DEFAULT_PATHS
+        modes = benchmark_modes()
+        results = {}
+        bodies = {}
+        jinja2_pages = {}
+        for mode, overrides in modes.items():
+            with override_settings(DEBUG=False, ALLOWED_HOSTS=['*'], PAGE_CACHE_ENABLED=False, **overrides):
+                if mode != 'before':
+                    warm_templates()
+                for path in paths:
+                    with recording_jinja2_pages(jinja2_pages.setdefault(path, set())):
+                        results[mode, path], bodies[mode, path] = self._time(
+                            path, options['warmup'], options['requests'],
+                        )
+
+        names = list(modes)
+        # Each step's gain over the configuration before it, so the Jinja2
+        # column is measured against cached DTL rather than the uncached baseline
+        steps = list(zip(names, names[1:]))
+        header = (
+            f"{'path':<24}" + ''.join(f'{name + " ms":>14}{"p95":>9}' for name in names)
+            + ''.join(f'{f"{slow}->{fast}":>16}' for slow, fast in steps) + f'{"same HTML":>11}'
+        )
+        self.stdout.write('Speedup columns: mean time of the left configuration / mean time of the right one.')
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for path in paths:
+            row = f'{path:<24}'
+            for name in names:
+                mean, p95 = results[name, path]
+                row += f'{mean:>14.2f}{p95:>9.2f}'
+            for slow, fast in steps:
+                slow_mean, fast_mean = results[slow, path][0], results[fast, path][0]
+                # Without a port both configurations render the same DTL page:
+                # any difference between them is noise, not a speedup
+                unported = fast == 'jinja2' and not jinja2_pages[path]
+                row += f'{"-":>16}' if unported or not fast_mean else f'{slow_mean / fast_mean:>15.2f}x'
+            row += f'{self._same_output(bodies, names, path):>11}'
+            self.stdout.write(row)
+
+    def _same_output(self, bodies, names, path):
+        first, again = bodies[names[0], path]
+        if first != again:
+            # Per-request content such as a CSRF token
+            return 'varies'
+        return 'yes' if all(bodies[name, path][0] == first for name in names) else 'NO'
+
+    def _time(self, path, warmup, requests):
+        """Return ``((mean_ms, p95_ms), (first_body, last_body))`` for ``path``."""
+        client = Client()
+        for _ in range(warmup):
+            client.get(path)
+        samples = []
+        responses = []
+        for _ in range(requests):
+            # Fresh cookies each time, as a first-time visitor would have
+            client.cookies.clear()
+            started = time.perf_counter()
+            responses.append(client.get(path))
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return (statistics.fmean(samples), p95), (responses[0].content, responses[-1].content)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.caching import bump_site_version
+from main.templating import warm_templates
+
+
+class Command(BaseCommand):
+    help = 'Compile every template (fails if any does not parse) and optionally retire cached site fragments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bump-site-version', action='store_true',
+            help='Invalidate the cached header/footer fragments (run after a deploy).',
+        )
+
+    def handle(self, *args, **options):
+        compiled, failures = warm_templates()
+        for name, exc in failures:
+            self.stderr.write(f'{name}: {exc}')
+        if options['bump_site_version']:
+            bump_site_version()
+            self.stdout.write('Site version bumped.')
+        if failures:
+            raise CommandError(f'{len(failures)} template(s) failed to compile.')
+        self.stdout.write(self.style.SUCCESS(f'Compiled {compiled} templates.'))
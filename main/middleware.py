@@ -0,0 +1,193 @@
+"""
+Full-page cache for anonymous visitors.
+
+``PageCacheMiddleware`` stores rendered responses to anonymous ``GET``
+requests for the paths listed in ``PAGE_CACHE_RULES`` (first matching
+regex wins; a TTL of ``None`` opts the path out). The cache key covers
+host, path, sorted query string and active language.
+
+Requests are passed straight through when they carry a session or CSRF
+cookie or an ``Authorization`` header, so editors always see live pages.
+Responses are only stored when they set no cookies and do not vary on
+``Cookie``. That keeps pages with a per-visitor CSRF token out of the cache.
+A cached page's ETag/Last-Modified are checked against the request's
+validators, so a repeat visitor gets a 304 even from the cache.
+
+Entries outlive their TTL by ``PAGE_CACHE_STALE_SECONDS``. In that window
+the stale copy is served while a single ``GET``, chosen with a short cache
+lock, regenerates the page in a background thread from its own copy of the
+request.
+
+Each app in ``PAGE_CACHE_PURGE_PREFIXES`` maps to the URL prefixes its
+models appear under. Saving or deleting one of its rows bumps a
+generation counter for those prefixes. Every key embeds the generations
+of the prefixes its path falls under, so a purge retires the whole
+subtree at once.
+"""
+
+import hashlib
+import io
+import logging
+import re
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import translation
+from django.utils.cache import cc_delim_re, get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'pagecache'
+REFRESH_LOCK_SECONDS = 30
+
+
+def _generation_key(prefix):
+    return f'{KEY_PREFIX}:gen:{prefix}'
+
+
+def _purge_prefixes():
+    return sorted({prefix for prefixes in settings.PAGE_CACHE_PURGE_PREFIXES.values() for prefix in prefixes})
+
+
+def purge_prefix(prefix):
+    """Invalidate every cached page whose path starts with ``prefix``."""
+    key = _generation_key(prefix)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def page_key(request):
+    path = request.path
+    prefixes = [prefix for prefix in _purge_prefixes() if path.startswith(prefix)]
+    generations = cache.get_many([_generation_key(prefix) for prefix in prefixes])
+    token = '.'.join(str(generations.get(_generation_key(prefix), 0)) for prefix in prefixes)
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    language = getattr(request, 'LANGUAGE_CODE', None) or translation.get_language() or ''
+    digest = hashlib.sha256(f'{request.get_host()}|{path}|{query}|{language}'.encode()).hexdigest()
+    return f'{KEY_PREFIX}:{token}:{digest}'
+
+
+def _conditional(request, response):
+    last_modified = response.get('Last-Modified')
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(last_modified) if last_modified else None,
+        response=response,
+    )
+
+
+def _is_cacheable(response):
+    if response.streaming or response.status_code != 200 or response.cookies:
+        return False
+    vary = {header.lower() for header in cc_delim_re.split(response.get('Vary', ''))}
+    if 'cookie' in vary or '*' in vary:
+        return False
+    cache_control = response.get('Cache-Control', '').lower()
+    return 'private' not in cache_control and 'no-store' not in cache_control
+
+
+def _detached_copy(request):
+    """
+    A new ``GET`` request for the same URL and headers, minus validators,
+    for the background refresh. The middleware and view below mutate the
+    request they get, and the visitor's request is still in use.
+    """
+    environ = {
+        name: value for name, value in request.META.items()
+        if name not in ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+    }
+    environ.update({'REQUEST_METHOD': 'GET', 'CONTENT_LENGTH': '0', 'wsgi.input': io.BytesIO()})
+    return WSGIRequest(environ)
+
+
+class PageCacheMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.rules = [(re.compile(pattern), ttl) for pattern, ttl in settings.PAGE_CACHE_RULES]
+
+    def _ttl(self, request):
+        if not settings.PAGE_CACHE_ENABLED or request.method not in ('GET', 'HEAD'):
+            return None
+        cookies = request.COOKIES
+        if settings.SESSION_COOKIE_NAME in cookies or settings.CSRF_COOKIE_NAME in cookies:
+            return None
+        if 'HTTP_AUTHORIZATION' in request.META:
+            return None
+        for pattern, ttl in self.rules:
+            if pattern.match(request.path):
+                return ttl
+        return None
+
+    def __call__(self, request):
+        ttl = self._ttl(request)
+        if ttl is None:
+            return self.get_response(request)
+
+        key = page_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            stored_at, response = entry
+            age = time.time() - stored_at
+            if age < ttl:
+                response['X-Page-Cache'] = 'HIT'
+                return _conditional(request, response)
+            # Only a GET can store the page again, so only a GET takes the lock
+            if request.method == 'GET' and cache.add(f'{key}:lock', 1, REFRESH_LOCK_SECONDS):
+                if not settings.PAGE_CACHE_BACKGROUND_REFRESH:
+                    try:
+                        return self._render(request, key, ttl)
+                    finally:
+                        cache.delete(f'{key}:lock')
+                threading.Thread(
+                    target=self._refresh, args=(_detached_copy(request), key, ttl), daemon=True,
+                ).start()
+            response['X-Page-Cache'] = 'STALE'
+            return _conditional(request, response)
+
+        return self._render(request, key, ttl)
+
+    def _render(self, request, key, ttl):
+        response = self.get_response(request)
+        if request.method == 'GET' and _is_cacheable(response):
+            cache.set(key, (time.time(), response), ttl + settings.PAGE_CACHE_STALE_SECONDS)
+        response['X-Page-Cache'] = 'MISS'
+        return response
+
+    def _refresh(self, request, key, ttl):
+        try:
+            self._render(request, key, ttl)
+        except Exception:
+            logger.exception('Background refresh of %s failed', request.path)
+        finally:
+            cache.delete(f'{key}:lock')
+            # This thread's own database connections
+            connections.close_all()
+
+
+def purge_app(app_label):
+    """Invalidate the pages listed for ``app_label`` in ``PAGE_CACHE_PURGE_PREFIXES``."""
+    for prefix in settings.PAGE_CACHE_PURGE_PREFIXES.get(app_label, ()):
+        purge_prefix(prefix)
+
+
+def _purge_for(sender, **kwargs):
+    transaction.on_commit(lambda: purge_app(sender._meta.app_label))
+
+
+def connect_page_purge():
+    for label in settings.PAGE_CACHE_PURGE_PREFIXES:
+        for model in apps.get_app_config(label).get_models():
+            uid = f'page_purge_{model._meta.label_lower}'
+            post_save.connect(_purge_for, sender=model, dispatch_uid=f'{uid}_save')
+            post_delete.connect(_purge_for, sender=model, dispatch_uid=f'{uid}_delete')
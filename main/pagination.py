@@ -0,0 +1,139 @@
+"""
+Keyset (cursor) pagination.
+
+``django.core.paginator.Paginator`` runs a ``COUNT(*)`` and an ``OFFSET``
+scan for every page, so deep archive pages get slower as tables grow.
+``KeysetPaginator`` instead remembers the sort key of the first/last row on
+the page in an opaque token and asks for the rows just before/after it,
+which an index on the same columns answers directly on every page.
+
+The ordering must end in a unique column (normally ``id``) so that every row
+has a distinct key.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def _encode(direction, values):
+    payload = [direction, [v.isoformat() if isinstance(v, datetime) else v for v in values]]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+def _decode(token, fields):
+    """
+    Return ``(direction, values)`` for a token, or ``None`` if it is invalid.
+    Tokens come from the query string, so each value is checked against the
+    type of its ordering field before it reaches a query.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        direction, values = json.loads(raw)
+        if direction not in ('next', 'prev') or not isinstance(values, list) or len(values) != len(fields):
+            return None
+        values = [field.clean(value) for field, value in zip(fields, values)]
+    except (ValueError, TypeError, binascii.Error, ValidationError):
+        return None
+    return direction, values
+
+
+class _KeyField:
+    def __init__(self, spec, model):
+        self.descending = spec.startswith('-')
+        self.name = spec.lstrip('-')
+        self.field = model._meta.get_field(self.name)
+
+    def clean(self, value):
+        """``value`` from a token as this field's Python type; raises on anything else."""
+        if value is None or isinstance(value, (bool, list, dict)):
+            raise ValidationError('Invalid cursor value')
+        return self.field.to_python(value)
+
+
+class KeysetPage:
+    """One page of results, iterable like ``django.core.paginator.Page``"""
+
+    def __init__(self, object_list, next_token, previous_token):
+        self.object_list = object_list
+        self.next_token = next_token
+        self.previous_token = previous_token
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_token is not None
+
+    def has_previous(self):
+        return self.previous_token is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by ``ordering`` (e.g. ``('-published_date', '-id')``)
+    using opaque next/previous tokens instead of page numbers.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.fields = [_KeyField(spec, queryset.model) for spec in ordering]
+        self.per_page = per_page
+
+    def _order_by(self, reverse):
+        return [
+            ('-' if field.descending != reverse else '') + field.name
+            for field in self.fields
+        ]
+
+    def _after(self, values, reverse):
+        """Q object selecting rows strictly after ``values`` in the (possibly reversed) order."""
+        condition = Q()
+        for i, field in enumerate(self.fields):
+            lookup = 'lt' if field.descending != reverse else 'gt'
+            clause = Q(**{f'{field.name}__{lookup}': values[i]})
+            for previous, value in zip(self.fields[:i], values[:i]):
+                clause &= Q(**{previous.name: value})
+            condition |= clause
+        return condition
+
+    def _key(self, obj):
+        return [getattr(obj, field.name) for field in self.fields]
+
+    def get_page(self, token):
+        """Return the page identified by ``token``; a missing or bad token gives the first page."""
+        cursor = _decode(token, self.fields)
+        direction, values = cursor if cursor else ('next', None)
+        reverse = direction == 'prev'
+
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self._after(values, reverse))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage([], None, None)
+        # Coming from a cursor means there is a page on the side we came from.
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else values is not None
+        return KeysetPage(
+            rows,
+            _encode('next', self._key(rows[-1])) if has_next else None,
+            _encode('prev', self._key(rows[0])) if has_previous else None,
+        )
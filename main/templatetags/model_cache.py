@@ -0,0 +1,17 @@
+from django import template
+
+from main.caching import version_token
+
+register = template.Library()
+
+
+@register.simple_tag
+def model_versions(*labels):
+    """
+    Version token for the given models, for use as a ``{% cache %}`` vary-on
+    argument so the fragment is re-rendered after any of them changes:
+
+        {% model_versions 'team.Staff' 'team.Person' as team_version %}
+        {% cache 3600 management_team team_version %}...{% endcache %}
+    """
+    return version_token(*labels)
@@ -0,0 +1,91 @@
+"""
+Template engine selection and warm-up.
+
+``engine_for(name)`` picks the engine for a page: the Jinja2 port when the
+template is listed in ``JINJA2_PAGES``, the Django template language
+otherwise. Function views pass it as ``render(..., using=...)``, and class
+views mix in ``EngineChoiceMixin``.
+
+With the cached loader (always on in production) each worker compiles a
+template the first time it renders it, so the first visitors after a
+restart pay for parsing ``base.html`` and its partials. ``warm_templates``
+compiles every template the loaders can see (``templates/`` and each app's
+``templates`` directory) up front. ``coop/wsgi.py`` calls it at startup
+when ``TEMPLATE_WARMUP`` is on, and ``manage.py warm_templates`` runs it
+as a deploy-time check that everything still parses. Jinja2 ports are
+compiled too.
+"""
+
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.backends.jinja2 import Jinja2
+from jinja2 import TemplateError as JinjaTemplateError
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = ('.html', '.txt', '.xml')
+
+
+def engine_for(template_name):
+    return 'jinja2' if template_name in settings.JINJA2_PAGES else 'django'
+
+
+class EngineChoiceMixin:
+    """Render a template view's ``template_name`` with the engine ``JINJA2_PAGES`` selects."""
+
+    @property
+    def template_engine(self):
+        return engine_for(self.template_name)
+
+
+def _loader_dirs(loaders):
+    for loader in loaders:
+        if hasattr(loader, 'loaders'):
+            # cached.Loader wraps the loaders that do the finding
+            yield from _loader_dirs(loader.loaders)
+        elif hasattr(loader, 'get_dirs'):
+            yield from loader.get_dirs()
+
+
+def template_names(engine):
+    """Names of every template file under the directories ``engine`` loads from."""
+    names = set()
+    for directory in _loader_dirs(engine.template_loaders):
+        root = Path(directory)
+        if not root.is_dir():
+            continue
+        for path in root.rglob('*'):
+            if path.suffix in TEMPLATE_SUFFIXES and path.is_file():
+                names.add(path.relative_to(root).as_posix())
+    return sorted(names)
+
+
+def jinja2_ports(backend):
+    """Page templates with a Jinja2 port (``base.html`` is only extended)."""
+    return [name for name in backend.env.list_templates(extensions=['html']) if name != 'base.html']
+
+
+def warm_templates():
+    """Compile every Django and Jinja2 template; return ``(compiled, failures)``."""
+    compiled = 0
+    failures = []
+    for backend in engines.all():
+        if isinstance(backend, DjangoTemplates):
+            names, get_template = template_names(backend.engine), backend.engine.get_template
+        elif isinstance(backend, Jinja2):
+            names, get_template = backend.env.list_templates(), backend.env.get_template
+        else:
+            continue
+        for name in names:
+            try:
+                get_template(name)
+            except (TemplateSyntaxError, TemplateDoesNotExist, JinjaTemplateError, UnicodeDecodeError) as exc:
+                failures.append((name, exc))
+                logger.warning('Template %s failed to compile: %s', name, exc)
+            else:
+                compiled += 1
+    return compiled, failures
@@ -1,3 +1,197 @@
-from django.test import TestCase
+import base64
+import json
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from updates.models import Event
+
+from . import caching, middleware, views
+from .pagination import KeysetPaginator
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'stampede-tests'}}
+
+
+def fire(count, target):
+    """Call ``target`` from ``count`` threads released at the same moment; return their results."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+    errors = []
+
+    def run(index):
+        barrier.wait()
+        try:
+            results[index] = target()
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return results
+
+
+class SlowCounter:
+    def __init__(self, value='value', delay=0.2):
+        self.calls = 0
+        self.value = value
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+@override_settings(CACHES=LOCMEM)
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_misses_compute_once(self):
+        compute = SlowCounter()
+        results = fire(16, lambda: caching.get_or_compute('stampede:key', compute))
+        self.assertEqual(compute.calls, 1)
+        self.assertEqual(results, ['value'] * 16)
+
+    def test_waits_for_lease_held_by_another_process(self):
+        compute = SlowCounter()
+        cache.add('stampede:key:lease', 1)
+        other_process = threading.Timer(0.2, caching._compute_and_store, args=('stampede:key', lambda: 'theirs', 60))
+        other_process.start()
+        self.assertEqual(caching.get_or_compute('stampede:key', compute), 'theirs')
+        other_process.join()
+        self.assertEqual(compute.calls, 0)
+
+    def test_early_recompute_serves_current_value_while_leased(self):
+        caching._compute_and_store('stampede:key', lambda: 'old', 60)
+        cache.add('stampede:key:lease', 1)
+        with mock.patch.object(caching, '_expires_early', return_value=True):
+            self.assertEqual(caching.get_or_compute('stampede:key', SlowCounter('new')), 'old')
+
+    def test_none_is_cached(self):
+        compute = SlowCounter(value=None, delay=0)
+        caching.get_or_compute('stampede:key', compute)
+        caching.get_or_compute('stampede:key', compute)
+        self.assertEqual(compute.calls, 1)
+
+
+@override_settings(CACHES=LOCMEM, PAGE_CACHE_ENABLED=False)
+class ConcurrentRequestTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_about_page_rebuilt_once(self):
+        build = SlowCounter(value=views.empty_about_context())
+        with mock.patch.object(views, 'build_about_context', build):
+            responses = fire(8, lambda: Client().get('/about/'))
+        self.assertEqual(build.calls, 1)
+        self.assertEqual({response.status_code for response in responses}, {200})
+
+
+def forge(direction, values):
+    return base64.urlsafe_b64encode(json.dumps([direction, values]).encode()).decode()
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        start = timezone.now()
+        Event.objects.bulk_create(
+            Event(title=f'Event {i}', description='', event_date=start + timedelta(days=i)) for i in range(5)
+        )
+
+    def paginator(self):
+        return KeysetPaginator(Event.objects.all(), ('event_date', 'id'), 2)
+
+    def test_tokens_walk_every_row(self):
+        paginator = self.paginator()
+        first = paginator.get_page(None)
+        second = paginator.get_page(first.next_token)
+        self.assertEqual([e.title for e in second], ['Event 2', 'Event 3'])
+        self.assertEqual(list(paginator.get_page(second.previous_token)), list(first))
+
+    def test_forged_cursor_gives_first_page(self):
+        first = [e.pk for e in self.paginator().get_page(None)]
+        date = timezone.now().isoformat()
+        for token in (
+            forge('next', [date, 'abc']),
+            forge('next', [12345, 1]),
+            forge('next', [[date], 1]),
+            forge('next', [None, 1]),
+            forge('next', [date, {'id': 1}]),
+            forge('next', 'ab'),
+            forge('sideways', [date, 1]),
+            'not base64!',
+        ):
+            with self.subTest(token=token):
+                self.assertEqual([e.pk for e in self.paginator().get_page(token)], first)
+
+    def test_forged_cursor_on_list_page(self):
+        response = self.client.get('/updates/events/', {'cursor': forge('next', ['2025-01-01', 'x'])})
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(
+    CACHES=LOCMEM, PAGE_CACHE_ENABLED=True, PAGE_CACHE_RULES=[(r'^/page/', 60)], PAGE_CACHE_STALE_SECONDS=300,
+    PAGE_CACHE_BACKGROUND_REFRESH=True, PAGE_CACHE_PURGE_PREFIXES={},
+)
+class StaleRefreshTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.seen = []
+        self.done = threading.Event()
+
+    def get_response(self, request):
+        self.seen.append(request)
+        request.mutated = True
+        self.done.set()
+        return HttpResponse('fresh', status=self.status)
+
+    def serve_stale(self, method='get', status=200, **headers):
+        self.status = status
+        cache_middleware = middleware.PageCacheMiddleware(self.get_response)
+        request = getattr(RequestFactory(), method)('/page/', headers=headers)
+        key = middleware.page_key(request)
+        cache.set(key, (time.time() - 120, HttpResponse('stale')), 600)
+        response = cache_middleware(request)
+        self.assertEqual(response['X-Page-Cache'], 'STALE')
+        return request, key
+
+    def test_refresh_renders_a_copy_of_the_request(self):
+        request, key = self.serve_stale(**{'If-None-Match': '"old"'})
+        self.assertTrue(self.done.wait(5))
+        time.sleep(0.05)
+        refreshed, = self.seen
+        self.assertIsNot(refreshed, request)
+        self.assertFalse(hasattr(request, 'mutated'))
+        self.assertNotIn('HTTP_IF_NONE_MATCH', refreshed.META)
+        self.assertEqual(cache.get(key)[1].content, b'fresh')
+        self.assertIsNone(cache.get(f'{key}:lock'))
+
+    def test_uncacheable_refresh_releases_lock(self):
+        _, key = self.serve_stale(status=500)
+        self.assertTrue(self.done.wait(5))
+        time.sleep(0.05)
+        self.assertEqual(cache.get(key)[1].content, b'stale')
+        self.assertIsNone(cache.get(f'{key}:lock'))
+
+    def test_stale_head_does_not_take_lock(self):
+        _, key = self.serve_stale(method='head')
+        self.assertIsNone(cache.get(f'{key}:lock'))
+        self.assertEqual(self.seen, [])
@@ -1,19 +1,36 @@
 from django.shortcuts import render
 from team.models import Committee, Membership, Person
 
+from .caching import cached
+from .conditional import content_condition
+from .templating import engine_for
+
 def index(request):
     """
     View for the homepage.
     """
-    return render(request, 'main/index.html')
+    return render(request, 'main/index.html', using=engine_for('main/index.html'))
 
-def about_view(request):
-    """
-    View for the 'About Us' page.
-    It fetches all the necessary data for the detailed template, including
-    different committees, leadership messages, and other context.
-    """
-    context = {
+# Committee name keywords (English and Nepali) mapped to about-page context keys
+COMMITTEE_SECTIONS = {
+    'Board of Directors': 'board_members',
+    'सञ्चालक समिति': 'board_members',
+    'Account Supervisor': 'account_supervisor_committee',
+    'लेखा समिति': 'account_supervisor_committee',
+    'Branch Management': 'branch_management_sub_committee',
+    'सेवा केन्द्र': 'branch_management_sub_committee',
+    'Loan Subcommittee': 'loan_subcommittee',
+    'ऋण उपसमिति': 'loan_subcommittee',
+    'Advisory': 'advisory_committee',
+    'सल्लाहकार': 'advisory_committee',
+    'Management Team': 'management_team',
+    'कर्मचारी': 'management_team',
+}
+ABOUT_MODELS = (Committee, Membership, Person)
+
+
+def empty_about_context():
+    return {
         'board_members': [],
         'account_supervisor_committee': [],
         'branch_management_sub_committee': [],
@@ -25,53 +42,48 @@ def about_view(request):
         'former_committees_names': [],
     }
 
-    try:
-        # Fetch all active committees and their members efficiently
-        active_committees = Committee.objects.filter(is_active=True).prefetch_related('memberships__person').order_by('order')
-        
-        # A dictionary to map committee names (keywords) to context keys
-        committee_map = {
-            'Board of Directors': 'board_members',
-            'सञ्चालक समिति': 'board_members',
-            'Account Supervisor': 'account_supervisor_committee',
-            'लेखा समिति': 'account_supervisor_committee',
-            'Branch Management': 'branch_management_sub_committee',
-            'सेवा केन्द्र': 'branch_management_sub_committee',
-            'Loan Subcommittee': 'loan_subcommittee',
-            'ऋण उपसमिति': 'loan_subcommittee',
-            'Advisory': 'advisory_committee',
-            'सल्लाहकार': 'advisory_committee',
-            'Management Team': 'management_team',
-            'कर्मचारी': 'management_team',
-        }
 
-        # Populate the context dictionary based on committee names
-        for committee in active_committees:
-            for keyword, key in committee_map.items():
-                if keyword in committee.name:
-                    context[key] = committee.memberships.order_by('order')
-                    break
-        
-        # Specifically find the Chairman and Manager for the message section
-        if context['board_members']:
-            chairman_membership = context['board_members'].filter(position__icontains='Chairman').first()
-            if not chairman_membership:
-                chairman_membership = context['board_members'].filter(position__icontains='अध्यक्ष').first()
-            if chairman_membership:
-                context['chairman'] = chairman_membership.person
+def _find_person(memberships, *titles):
+    """Person holding the first of ``titles`` (checked in order) in ``memberships``."""
+    for title in titles:
+        for membership in memberships:
+            if title.lower() in membership.position.lower():
+                return membership.person
+    return None
+
 
-        if context['management_team']:
-            manager_membership = context['management_team'].filter(position__icontains='Manager').first()
-            if not manager_membership:
-                manager_membership = context['management_team'].filter(position__icontains='व्यवस्थापक').first()
-            if manager_membership:
-                context['manager'] = manager_membership.person
-                
-        # Fetch names of former committees
-        context['former_committees_names'] = Committee.objects.filter(is_active=False).values_list('name', flat=True).order_by('-tenure_bs')
+def build_about_context():
+    """Evaluate everything the about page shows, ready to be cached."""
+    context = empty_about_context()
+    active_committees = Committee.objects.filter(is_active=True).prefetch_related('memberships__person').order_by('order')
 
+    for committee in active_committees:
+        for keyword, key in COMMITTEE_SECTIONS.items():
+            if keyword in committee.name:
+                context[key] = sorted(committee.memberships.all(), key=lambda membership: membership.order)
+                break
+
+    context['chairman'] = _find_person(context['board_members'], 'Chairman', 'अध्यक्ष')
+    context['manager'] = _find_person(context['management_team'], 'Manager', 'व्यवस्थापक')
+    context['former_committees_names'] = list(
+        Committee.objects.filter(is_active=False).values_list('name', flat=True).order_by('-tenure_bs')
+    )
+    return context
+
+
+@content_condition(*ABOUT_MODELS)
+def about_view(request):
+    """
+    View for the 'About Us' page.
+    It shows the active committees, leadership messages and former
+    committees. The data is cached until a team record changes, and
+    concurrent misses share one rebuild.
+    """
+    try:
+        context = cached('main:about', ABOUT_MODELS, build_about_context)
     except Exception as e:
         # This will prevent the page from crashing if there's a database error
         print(f"Error fetching data for about page: {e}")
+        context = empty_about_context()
 
     return render(request, 'main/about.html', context)
@@ -0,0 +1,121 @@
+"""
+Loan repayment engine.
+
+Schedules are computed with closed-form annuity formulas over NumPy arrays,
+so a whole batch of (amount, tenure) combinations is evaluated in one call
+without looping over individual periods in Python.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Repayment frequency -> (installments per year, LoanType rate field)
+FREQUENCIES = {
+    'monthly': (12, 'monthly_installment_rate'),
+    'quarterly': (4, 'quarterly_installment_rate'),
+    'interest_only': (12, 'monthly_interest_rate'),
+}
+
+
+@dataclass(frozen=True)
+class ScheduleBatch:
+    """
+    Amortization schedules for several loans sharing one rate and frequency.
+
+    The per-period arrays have shape ``(n_loans, max_periods)``; periods past
+    a loan's own tenure are zero.
+    """
+    principal: np.ndarray
+    periods: np.ndarray
+    installment: np.ndarray
+    payment: np.ndarray
+    principal_paid: np.ndarray
+    interest: np.ndarray
+    balance: np.ndarray
+
+    @property
+    def total_interest(self):
+        return self.interest.sum(axis=1)
+
+    @property
+    def total_payment(self):
+        return self.payment.sum(axis=1)
+
+    def schedule(self, index):
+        """Return the schedule for one loan of the batch as a list of rows."""
+        n = int(self.periods[index])
+        rows = np.column_stack((
+            np.arange(1, n + 1),
+            self.payment[index, :n],
+            self.principal_paid[index, :n],
+            self.interest[index, :n],
+            self.balance[index, :n],
+        )).round(2).tolist()
+        return [
+            {
+                'period': int(period),
+                'payment': payment,
+                'principal': principal,
+                'interest': interest,
+                'balance': balance,
+            }
+            for period, payment, principal, interest, balance in rows
+        ]
+
+
+def amortize(principals, tenure_years, annual_rate, frequency='monthly'):
+    """
+    Compute repayment schedules for every (principal, tenure) pair.
+
+    ``principals`` and ``tenure_years`` are broadcast against each other, so a
+    single amount can be compared across many tenures or vice versa.
+    ``annual_rate`` is a percentage, as stored on ``LoanType``.
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown repayment frequency: {frequency}")
+    per_year = FREQUENCIES[frequency][0]
+
+    principal, years = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(principals, dtype=float)),
+        np.atleast_1d(np.asarray(tenure_years, dtype=float)),
+    )
+    periods = np.rint(years * per_year).astype(int)
+    if (periods < 1).any():
+        raise ValueError("Tenure must cover at least one installment")
+
+    rate = float(annual_rate) / 100 / per_year
+    k = np.arange(1, periods.max() + 1)
+    active = k[None, :] <= periods[:, None]
+    p = principal[:, None]
+    n = periods[:, None]
+
+    if frequency == 'interest_only':
+        installment = principal * rate
+        interest = np.where(active, p * rate, 0.0)
+        principal_paid = np.where(k[None, :] == n, p, 0.0)
+        balance = np.where(k[None, :] < n, p, 0.0)
+    else:
+        if rate == 0:
+            installment = principal / periods
+            balance = p - installment[:, None] * k[None, :]
+        else:
+            growth = (1 + rate) ** n
+            installment = principal * rate * growth[:, 0] / (growth[:, 0] - 1)
+            compounded = (1 + rate) ** k[None, :]
+            balance = p * compounded - installment[:, None] * (compounded - 1) / rate
+        balance = np.where(active, np.clip(balance, 0.0, None), 0.0)
+        opening = np.concatenate((p, balance[:, :-1]), axis=1)
+        interest = np.where(active, opening * rate, 0.0)
+        principal_paid = np.where(active, opening - balance, 0.0)
+
+    payment = principal_paid + interest
+    return ScheduleBatch(
+        principal=principal,
+        periods=periods,
+        installment=installment,
+        payment=payment,
+        principal_paid=principal_paid,
+        interest=interest,
+        balance=balance,
+    )
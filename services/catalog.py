@@ -0,0 +1,119 @@
+"""
+In-process snapshot of the active services catalog.
+
+Every rate-card page reads the same six small tables. Instead of querying them
+on each request, the active rows are loaded once into an immutable
+``CatalogSnapshot`` and kept in process memory. The snapshot is tagged with
+the catalog models' cache versions (``main.caching``), which are bumped
+whenever a catalog row is saved or deleted, and each worker rebuilds its
+snapshot the next time it notices a version has moved. The rows themselves
+go through the shared cache (``get_or_compute``), so after an edit one
+worker queries the tables and the others reuse its result.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from main.caching import get_or_compute, version_token
+
+from .models import (
+    SavingsAccount, FixedDeposit, LoanType,
+    RemittanceService, ServiceCategory, MemberRelief
+)
+from .deposits import RateMatrix
+
+# Upper bound (seconds) on how long a worker trusts its snapshot. This only
+# matters when the cache backend is not shared between workers.
+SNAPSHOT_MAX_AGE = 300
+
+CATALOG_MODELS = (
+    SavingsAccount, FixedDeposit, LoanType,
+    RemittanceService, ServiceCategory, MemberRelief,
+)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable view of all active catalog rows at a given version"""
+    version: str
+    built_at: float
+    savings_accounts: tuple
+    fixed_deposits: tuple
+    loan_types: tuple
+    remittance_services: tuple
+    member_reliefs: tuple
+    service_categories: tuple
+    featured_savings: tuple
+    featured_loans: tuple
+    loans_by_id: MappingProxyType
+    deposit_matrix: RateMatrix
+
+    def is_fresh(self, version):
+        return (
+            self.version == version
+            and time.monotonic() - self.built_at < SNAPSHOT_MAX_AGE
+        )
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def get_catalog_version():
+    """Return a token that changes whenever any catalog model changes."""
+    return version_token(*CATALOG_MODELS)
+
+
+def _load_rows():
+    return {model.__name__: tuple(model.objects.filter(is_active=True)) for model in CATALOG_MODELS}
+
+
+def _build_snapshot(version):
+    rows = get_or_compute(f'services:catalog:{version}', _load_rows)
+    savings = rows['SavingsAccount']
+    loans = rows['LoanType']
+    deposits = rows['FixedDeposit']
+    return CatalogSnapshot(
+        version=version,
+        built_at=time.monotonic(),
+        savings_accounts=savings,
+        fixed_deposits=deposits,
+        loan_types=loans,
+        remittance_services=rows['RemittanceService'],
+        member_reliefs=rows['MemberRelief'],
+        service_categories=rows['ServiceCategory'],
+        featured_savings=tuple(account for account in savings if account.is_featured),
+        featured_loans=tuple(loan for loan in loans if loan.is_featured),
+        loans_by_id=MappingProxyType({loan.pk: loan for loan in loans}),
+        deposit_matrix=RateMatrix(deposits),
+    )
+
+
+def get_catalog():
+    """
+    Return the current ``CatalogSnapshot``, rebuilding it if the catalog
+    version has changed since this worker last loaded it.
+    """
+    global _snapshot
+    # Read the version before loading rows so a concurrent edit is never
+    # hidden behind a snapshot tagged with the newer version.
+    version = get_catalog_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.is_fresh(version):
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is None or not snapshot.is_fresh(version):
+            snapshot = _build_snapshot(version)
+            _snapshot = snapshot
+    return snapshot
+
+
+def clear_local_snapshot():
+    """Drop this process's snapshot (used by tests and management commands)."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
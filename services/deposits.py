@@ -0,0 +1,151 @@
+"""
+Fixed deposit rate matrix and maturity calculator.
+
+``RateMatrix`` indexes the active ``FixedDeposit`` rows by
+(duration_months, payment_frequency). It is built once per catalog version
+(see ``services.catalog``) and precomputes, for every cell, the factors that
+turn a deposit amount into payouts, maturity value and yield, so evaluating
+an amount across the whole grid is a handful of multiplications.
+
+Assumptions: lump sum deposits compound quarterly and are paid at maturity;
+monthly and quarterly products pay simple interest out at the end of each
+period and return the principal at maturity. The effective annual yield
+assumes payouts are reinvested at the same rate.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+
+from .models import FixedDeposit
+
+# Payment frequency -> payouts per year (lump sum compounds quarterly)
+PERIODS_PER_YEAR = {
+    'monthly': 12,
+    'quarterly': 4,
+    'lump_sum': 4,
+}
+
+FREQUENCIES = tuple(key for key, _label in FixedDeposit.PAYMENT_FREQUENCY_CHOICES)
+DURATION_LABELS = dict(FixedDeposit.DURATION_CHOICES)
+
+
+@dataclass(frozen=True)
+class RateCell:
+    """One (duration, frequency) product with its precomputed factors"""
+    deposit: FixedDeposit
+    duration_months: int
+    payment_frequency: str
+    rate: float
+    payout_count: int
+    payout_factor: float
+    maturity_factor: float
+    effective_annual_yield: float
+
+    @classmethod
+    def from_deposit(cls, deposit):
+        rate = float(deposit.interest_rate) / 100
+        per_year = PERIODS_PER_YEAR[deposit.payment_frequency]
+        periods = deposit.duration_months * per_year / 12
+        if deposit.payment_frequency == 'lump_sum':
+            payout_count = 0
+            payout_factor = 0.0
+            maturity_factor = (1 + rate / per_year) ** periods
+        else:
+            payout_count = int(periods)
+            payout_factor = rate / per_year
+            maturity_factor = 1.0
+        return cls(
+            deposit=deposit,
+            duration_months=deposit.duration_months,
+            payment_frequency=deposit.payment_frequency,
+            rate=float(deposit.interest_rate),
+            payout_count=payout_count,
+            payout_factor=payout_factor,
+            maturity_factor=maturity_factor,
+            effective_annual_yield=(1 + rate / per_year) ** per_year - 1,
+        )
+
+    def accepts(self, amount):
+        minimum = self.deposit.minimum_amount
+        maximum = self.deposit.maximum_amount
+        return (minimum is None or amount >= minimum) and (maximum is None or amount <= maximum)
+
+    def calculate(self, amount):
+        """Return payouts, maturity value and yield for ``amount`` (a Decimal)."""
+        principal = float(amount)
+        payout = principal * self.payout_factor
+        maturity_value = principal * self.maturity_factor
+        total_interest = payout * self.payout_count + maturity_value - principal
+        return {
+            'deposit_id': self.deposit.pk,
+            'duration_months': self.duration_months,
+            'payment_frequency': self.payment_frequency,
+            'interest_rate': self.rate,
+            'eligible': self.accepts(amount),
+            'minimum_amount': _as_float(self.deposit.minimum_amount),
+            'maximum_amount': _as_float(self.deposit.maximum_amount),
+            'periodic_payout': round(payout, 2),
+            'payout_count': self.payout_count,
+            'maturity_value': round(maturity_value, 2),
+            'total_interest': round(total_interest, 2),
+            'effective_annual_yield': round(self.effective_annual_yield * 100, 4),
+        }
+
+
+@dataclass(frozen=True)
+class RateRow:
+    """Table row for one duration: a cell (or None) per payment frequency"""
+    duration_months: int
+    label: str
+    cells: tuple
+
+
+class RateMatrix:
+    """Immutable (duration_months, payment_frequency) -> RateCell index"""
+
+    def __init__(self, deposits):
+        cells = {
+            (deposit.duration_months, deposit.payment_frequency): RateCell.from_deposit(deposit)
+            for deposit in deposits
+        }
+        self.cells = MappingProxyType(cells)
+        self.durations = tuple(sorted({months for months, _frequency in cells}))
+        self.frequencies = FREQUENCIES
+        self.rows = tuple(
+            RateRow(
+                duration_months=months,
+                label=DURATION_LABELS.get(months, f'{months} Months'),
+                cells=tuple(cells.get((months, frequency)) for frequency in FREQUENCIES),
+            )
+            for months in self.durations
+        )
+
+    def __bool__(self):
+        return bool(self.cells)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def get(self, duration_months, payment_frequency):
+        return self.cells.get((duration_months, payment_frequency))
+
+    def by_duration(self):
+        """Deposits grouped by duration label, in duration order."""
+        return {
+            row.label: [cell.deposit for cell in row.cells if cell is not None]
+            for row in self.rows
+        }
+
+    def calculate(self, amount):
+        """Evaluate ``amount`` against every cell of the matrix."""
+        return [
+            cell.calculate(amount)
+            for row in self.rows
+            for cell in row.cells
+            if cell is not None
+        ]
+
+
+def _as_float(value):
+    return float(value) if isinstance(value, Decimal) else value
@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from django import forms
+
+from .ladder import MAX_HORIZON_MONTHS
+from .projection import COMPOUNDING_MONTHS, DEPOSIT_FREQUENCIES
+
+INPUT_CLASSES = 'w-full p-3 border border-gray-300 rounded-lg focus:ring-2 focus:ring-deuraligreen focus:border-transparent transition'
+
+
+class LadderForm(forms.Form):
+    """
+    Inputs for the fixed deposit ladder optimizer. Liquidity needs are written
+    as comma-separated ``month:amount`` pairs, e.g. ``6:50000, 12:100000``.
+    """
+    amount = forms.DecimalField(
+        min_value=Decimal('1'),
+        max_digits=12,
+        decimal_places=2,
+        widget=forms.NumberInput(attrs={'class': INPUT_CLASSES, 'placeholder': 'Amount to invest (NPR)'})
+    )
+    horizon = forms.IntegerField(
+        min_value=1,
+        max_value=MAX_HORIZON_MONTHS,
+        widget=forms.NumberInput(attrs={'class': INPUT_CLASSES, 'placeholder': 'Horizon (months)'})
+    )
+    needs = forms.CharField(
+        required=False,
+        widget=forms.TextInput(attrs={'class': INPUT_CLASSES, 'placeholder': 'Cash needed, e.g. 6:50000, 12:100000 (optional)'})
+    )
+
+    def clean_needs(self):
+        needs = []
+        for item in self.cleaned_data['needs'].split(','):
+            item = item.strip()
+            if not item:
+                continue
+            try:
+                month, amount = item.split(':')
+                month, amount = int(month), Decimal(amount)
+            except (ValueError, ArithmeticError):
+                raise forms.ValidationError(f'"{item}" is not in month:amount form.')
+            if month < 0 or not amount.is_finite() or amount <= 0:
+                raise forms.ValidationError(f'"{item}" must have a non-negative month and a positive amount.')
+            needs.append((month, amount))
+        return needs
+
+
+class SavingsProjectionForm(forms.Form):
+    """Deposit plan for the savings projection API"""
+    lump_sum = forms.DecimalField(min_value=Decimal('0'), max_digits=12, decimal_places=2, required=False)
+    deposit = forms.DecimalField(min_value=Decimal('0'), max_digits=10, decimal_places=2, required=False)
+    frequency = forms.ChoiceField(
+        choices=[(key, key.title()) for key in DEPOSIT_FREQUENCIES],
+        required=False
+    )
+    months = forms.IntegerField(min_value=1, max_value=MAX_HORIZON_MONTHS)
+    compounding = forms.ChoiceField(
+        choices=[(key, key.title()) for key in COMPOUNDING_MONTHS],
+        required=False
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('lump_sum') and not cleaned_data.get('deposit'):
+            raise forms.ValidationError('Enter a lump sum, a recurring deposit, or both.')
+        return cleaned_data
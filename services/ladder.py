@@ -0,0 +1,193 @@
+"""
+Fixed deposit ladder optimizer.
+
+Money that must be available at month ``T`` can sit in a chain of fixed
+deposits whose durations add up to ``T`` (with idle months allowed between
+them). ``_solve`` finds, for every ``T`` up to the horizon, the chain that
+returns the most cash per rupee invested:
+
+    V(0) = 1
+    V(T) = max(V(T - 1), max over cells d <= T of payout(d) + maturity(d) * V(T - d))
+
+Each liquidity need gets its own rung sized to the present value of the
+amount required, and whatever is left rolls to the horizon. Because the
+returns are linear in the principal this allocation is optimal.
+
+Solutions are memoized on the rate sheet itself, so repeated queries against
+the same rates reuse the DP table instead of recomputing it.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+MAX_HORIZON_MONTHS = 120
+
+
+class LadderError(ValueError):
+    """Raised when the requested ladder cannot be built"""
+
+
+@dataclass(frozen=True, order=True)
+class _CellKey:
+    duration_months: int
+    payment_frequency: str
+    deposit_id: int
+    rate: float
+    payout_factor: float
+    payout_count: int
+    maturity_factor: float
+
+    @property
+    def payout_total(self):
+        return self.payout_factor * self.payout_count
+
+
+def _cell_keys(cells):
+    return tuple(sorted(
+        _CellKey(
+            duration_months=cell.duration_months,
+            payment_frequency=cell.payment_frequency,
+            deposit_id=cell.deposit.pk,
+            rate=cell.rate,
+            payout_factor=cell.payout_factor,
+            payout_count=cell.payout_count,
+            maturity_factor=cell.maturity_factor,
+        )
+        for cell in cells
+    ))
+
+
+@lru_cache(maxsize=512)
+def _solve(cell_keys, horizon):
+    """Return (value, choice) tables for months 0..horizon."""
+    value = [1.0] + [0.0] * horizon
+    choice = [None] * (horizon + 1)
+    for month in range(1, horizon + 1):
+        best, pick = value[month - 1], None
+        for key in cell_keys:
+            if key.duration_months > month:
+                continue
+            candidate = key.payout_total + key.maturity_factor * value[month - key.duration_months]
+            if candidate > best + 1e-12:
+                best, pick = candidate, key
+        value[month] = best
+        choice[month] = pick
+    return tuple(value), tuple(choice)
+
+
+def _chain(choice, target):
+    """Walk the choice table forward from month 0 to ``target``."""
+    steps = []
+    start, remaining = 0, target
+    while remaining > 0:
+        key = choice[remaining]
+        if key is None:
+            start += 1
+            remaining -= 1
+            continue
+        steps.append((start, key))
+        start += key.duration_months
+        remaining -= key.duration_months
+    return steps
+
+
+def _rung(matrix, principal, target, purpose):
+    cells = [cell for cell in matrix.cells.values() if cell.accepts(principal)]
+    value, choice = _solve(_cell_keys(cells), target)
+    return value[target], _chain(choice, target), purpose
+
+
+def optimize_ladder(matrix, amount, horizon_months, needs=()):
+    """
+    Split ``amount`` (a Decimal) into rungs that cover each ``(month, amount)``
+    liquidity need and roll the rest to ``horizon_months``.
+    """
+    if not 1 <= horizon_months <= MAX_HORIZON_MONTHS:
+        raise LadderError(f'Horizon must be between 1 and {MAX_HORIZON_MONTHS} months.')
+    if not matrix:
+        raise LadderError('No fixed deposit products are available.')
+    needs = sorted(needs)
+    if any(not 0 <= month <= horizon_months for month, _need in needs):
+        raise LadderError('Liquidity needs must fall within the horizon.')
+
+    all_keys = _cell_keys(matrix.cells.values())
+    best_value, _choice = _solve(all_keys, horizon_months)
+
+    rungs = []
+    committed = 0
+    for month, need in needs:
+        # Size the rung from the unrestricted optimum, then re-solve with only
+        # the products that accept a deposit of that size.
+        principal = float(need) / best_value[month]
+        factor, steps, purpose = _rung(matrix, principal, month, 'liquidity')
+        principal = float(need) / factor
+        rungs.append((principal, month, factor, steps, purpose))
+        committed += principal
+
+    remainder = float(amount) - committed
+    if remainder < -0.005:
+        raise LadderError('The deposit amount cannot cover the requested liquidity needs.')
+    if remainder > 0.005:
+        factor, steps, purpose = _rung(matrix, remainder, horizon_months, 'growth')
+        rungs.append((remainder, horizon_months, factor, steps, purpose))
+
+    return _describe(amount, horizon_months, rungs)
+
+
+def _describe(amount, horizon_months, rungs):
+    ladder = []
+    events = []
+    total_cash = 0.0
+    for index, (principal, target, factor, steps, purpose) in enumerate(rungs, start=1):
+        balance = principal
+        deposits = []
+        for start, key in steps:
+            end = start + key.duration_months
+            payout = balance * key.payout_factor
+            interval = key.duration_months // key.payout_count if key.payout_count else 0
+            for n in range(1, key.payout_count + 1):
+                events.append((start + n * interval, 'payout', index, payout))
+            maturity = balance * key.maturity_factor
+            events.append((end, 'maturity', index, maturity))
+            deposits.append({
+                'deposit_id': key.deposit_id,
+                'start_month': start,
+                'end_month': end,
+                'duration_months': key.duration_months,
+                'payment_frequency': key.payment_frequency,
+                'interest_rate': key.rate,
+                'principal': round(balance, 2),
+                'periodic_payout': round(payout, 2),
+                'maturity_value': round(maturity, 2),
+            })
+            balance = maturity
+        cash = principal * factor
+        total_cash += cash
+        if purpose == 'liquidity':
+            events.append((target, 'withdrawal', index, cash))
+        ladder.append({
+            'rung': index,
+            'purpose': purpose,
+            'principal': round(principal, 2),
+            'target_month': target,
+            'cash_at_target': round(cash, 2),
+            'deposits': deposits,
+        })
+
+    timeline = {}
+    for month, kind, rung, value in sorted(events, key=lambda event: event[0]):
+        entry = timeline.setdefault(month, {'month': month, 'payouts': 0.0, 'maturities': 0.0, 'withdrawals': 0.0, 'events': []})
+        entry[{'payout': 'payouts', 'maturity': 'maturities', 'withdrawal': 'withdrawals'}[kind]] += value
+        entry['events'].append({'type': kind, 'rung': rung, 'amount': round(value, 2)})
+    for entry in timeline.values():
+        for field in ('payouts', 'maturities', 'withdrawals'):
+            entry[field] = round(entry[field], 2)
+
+    return {
+        'amount': float(amount),
+        'horizon_months': horizon_months,
+        'total_return': round(total_cash, 2),
+        'total_interest': round(total_cash - float(amount), 2),
+        'ladder': ladder,
+        'timeline': list(timeline.values()),
+    }
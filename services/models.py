@@ -299,6 +299,10 @@ class MemberRelief(models.Model):
         blank=True,
         verbose_name=_("Relief Image")
     )
+    # Intrinsic size and inline blurred preview of the image, filled on save (images/signals.py)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False)
     icon = models.CharField(
         max_length=50,
         default='fas fa-heart',
@@ -0,0 +1,90 @@
+"""
+Savings growth projections for every active savings product at once.
+
+A plan is a lump sum plus a recurring deposit (monthly, or daily for the
+daily savings product). Interest accrues at ``interest_rate / 12`` per month
+and is credited at the end of each compounding period (1 or 3 months);
+deposits made inside a period earn simple interest until it closes. With
+that, balances at period ends have a closed form, and the whole
+(accounts x months) grid is evaluated with NumPy broadcasting.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+DAYS_PER_MONTH = 365 / 12
+
+COMPOUNDING_MONTHS = {
+    'monthly': 1,
+    'quarterly': 3,
+}
+
+DEPOSIT_FREQUENCIES = ('monthly', 'daily')
+
+
+@dataclass(frozen=True)
+class SavingsPlan:
+    lump_sum: float
+    deposit: float
+    frequency: str
+    months: int
+    compounding: str
+
+    @property
+    def monthly_deposit(self):
+        if self.frequency == 'daily':
+            return self.deposit * DAYS_PER_MONTH
+        return self.deposit
+
+    @property
+    def cache_key(self):
+        return f'{self.lump_sum:.2f}:{self.deposit:.2f}:{self.frequency}:{self.months}:{self.compounding}'
+
+
+def project_balances(rates, plan):
+    """
+    Return an array of shape ``(len(rates), plan.months + 1)`` holding the
+    credited balance of each product at the end of every month.
+    ``rates`` are annual percentages.
+    """
+    period = COMPOUNDING_MONTHS[plan.compounding]
+    monthly_rate = np.asarray(rates, dtype=float)[:, None] / 100 / 12
+    period_rate = monthly_rate * period
+    deposit = plan.monthly_deposit
+    # Deposits at the end of months 1..period earn (period - month) months of simple interest.
+    contribution = deposit * (period + monthly_rate * period * (period - 1) / 2)
+
+    month = np.arange(plan.months + 1)[None, :]
+    periods_done = month // period
+    offset = month % period
+
+    growth = (1 + period_rate) ** periods_done
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(period_rate > 0, (growth - 1) / period_rate, periods_done)
+    return plan.lump_sum * growth + contribution * annuity + deposit * offset
+
+
+def project_accounts(accounts, plan):
+    """Project ``plan`` for each SavingsAccount and summarise the results."""
+    if not accounts:
+        return []
+    balances = project_balances([account.interest_rate for account in accounts], plan)
+    total_deposits = plan.lump_sum + plan.monthly_deposit * plan.months
+    results = []
+    for account, curve in zip(accounts, balances.round(2)):
+        final = float(curve[-1])
+        results.append({
+            'id': account.pk,
+            'account_type': account.account_type,
+            'name': account.english_name,
+            'nepali_name': account.nepali_name,
+            'interest_rate': float(account.interest_rate),
+            'meets_minimum': account.minimum_balance is None or plan.lump_sum >= account.minimum_balance,
+            'matches_plan': account.account_type == plan.frequency,
+            'final_balance': final,
+            'total_deposits': round(total_deposits, 2),
+            'total_interest': round(final - total_deposits, 2),
+            'balances': curve.tolist(),
+        })
+    return results
@@ -9,15 +9,20 @@ urlpatterns = [
     
     # Savings accounts
     path('savings/', views.SavingsAccountsView.as_view(), name='savings'),
+    path('savings/projection/', views.savings_projection, name='savings_projection'),
     path('savings/<int:service_id>/', views.service_detail, {'service_type': 'savings'}, name='savings_detail'),
     
     # Fixed deposits
     path('fixed-deposits/', views.FixedDepositsView.as_view(), name='fixed_deposits'),
+    path('fixed-deposits/calculator/', views.fixed_deposit_calculator, name='fixed_deposit_calculator'),
+    path('fixed-deposits/ladder/', views.fixed_deposit_ladder, name='fixed_deposit_ladder'),
+    path('fixed-deposits/ladder/api/', views.fixed_deposit_ladder_api, name='fixed_deposit_ladder_api'),
     path('fixed-deposits/<int:service_id>/', views.service_detail, {'service_type': 'fixed_deposit'}, name='fixed_deposit_detail'),
     
     # Loan services
     path('loans/', views.LoanServicesView.as_view(), name='loans'),
     path('loans/<int:service_id>/', views.service_detail, {'service_type': 'loan'}, name='loan_detail'),
+    path('loans/<int:service_id>/schedule/', views.loan_schedule, name='loan_schedule'),
     
     # Remittance services
     path('remittance/', views.RemittanceServicesView.as_view(), name='remittance'),
@@ -1,43 +1,72 @@
+import json
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView
+from main.conditional import content_condition
+from main.templating import EngineChoiceMixin
 from .models import (
     SavingsAccount, FixedDeposit, LoanType, 
     RemittanceService, ServiceCategory, MemberRelief
 )
+from .catalog import CATALOG_MODELS, get_catalog
+from .amortization import FREQUENCIES, amortize
+from .forms import LadderForm, SavingsProjectionForm
+from .ladder import LadderError, optimize_ladder
+from .projection import SavingsPlan, project_accounts
+
+SCHEDULE_CACHE_TIMEOUT = 60 * 60  # 1 hour; keys already include the catalog version
+PROJECTION_CACHE_TIMEOUT = 60 * 60
+# Hard limit on schedule tenures, also for loan types without max_tenure_years:
+# the schedule matrix grows with it, so it must not be left to the query string.
+MAX_TENURE_YEARS = 40
+# Largest deposit amount accepted, as for the forms' max_digits=12, decimal_places=2
+MAX_DEPOSIT_AMOUNT = Decimal('9999999999.99')
 
+# ETag/Last-Modified for pages that only render catalog rows
+catalog_condition = content_condition(*CATALOG_MODELS)
 
+
+@catalog_condition
 def services_overview(request):
     """Main services overview page"""
+    catalog = get_catalog()
     context = {
-        'savings_accounts': SavingsAccount.objects.filter(is_active=True),
-        'fixed_deposits': FixedDeposit.objects.filter(is_active=True),
-        'loan_types': LoanType.objects.filter(is_active=True),
-        'remittance_services': RemittanceService.objects.filter(is_active=True),
-        'member_reliefs': MemberRelief.objects.filter(is_active=True),
-        'service_categories': ServiceCategory.objects.filter(is_active=True),
-        'featured_savings': SavingsAccount.objects.filter(is_active=True, is_featured=True)[:3],
-        'featured_loans': LoanType.objects.filter(is_active=True, is_featured=True)[:3],
+        'savings_accounts': catalog.savings_accounts,
+        'fixed_deposits': catalog.fixed_deposits,
+        'loan_types': catalog.loan_types,
+        'remittance_services': catalog.remittance_services,
+        'member_reliefs': catalog.member_reliefs,
+        'service_categories': catalog.service_categories,
+        'featured_savings': catalog.featured_savings[:3],
+        'featured_loans': catalog.featured_loans[:3],
     }
     return render(request, 'services/services_overview.html', context)
 
 
-class SavingsAccountsView(ListView):
+@method_decorator(catalog_condition, name='dispatch')
+class SavingsAccountsView(EngineChoiceMixin, ListView):
     """Display all savings account types"""
     model = SavingsAccount
     template_name = 'services/savings_accounts.html'
     context_object_name = 'savings_accounts'
     
     def get_queryset(self):
-        return SavingsAccount.objects.filter(is_active=True).order_by('-is_featured', 'interest_rate', 'account_type')
+        return get_catalog().savings_accounts
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['page_title'] = 'Savings Accounts'
         context['page_description'] = 'Choose from our range of savings accounts with competitive interest rates'
-        context['featured_accounts'] = SavingsAccount.objects.filter(is_active=True, is_featured=True)
+        context['featured_accounts'] = get_catalog().featured_savings
         return context
 
 
+@method_decorator(catalog_condition, name='dispatch')
 class FixedDepositsView(ListView):
     """Display all fixed deposit options"""
     model = FixedDeposit
@@ -45,25 +74,21 @@ class FixedDepositsView(ListView):
     context_object_name = 'fixed_deposits'
     
     def get_queryset(self):
-        return FixedDeposit.objects.filter(is_active=True).order_by('duration_months', 'payment_frequency')
+        return get_catalog().fixed_deposits
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['page_title'] = 'Fixed Deposits'
         context['page_description'] = 'Secure your future with our fixed deposit schemes'
         
-        # Group by duration for better display
-        deposits_by_duration = {}
-        for deposit in context['fixed_deposits']:
-            duration = deposit.get_duration_months_display()
-            if duration not in deposits_by_duration:
-                deposits_by_duration[duration] = []
-            deposits_by_duration[duration].append(deposit)
-        
-        context['deposits_by_duration'] = deposits_by_duration
+        # The rate matrix is built once per catalog version and shared with the calculator API
+        rate_matrix = get_catalog().deposit_matrix
+        context['rate_matrix'] = rate_matrix
+        context['deposits_by_duration'] = rate_matrix.by_duration()
         return context
 
 
+@method_decorator(catalog_condition, name='dispatch')
 class LoanServicesView(ListView):
     """Display all loan services"""
     model = LoanType
@@ -71,16 +96,17 @@ class LoanServicesView(ListView):
     context_object_name = 'loan_types'
     
     def get_queryset(self):
-        return LoanType.objects.filter(is_active=True).order_by('-is_featured', 'loan_category')
+        return get_catalog().loan_types
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['page_title'] = 'Loan Services'
         context['page_description'] = 'Flexible loan options for all your financial needs'
-        context['featured_loans'] = LoanType.objects.filter(is_active=True, is_featured=True)
+        context['featured_loans'] = get_catalog().featured_loans
         return context
 
 
+@method_decorator(catalog_condition, name='dispatch')
 class RemittanceServicesView(ListView):
     """Display remittance services"""
     model = RemittanceService
@@ -88,7 +114,7 @@ class RemittanceServicesView(ListView):
     context_object_name = 'remittance_services'
     
     def get_queryset(self):
-        return RemittanceService.objects.filter(is_active=True).order_by('service_type')
+        return get_catalog().remittance_services
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -97,6 +123,7 @@ class RemittanceServicesView(ListView):
         return context
 
 
+@method_decorator(catalog_condition, name='dispatch')
 class MemberReliefView(ListView):
     """Display member relief programs"""
     model = MemberRelief
@@ -104,7 +131,7 @@ class MemberReliefView(ListView):
     context_object_name = 'member_reliefs'
     
     def get_queryset(self):
-        return MemberRelief.objects.filter(is_active=True).order_by('relief_type', 'title')
+        return get_catalog().member_reliefs
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -123,6 +150,7 @@ class MemberReliefView(ListView):
         return context
 
 
+@catalog_condition
 def service_detail(request, service_type, service_id):
     """Generic service detail view"""
     context = {}
@@ -148,3 +176,191 @@ def service_detail(request, service_type, service_id):
     context['service'] = service
     context['service_type'] = service_type
     return render(request, template, context)
+
+
+def savings_projection(request):
+    """
+    JSON balance curves for every active savings product under one deposit
+    plan, for the savings comparison chart.
+    """
+    form = SavingsProjectionForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+
+    plan = SavingsPlan(
+        lump_sum=float(form.cleaned_data['lump_sum'] or 0),
+        deposit=float(form.cleaned_data['deposit'] or 0),
+        frequency=form.cleaned_data['frequency'] or 'monthly',
+        months=form.cleaned_data['months'],
+        compounding=form.cleaned_data['compounding'] or 'quarterly',
+    )
+    catalog = get_catalog()
+    cache_key = f'services:savings-projection:{catalog.version}:{plan.cache_key}'
+    body = cache.get(cache_key)
+    if body is None:
+        body = json.dumps({
+            'success': True,
+            'plan': {
+                'lump_sum': plan.lump_sum,
+                'deposit': plan.deposit,
+                'frequency': plan.frequency,
+                'months': plan.months,
+                'compounding': plan.compounding,
+            },
+            'months': list(range(plan.months + 1)),
+            'accounts': project_accounts(catalog.savings_accounts, plan),
+        })
+        cache.set(cache_key, body, PROJECTION_CACHE_TIMEOUT)
+    return HttpResponse(body, content_type='application/json')
+
+
+def fixed_deposit_calculator(request):
+    """
+    JSON maturity value, payouts and effective yield for a deposit amount
+    across every duration/frequency cell. Pass duration and frequency to
+    evaluate a single cell.
+    """
+    try:
+        amount = Decimal(request.GET.get('amount', ''))
+        if not amount.is_finite() or amount <= 0 or amount > MAX_DEPOSIT_AMOUNT:
+            raise InvalidOperation
+        amount = amount.quantize(Decimal('0.01'))
+        if amount <= 0:
+            raise InvalidOperation
+    except InvalidOperation:
+        return JsonResponse({'success': False, 'message': 'Enter a valid deposit amount.'}, status=400)
+
+    rate_matrix = get_catalog().deposit_matrix
+    duration = request.GET.get('duration')
+    frequency = request.GET.get('frequency')
+    if duration or frequency:
+        try:
+            cell = rate_matrix.get(int(duration), frequency)
+        except (TypeError, ValueError):
+            cell = None
+        if cell is None:
+            return JsonResponse({'success': False, 'message': 'No deposit product for that duration and frequency.'}, status=404)
+        results = [cell.calculate(amount)]
+    else:
+        results = rate_matrix.calculate(amount)
+
+    return JsonResponse({
+        'success': True,
+        'amount': float(amount),
+        'frequencies': list(rate_matrix.frequencies),
+        'durations': list(rate_matrix.durations),
+        'results': results,
+        'eligible_count': sum(1 for result in results if result['eligible']),
+    })
+
+
+def _ladder_result(form):
+    """Run the optimizer for a bound LadderForm; returns (result, error message)."""
+    if not form.is_valid():
+        return None, None
+    try:
+        result = optimize_ladder(
+            get_catalog().deposit_matrix,
+            form.cleaned_data['amount'],
+            form.cleaned_data['horizon'],
+            form.cleaned_data['needs'],
+        )
+    except LadderError as e:
+        return None, str(e)
+    return result, None
+
+
+def fixed_deposit_ladder_api(request):
+    """JSON ladder of fixed deposits for an amount, horizon and liquidity needs"""
+    form = LadderForm(request.GET)
+    result, error = _ladder_result(form)
+    if error:
+        return JsonResponse({'success': False, 'message': error}, status=400)
+    if result is None:
+        return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+    return JsonResponse({'success': True, **result})
+
+
+def fixed_deposit_ladder(request):
+    """Fixed deposit ladder planner page"""
+    form = LadderForm(request.GET or None)
+    result, error = _ladder_result(form)
+    context = {
+        'form': form,
+        'result': result,
+        'error': error,
+        'page_title': 'Fixed Deposit Ladder Planner',
+    }
+    return render(request, 'services/fixed_deposit_ladder.html', context)
+
+
+def loan_schedule(request, service_id):
+    """
+    JSON repayment schedule for a loan product.
+    Query parameters: amount (NPR), tenure (years), frequency.
+    """
+    catalog = get_catalog()
+    loan = catalog.loans_by_id.get(service_id)
+    if loan is None:
+        return JsonResponse({'success': False, 'message': 'Loan not found.'}, status=404)
+
+    frequency = request.GET.get('frequency', 'monthly')
+    if frequency not in FREQUENCIES:
+        return JsonResponse({
+            'success': False,
+            'message': f"Frequency must be one of: {', '.join(FREQUENCIES)}."
+        }, status=400)
+
+    try:
+        amount = Decimal(request.GET.get('amount', ''))
+        if not amount.is_finite():
+            raise InvalidOperation
+        amount = amount.quantize(Decimal('0.01'))
+        tenure = int(request.GET.get('tenure', loan.max_tenure_years or 1))
+    except (InvalidOperation, ValueError):
+        return JsonResponse({'success': False, 'message': 'Invalid amount or tenure.'}, status=400)
+
+    max_tenure = min(loan.max_tenure_years or MAX_TENURE_YEARS, MAX_TENURE_YEARS)
+    if not 1 <= tenure <= max_tenure:
+        return JsonResponse({
+            'success': False,
+            'message': f'Tenure must be between 1 and {max_tenure} years.'
+        }, status=400)
+    if amount <= 0 or (loan.minimum_amount and amount < loan.minimum_amount) or \
+            (loan.maximum_amount and amount > loan.maximum_amount):
+        return JsonResponse({
+            'success': False,
+            'message': f'Amount must be between {loan.minimum_amount or 0} and {loan.maximum_amount or "any"} NPR.'
+        }, status=400)
+
+    cache_key = f'services:loan-schedule:{catalog.version}:{loan.pk}:{amount}:{tenure}:{frequency}'
+    body = cache.get(cache_key)
+    if body is None:
+        rate = getattr(loan, FREQUENCIES[frequency][1])
+        # One batched call covers every tenure option; the requested one is a row of it.
+        tenures = np.arange(1, max_tenure + 1)
+        batch = amortize(float(amount), tenures, rate, frequency)
+        row = tenure - 1
+        body = json.dumps({
+            'success': True,
+            'loan': {'id': loan.pk, 'name': loan.english_name, 'category': loan.loan_category},
+            'amount': float(amount),
+            'tenure_years': tenure,
+            'frequency': frequency,
+            'annual_rate': float(rate),
+            'installment': round(float(batch.installment[row]), 2),
+            'total_interest': round(float(batch.total_interest[row]), 2),
+            'total_payment': round(float(batch.total_payment[row]), 2),
+            'schedule': batch.schedule(row),
+            'tenure_options': [
+                {
+                    'tenure_years': int(years),
+                    'installment': round(float(installment), 2),
+                    'total_interest': round(float(total_interest), 2),
+                }
+                for years, installment, total_interest
+                in zip(tenures, batch.installment, batch.total_interest)
+            ],
+        })
+        cache.set(cache_key, body, SCHEDULE_CACHE_TIMEOUT)
+    return HttpResponse(body, content_type='application/json')
@@ -5,7 +5,12 @@ from django.utils.text import slugify
 class Person(models.Model):
     full_name = models.CharField(max_length=100, unique=True, help_text=" व्यक्तिको पूरा नाम")
     photo = models.ImageField(upload_to='person_photos/', blank=True, null=True, help_text=" व्यक्तिको फोटो")
+    # Intrinsic size and inline blurred preview of the photo, filled on save (images/signals.py)
+    photo_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    photo_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    photo_placeholder = models.TextField(blank=True, editable=False)
     bio = models.TextField(blank=True, help_text=" व्यक्तिको संक्षिप्त परिचय (optional)")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['full_name']
@@ -22,6 +27,7 @@ class Committee(models.Model):
     slug = models.SlugField(unique=True, blank=True, help_text="Auto-generated from name and tenure")
     is_active = models.BooleanField(default=True, help_text="Check this for the currently active committees.")
     order = models.PositiveIntegerField(default=0, help_text="Display order (e.g., 1 for Board, 2 for Audit).")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-is_active', 'order']
@@ -42,6 +48,7 @@ class Membership(models.Model):
     committee = models.ForeignKey(Committee, on_delete=models.CASCADE, related_name="memberships")
     position = models.CharField(max_length=100, help_text="e.g., अध्यक्ष, सदस्य, ऋण संयोजक")
     order = models.PositiveIntegerField(default=0, help_text="Order within the committee (e.g., 1 for President, 2 for VP).")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['committee', 'order']
@@ -60,6 +67,7 @@ class Staff(models.Model):
     start_date = models.DateField(null=True, blank=True, help_text="Date the staff member joined.")
     is_active = models.BooleanField(default=True, help_text="Is the staff member currently employed?")
     order = models.PositiveIntegerField(default=0, help_text="Display order (e.g., 1 for Manager, 2 for others).")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order']
@@ -1,12 +1,27 @@
 from django.shortcuts import render
-from .models import Committee, Staff
+from main.caching import cached_queryset
+from main.conditional import content_condition
+from .models import Committee, Membership, Person, Staff
 
+COMMITTEE_MODELS = (Committee, Membership, Person)
+
+team_condition = content_condition(Committee, Membership, Person, Staff)
+
+@team_condition
 def team_list_view(request):
     """
     Displays active committees, their members, and the management team (staff).
     """
-    active_committees = Committee.objects.filter(is_active=True).prefetch_related('memberships__person')
-    management_team = Staff.objects.filter(is_active=True).select_related('person')
+    active_committees = cached_queryset(
+        'team:active-committees',
+        Committee.objects.filter(is_active=True).prefetch_related('memberships__person'),
+        COMMITTEE_MODELS,
+    )
+    management_team = cached_queryset(
+        'team:management',
+        Staff.objects.filter(is_active=True).select_related('person'),
+        (Staff, Person),
+    )
 
     context = {
         'committees': active_committees,
@@ -15,11 +30,16 @@ def team_list_view(request):
     }
     return render(request, 'team/team_list.html', context)
 
+@team_condition
 def past_team_list_view(request):
     """
     Displays past committees and their members.
     """
-    past_committees = Committee.objects.filter(is_active=False).order_by('-tenure_bs').prefetch_related('memberships__person')
+    past_committees = cached_queryset(
+        'team:past-committees',
+        Committee.objects.filter(is_active=False).order_by('-tenure_bs').prefetch_related('memberships__person'),
+        COMMITTEE_MODELS,
+    )
     
     context = {
         'committees': past_committees,
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import NewsArticle, Event, Subscriber, Category
+from .models import NewsArticle, Event, Subscriber, Category, NewsletterIssue
+from .newsletter import issue_summary
+from .search import get_backend, tokenize
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -17,6 +19,14 @@ class NewsArticleAdmin(admin.ModelAdmin):
         (None, {'fields': ('title', 'slug', 'category', 'content', 'image')}),
         ('Publication Details', {'fields': ('status', 'author', 'published_date')}),
     )
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index instead of icontains scans over content
+        backend = get_backend()
+        tokens = tokenize(search_term)
+        if backend is None or not tokens:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=backend.matching_ids(tokens)), False
+
     def save_model(self, request, obj, form, change):
         if not hasattr(obj, 'author') or not obj.author:
             obj.author = request.user
@@ -32,3 +42,19 @@ class EventAdmin(admin.ModelAdmin):
 class SubscriberAdmin(admin.ModelAdmin):
     list_display = ('email', 'subscribed_at')
     search_fields = ('email',)
+
+@admin.register(NewsletterIssue)
+class NewsletterIssueAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'article', 'status', 'created_at', 'completed_at')
+    list_filter = ('status',)
+    readonly_fields = ('article', 'subject', 'status', 'created_at', 'started_at', 'completed_at', 'delivery_summary')
+    fields = readonly_fields
+
+    def has_add_permission(self, request):
+        # Issues are created by the send_newsletter management command
+        return False
+
+    @admin.display(description='Deliveries')
+    def delivery_summary(self, obj):
+        summary = issue_summary(obj)
+        return f"{summary['sent']} sent, {summary['failed']} failed, {summary['pending']} pending of {summary['total']}"
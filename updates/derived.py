@@ -0,0 +1,205 @@
+"""
+Fields derived from a news article's ``content``.
+
+Read time, word count, a plain-text excerpt and a sanitized HTML body are
+computed once when an article is saved (``NewsArticle.save``) and stored on
+the row, so list and detail pages never have to load or re-parse the full
+body. ``backfill_derived_fields`` fills them in for rows saved before the
+columns existed; it is shared by the migration and the
+``backfill_article_fields`` management command.
+
+The body is written in the admin either as plain text or as HTML. Plain text
+is rendered with paragraph/line breaks; HTML is reduced to an allowlist of
+tags and attributes, dropping scripts, styles, event handlers and
+``javascript:`` style URLs.
+"""
+
+import html
+import re
+import unicodedata
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from django.utils.html import escape, linebreaks, strip_tags
+
+WORDS_PER_MINUTE = 200
+EXCERPT_WORDS = 40
+
+DERIVED_FIELDS = ('read_time', 'word_count', 'excerpt', 'body_html')
+
+ALLOWED_TAGS = {
+    'a', 'b', 'blockquote', 'br', 'code', 'div', 'em', 'figcaption', 'figure',
+    'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre',
+    's', 'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'th',
+    'thead', 'tr', 'u', 'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title', 'target'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_SCHEMES = {'', 'http', 'https', 'mailto', 'tel'}
+VOID_TAGS = {'br', 'hr', 'img'}
+# Elements whose content is dropped along with the tag
+# (not void elements such as <embed>: they have no end tag to stop dropping)
+DROP_CONTENT_TAGS = {'script', 'style', 'iframe', 'object', 'template', 'noscript', 'head', 'title'}
+
+# An open tag implicitly closes these still-open siblings (``<li>a<li>b``)
+IMPLICIT_CLOSE = {
+    'li': {'li'},
+    'p': {'p'},
+    'tr': {'tr', 'td', 'th'},
+    'td': {'td', 'th'},
+    'th': {'td', 'th'},
+}
+
+HTML_TAG_RE = re.compile(r'<[a-zA-Z/!]')
+BLOCK_TAG_RE = re.compile(
+    r'</?(?:blockquote|br|div|figcaption|figure|h[1-6]|hr|li|ol|p|pre|table|td|th|tr|ul)\b[^>]*>',
+    re.IGNORECASE,
+)
+
+
+def plain_text(content):
+    """
+    Text of ``content`` with tags stripped and entities decoded (NFC).
+    Block-level tags become spaces so ``<li>a</li><li>b</li>`` stays two words.
+    """
+    text = BLOCK_TAG_RE.sub(' ', content or '')
+    return unicodedata.normalize('NFC', html.unescape(strip_tags(text)))
+
+
+def calculate_read_time(word_count):
+    """Minutes to read ``word_count`` words (at least one for any text)."""
+    if not word_count:
+        return 0
+    return max(1, -(-word_count // WORDS_PER_MINUTE))
+
+
+def make_excerpt(words, limit=EXCERPT_WORDS):
+    excerpt = ' '.join(words[:limit])
+    return excerpt + '…' if len(words) > limit else excerpt
+
+
+def _safe_url(value):
+    value = value.strip()
+    try:
+        scheme = urlsplit(value).scheme.lower()
+    except ValueError:
+        return False
+    return scheme in ALLOWED_SCHEMES
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        if self.open_tags and self.open_tags[-1] in IMPLICIT_CLOSE.get(tag, ()):
+            self.out.append(f'</{self.open_tags.pop()}>')
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        rendered = ''.join(
+            f' {name}="{escape(value)}"'
+            for name, value in attrs
+            if name in allowed and value is not None
+            and (name not in URL_ATTRIBUTES or _safe_url(value))
+        )
+        if tag == 'a' and 'target=' in rendered:
+            rendered += ' rel="noopener noreferrer"'
+        self.out.append(f'<{tag}{rendered}>')
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping -= 1
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping = max(0, self.dropping - 1)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        # Close anything left open inside this element so the output stays balanced.
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.out.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.out.append(escape(data))
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.out.append(f'</{self.open_tags.pop()}>')
+        return ''.join(self.out)
+
+
+def sanitize_html(content):
+    """Reduce ``content`` to the allowed tags and attributes."""
+    parser = _Sanitizer()
+    parser.feed(content)
+    return parser.close()
+
+
+def render_body(content):
+    """Safe HTML for the article body, from either plain text or HTML."""
+    content = unicodedata.normalize('NFC', content or '')
+    if not HTML_TAG_RE.search(content):
+        return linebreaks(content, autoescape=True)
+    return sanitize_html(content)
+
+
+def derive_article_fields(content):
+    """Return a dict of every field in ``DERIVED_FIELDS`` for ``content``."""
+    body_html = render_body(content)
+    # Count from the sanitized body so dropped script/style text is not included.
+    words = plain_text(body_html).split()
+    return {
+        'read_time': calculate_read_time(len(words)),
+        'word_count': len(words),
+        'excerpt': make_excerpt(words),
+        'body_html': body_html,
+    }
+
+
+def backfill_derived_fields(model, chunk_size=500, only_missing=False, stdout=None):
+    """
+    Recompute the derived fields of every ``model`` row in primary-key order,
+    ``chunk_size`` rows per query and ``bulk_update``. Works with historical
+    models in migrations since nothing here relies on ``NewsArticle.save``.
+    Returns the number of rows updated.
+    """
+    queryset = model._default_manager.order_by('pk').only('pk', 'content')
+    if only_missing:
+        queryset = queryset.filter(body_html='')
+    updated = 0
+    last_pk = None
+    while True:
+        chunk = queryset.filter(pk__gt=last_pk) if last_pk is not None else queryset
+        rows = list(chunk[:chunk_size])
+        if not rows:
+            break
+        for row in rows:
+            for name, value in derive_article_fields(row.content).items():
+                setattr(row, name, value)
+        model._default_manager.bulk_update(rows, DERIVED_FIELDS)
+        updated += len(rows)
+        last_pk = rows[-1].pk
+        if stdout is not None:
+            stdout.write(f'  {updated} articles updated (up to id {last_pk})')
+    return updated
@@ -0,0 +1,190 @@
+"""
+Atom and JSON Feed endpoints for published news, globally and per category.
+
+Each feed body is rendered once per content version and cached. The
+version is the number of published articles in scope plus their latest
+``updated_at``, so an edit, a publish/unpublish or a delete all produce a
+new one. That version is also the strong ``ETag``, and the latest
+``updated_at`` is sent as ``Last-Modified``. Polling clients that send
+either back get a ``304 Not Modified`` after a single aggregate query.
+Bodies contain absolute URLs, so the scheme and host are part of the
+version too; nothing else from the request goes into a cached body.
+"""
+
+import hashlib
+import json
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .models import Category, NewsArticle
+
+FEED_ITEM_COUNT = 20
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_MAX_AGE = 300
+# Bump when the rendered output changes so cached bodies and ETags roll over.
+FEED_FORMAT_VERSION = 2
+
+SITE_TITLE = 'Bhanjyang Cooperative News'
+JSON_FEED_VERSION = 'https://jsonfeed.org/version/1.1'
+
+
+def feed_articles(category=None):
+    articles = NewsArticle.objects.filter(status=NewsArticle.Status.PUBLISHED)
+    if category is not None:
+        articles = articles.filter(category=category)
+    return articles
+
+
+class ContentAtom1Feed(Atom1Feed):
+    """Atom feed that carries the full article body in ``<content>``"""
+
+    def add_item_elements(self, handler, item):
+        super().add_item_elements(handler, item)
+        if item.get('content'):
+            handler.addQuickElement('content', item['content'], {'type': 'html'})
+
+
+class NewsAtomFeed(Feed):
+    feed_type = ContentAtom1Feed
+
+    def get_object(self, request, category=None):
+        return category
+
+    def title(self, category):
+        return f'{SITE_TITLE}: {category.name}' if category else SITE_TITLE
+
+    def subtitle(self, category):
+        return 'Latest news from Bhanjyang Saving & Credit Cooperative'
+
+    def link(self, category):
+        return category.get_absolute_url() if category else reverse('updates:news-all-list')
+
+    def items(self, category):
+        return (
+            feed_articles(category)
+            .select_related('author', 'category')
+            .defer('content')
+            .order_by('-published_date', '-id')[:FEED_ITEM_COUNT]
+        )
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_extra_kwargs(self, item):
+        return {'content': item.body_html}
+
+    def item_pubdate(self, item):
+        return item.published_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [item.category.name]
+
+
+def _json_feed(request, category):
+    atom = NewsAtomFeed()
+    items = []
+    for article in atom.items(category):
+        url = request.build_absolute_uri(article.get_absolute_url())
+        entry = {
+            'id': url,
+            'url': url,
+            'title': article.title,
+            'content_html': article.body_html,
+            'summary': article.excerpt,
+            'date_published': article.published_date.isoformat(),
+            'date_modified': article.updated_at.isoformat(),
+            'authors': [{'name': atom.item_author_name(article)}],
+            'tags': [article.category.name],
+        }
+        if article.image:
+            entry['image'] = request.build_absolute_uri(article.image.url)
+        items.append(entry)
+    feed = {
+        'version': JSON_FEED_VERSION,
+        'title': atom.title(category),
+        'description': atom.subtitle(category),
+        'home_page_url': request.build_absolute_uri(atom.link(category)),
+        'feed_url': request.build_absolute_uri(
+            reverse('updates:category-feed-json', args=[category.slug]) if category else reverse('updates:feed-json')
+        ),
+        'items': items,
+    }
+    return json.dumps(feed, ensure_ascii=False).encode('utf-8')
+
+
+def _atom_feed(request, category):
+    feed = NewsAtomFeed().get_feed(category, request)
+    return feed.writeString('utf-8').encode('utf-8')
+
+
+FORMATS = {
+    'atom': (_atom_feed, 'application/atom+xml; charset=utf-8'),
+    'json': (_json_feed, 'application/feed+json; charset=utf-8'),
+}
+
+
+def _serve_feed(request, kind, category=None):
+    state = feed_articles(category).aggregate(count=Count('id'), last_modified=Max('updated_at'))
+    last_modified = state['last_modified']
+    version = hashlib.sha256(
+        f"{FEED_FORMAT_VERSION}:{kind}:{category.pk if category else ''}:{category.name if category else ''}:"
+        f"{state['count']}:{last_modified.isoformat() if last_modified else ''}:"
+        f"{request.scheme}://{request.get_host()}".encode()
+    ).hexdigest()[:32]
+    etag = f'"{version}"'
+    # HTTP dates have one-second resolution.
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        render, content_type = FORMATS[kind]
+        cache_key = f'updates:feed:{version}'
+        body = cache.get(cache_key)
+        if body is None:
+            body = render(request, category)
+            cache.set(cache_key, body, FEED_CACHE_TIMEOUT)
+        response = HttpResponse(body, content_type=content_type)
+
+    response.headers['ETag'] = etag
+    if timestamp is not None:
+        response.headers['Last-Modified'] = http_date(timestamp)
+    patch_cache_control(response, public=True, max_age=FEED_MAX_AGE)
+    return response
+
+
+@require_safe
+def news_atom_feed(request):
+    return _serve_feed(request, 'atom')
+
+
+@require_safe
+def news_json_feed(request):
+    return _serve_feed(request, 'json')
+
+
+@require_safe
+def category_atom_feed(request, category_slug):
+    return _serve_feed(request, 'atom', get_object_or_404(Category, slug=category_slug))
+
+
+@require_safe
+def category_json_feed(request, category_slug):
+    return _serve_feed(request, 'json', get_object_or_404(Category, slug=category_slug))
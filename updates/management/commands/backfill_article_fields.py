@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from updates.derived import backfill_derived_fields
+from updates.models import NewsArticle
+
+
+class Command(BaseCommand):
+    help = 'Recompute read time, word count, excerpt and rendered HTML for news articles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of articles to load and bulk_update per batch',
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='Only process articles whose rendered HTML is empty',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be a positive integer.')
+        count = backfill_derived_fields(
+            NewsArticle,
+            chunk_size=options['chunk_size'],
+            only_missing=options['missing_only'],
+            stdout=self.stdout if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Updated {count} articles.'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from updates.related import RELATED_COUNT, rebuild_related_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the TF-IDF related-articles index for all published news articles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of articles to load per database round-trip',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be a positive integer.')
+        count = rebuild_related_index(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Computed up to {RELATED_COUNT} related articles for {count} articles.'
+        ))
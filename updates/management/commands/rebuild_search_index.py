@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from updates.models import NewsArticle
+from updates.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for news articles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of articles to load per database round-trip',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        if backend is None:
+            raise CommandError('Full-text search is not supported on this database.')
+
+        count = 0
+        articles = NewsArticle.objects.only('id', 'title', 'body_html', 'status')
+        with transaction.atomic():
+            backend.clear()
+            for article in articles.iterator(chunk_size=options['chunk_size']):
+                backend.index(article)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} articles.'))
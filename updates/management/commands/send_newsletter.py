@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+
+from updates.models import NewsArticle, NewsletterIssue
+from updates.newsletter import (
+    NewsletterError, create_issue, issue_summary, queue_deliveries, requeue_failed, send_issue,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Send a published news article to all subscribers. Re-running the command '
+        'for the same article (or with --issue) resumes an unfinished mailing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('article', nargs='?', help='Slug or id of the article to send')
+        parser.add_argument('--issue', type=int, help='Resume the newsletter issue with this id')
+        parser.add_argument('--resend', action='store_true', help='Start a new issue even if the article was already sent')
+        parser.add_argument('--subject', help='Subject line (defaults to the article title)')
+        parser.add_argument('--batch-size', type=int, default=settings.NEWSLETTER_BATCH_SIZE,
+                            help='Recipients sent over one SMTP connection')
+        parser.add_argument('--rate', type=float, default=settings.NEWSLETTER_MAX_PER_SECOND,
+                            help='Maximum messages per second (0 for no limit)')
+        parser.add_argument('--retry-failed', action='store_true', help='Re-queue failed deliveries before sending')
+        parser.add_argument('--max-attempts', type=int, default=3, help='Attempts allowed per recipient with --retry-failed')
+        parser.add_argument('--backend', help='Email backend to use instead of EMAIL_BACKEND')
+        parser.add_argument('--smtp', metavar='HOST:PORT', help='Send through a plain SMTP server, e.g. a local stand-in on localhost:1025')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer.')
+        issue = self._get_issue(options)
+
+        queued = queue_deliveries(issue)
+        if options['retry_failed']:
+            queued += requeue_failed(issue, options['max_attempts'])
+        self.stdout.write(f'Issue {issue.pk} "{issue.subject}": {queued} deliveries queued.')
+
+        try:
+            result = send_issue(
+                issue,
+                batch_size=options['batch_size'],
+                rate=options['rate'],
+                connection_factory=self._connection_factory(options),
+                stdout=self.stdout if options['verbosity'] > 1 else None,
+            )
+        except NewsletterError as exc:
+            raise CommandError(str(exc))
+
+        summary = issue_summary(issue)
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {result.sent}, failed {result.failed} in this run. '
+            f'Issue totals: {summary["sent"]} sent, {summary["failed"]} failed, '
+            f'{summary["pending"]} pending of {summary["total"]}.'
+        ))
+
+    def _get_issue(self, options):
+        if options['issue']:
+            try:
+                return NewsletterIssue.objects.select_related('article').get(pk=options['issue'])
+            except NewsletterIssue.DoesNotExist:
+                raise CommandError(f'Newsletter issue {options["issue"]} does not exist.')
+        if not options['article']:
+            raise CommandError('Give an article slug or id, or --issue to resume.')
+
+        lookup = options['article']
+        article = NewsArticle.objects.filter(slug=lookup).first()
+        if article is None and lookup.isdigit():
+            article = NewsArticle.objects.filter(pk=int(lookup)).first()
+        if article is None:
+            raise CommandError(f'Article "{lookup}" does not exist.')
+
+        latest = article.newsletter_issues.order_by('-created_at', '-pk').first()
+        if latest and not options['resend']:
+            if latest.status == NewsletterIssue.Status.SENT and not options['retry_failed']:
+                raise CommandError(
+                    f'Article was already sent as issue {latest.pk}; use --resend to send it again.'
+                )
+            return latest
+        try:
+            return create_issue(article, subject=options['subject'])
+        except NewsletterError as exc:
+            raise CommandError(str(exc))
+
+    def _connection_factory(self, options):
+        if options['smtp']:
+            host, _sep, port = options['smtp'].rpartition(':')
+            if not host or not port.isdigit():
+                raise CommandError('--smtp must look like HOST:PORT.')
+            return lambda: get_connection(
+                'django.core.mail.backends.smtp.EmailBackend',
+                host=host, port=int(port), username='', password='', use_tls=False, use_ssl=False,
+            )
+        return lambda: get_connection(options['backend'])
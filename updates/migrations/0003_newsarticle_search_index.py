@@ -0,0 +1,53 @@
+import unicodedata
+
+from django.db import migrations
+
+# Frozen copy of the index DDL: later changes to updates.search must not
+# alter what this migration creates.
+TOKENCHARS = ''.join(
+    chr(code) for code in range(0x0900, 0x0980)
+    if unicodedata.category(chr(code)) in ('Mn', 'Mc')
+) + '\u200c\u200d'  # ZWNJ / ZWJ
+
+CREATE_SQL = {
+    'sqlite': [
+        'CREATE VIRTUAL TABLE IF NOT EXISTS updates_newsarticle_fts USING fts5('
+        'title, body, status UNINDEXED, '
+        f"tokenize = \"unicode61 remove_diacritics 0 tokenchars '{TOKENCHARS}'\")",
+    ],
+    'postgresql': [
+        'CREATE TABLE IF NOT EXISTS updates_newsarticle_search ('
+        ' article_id bigint PRIMARY KEY REFERENCES updates_newsarticle (id) ON DELETE CASCADE,'
+        ' body text NOT NULL,'
+        ' status varchar(2) NOT NULL,'
+        ' document tsvector NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS updates_newsarticle_search_document_gin'
+        ' ON updates_newsarticle_search USING GIN (document)',
+    ],
+}
+
+DROP_SQL = {
+    'sqlite': ['DROP TABLE IF EXISTS updates_newsarticle_fts'],
+    'postgresql': ['DROP TABLE IF EXISTS updates_newsarticle_search'],
+}
+
+
+def create_search_index(apps, schema_editor):
+    for sql in CREATE_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    for sql in DROP_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('updates', '0002_newsarticle_read_time'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
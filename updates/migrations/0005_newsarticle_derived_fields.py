@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+from updates.derived import backfill_derived_fields
+
+
+def backfill(apps, schema_editor):
+    backfill_derived_fields(apps.get_model('updates', 'NewsArticle'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('updates', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='body_html',
+            field=models.TextField(blank=True, editable=False, help_text='Sanitized HTML rendered from the content'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, help_text='Plain-text summary of the content'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
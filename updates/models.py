@@ -3,19 +3,12 @@ from django.utils.text import slugify
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
-
-# Helper function to calculate read time
-def calculate_read_time(content):
-    if not content:
-        return 0
-    word_count = len(content.split())
-    # Assumes an average reading speed of 200 words per minute
-    read_time = (word_count + 199) // 200
-    return max(1, read_time) # Ensure a minimum of 1 minute read time
+from .derived import DERIVED_FIELDS, derive_article_fields
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
@@ -43,10 +36,18 @@ class NewsArticle(models.Model):
     category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='articles')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='news_articles')
     image = models.ImageField(upload_to='updates/images/', blank=True, null=True)
+    # Intrinsic size and inline blurred preview of the image, filled on save (images/signals.py)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False)
     content = models.TextField()
     published_date = models.DateTimeField(default=timezone.now)
     # NEW: read_time field to store the calculated value
     read_time = models.PositiveIntegerField(default=0, editable=False, help_text="Estimated read time in minutes")
+    # Derived from content on save (see updates/derived.py)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    excerpt = models.TextField(blank=True, editable=False, help_text="Plain-text summary of the content")
+    body_html = models.TextField(blank=True, editable=False, help_text="Sanitized HTML rendered from the content")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=2, choices=Status.choices, default=Status.DRAFT)
@@ -55,6 +56,11 @@ class NewsArticle(models.Model):
         ordering = ['-published_date']
         verbose_name = "News Article"
         verbose_name_plural = "News Articles"
+        # Composite indexes matching the keyset pagination order (published_date, id)
+        indexes = [
+            models.Index(fields=['status', '-published_date', '-id'], name='news_status_published_idx'),
+            models.Index(fields=['category', 'status', '-published_date', '-id'], name='news_category_published_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -62,23 +68,59 @@ class NewsArticle(models.Model):
     def get_absolute_url(self):
         return reverse('updates:detail', kwargs={'slug': self.slug})
 
-    # MODIFIED: save method now automatically calculates and saves the read_time
+    # save method recomputes the derived fields (read time, excerpt, body HTML) from content
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
-        # Calculate read time based on content before saving
-        if self.content:
-            self.read_time = calculate_read_time(self.content)
+        for name, value in derive_article_fields(self.content).items():
+            setattr(self, name, value)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content' in update_fields:
+            kwargs['update_fields'] = {*update_fields, *DERIVED_FIELDS}
         super().save(*args, **kwargs)
 
+class ArticleTerms(models.Model):
+    """Term counts for a published article; input to the related-articles index"""
+    article = models.OneToOneField(NewsArticle, on_delete=models.CASCADE, primary_key=True, related_name='terms')
+    counts = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Article Terms"
+        verbose_name_plural = "Article Terms"
+
+    def __str__(self):
+        return f"Terms for {self.article_id}"
+
+class RelatedArticle(models.Model):
+    """One of an article's nearest neighbours by TF-IDF similarity (see updates/related.py)"""
+    article = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['article', 'rank']
+        constraints = [
+            # Also serves as the (article, rank) index for the detail page lookup
+            models.UniqueConstraint(fields=['article', 'rank'], name='related_article_rank_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id} -> {self.related_id} ({self.score:.3f})"
+
 class Event(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     location = models.CharField(max_length=150, default="Cooperative Office")
     event_date = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['event_date']
+        indexes = [
+            models.Index(fields=['event_date', 'id'], name='event_date_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -92,3 +134,50 @@ class Subscriber(models.Model):
 
     def __str__(self):
         return self.email
+
+class NewsletterIssue(models.Model):
+    """One mailing of a news article to every subscriber"""
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENDING = 'sending', 'Sending'
+        SENT = 'sent', 'Sent'
+
+    article = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name='newsletter_issues')
+    subject = models.CharField(max_length=200)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.subject
+
+class NewsletterDelivery(models.Model):
+    """Send state of one issue for one recipient, so an interrupted run can resume"""
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENT = 'sent', 'Sent'
+        FAILED = 'failed', 'Failed'
+
+    issue = models.ForeignKey(NewsletterIssue, on_delete=models.CASCADE, related_name='deliveries')
+    subscriber = models.ForeignKey(Subscriber, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    email = models.EmailField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['issue', 'email'], name='newsletter_delivery_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['issue', 'status', 'id'], name='newsletter_delivery_queue_idx'),
+        ]
+        verbose_name_plural = "Newsletter deliveries"
+
+    def __str__(self):
+        return f"{self.email} ({self.get_status_display()})"
@@ -0,0 +1,175 @@
+"""
+Newsletter fan-out: mail a published news article to every subscriber.
+
+Sending an issue has two resumable phases:
+
+1. ``queue_deliveries`` streams subscribers with ``iterator()`` and inserts
+   one ``NewsletterDelivery`` row per address (``ignore_conflicts`` makes a
+   re-run add only subscribers who are missing).
+2. ``send_issue`` walks the pending deliveries in primary-key order, one
+   batch at a time. Each batch reuses a single connection from
+   ``get_connection()`` and records every recipient's outcome when the
+   batch ends, including when it ends with an exception.
+
+A crashed or interrupted run picks up at the first pending delivery.
+Delivery is at-least-once: if the process is killed outright, at most the
+recipients of the batch in flight may get the message twice. Addresses the
+server refuses are marked failed and can be re-queued with
+``requeue_failed``.
+"""
+
+import smtplib
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Count, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import NewsArticle, NewsletterDelivery, NewsletterIssue, Subscriber
+
+# Errors that concern one recipient; anything else aborts the run.
+RECIPIENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError)
+
+
+class NewsletterError(Exception):
+    """Raised when an issue cannot be created or sent"""
+
+
+@dataclass
+class DispatchResult:
+    sent: int = 0
+    failed: int = 0
+
+
+class Throttle:
+    """Spaces calls to ``wait`` so they average at most ``rate`` per second"""
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate and rate > 0 else 0
+        self.clock = clock
+        self.sleep = sleep
+        self.next_at = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = self.clock()
+        if self.next_at is not None and now < self.next_at:
+            self.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+
+def create_issue(article, subject=None):
+    if article.status != NewsArticle.Status.PUBLISHED:
+        raise NewsletterError('Only published articles can be sent as a newsletter.')
+    return NewsletterIssue.objects.create(article=article, subject=subject or article.title)
+
+
+def queue_deliveries(issue, chunk_size=1000):
+    """Create pending deliveries for subscribers not yet queued; return how many were added."""
+    before = issue.deliveries.count()
+    subscribers = Subscriber.objects.order_by('pk').values_list('pk', 'email').iterator(chunk_size=chunk_size)
+    batch = []
+    for pk, email in subscribers:
+        batch.append(NewsletterDelivery(issue=issue, subscriber_id=pk, email=email))
+        if len(batch) >= chunk_size:
+            NewsletterDelivery.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    NewsletterDelivery.objects.bulk_create(batch, ignore_conflicts=True)
+    return issue.deliveries.count() - before
+
+
+def requeue_failed(issue, max_attempts):
+    """Move failed deliveries with fewer than ``max_attempts`` attempts back to pending."""
+    return issue.deliveries.filter(
+        status=NewsletterDelivery.Status.FAILED, attempts__lt=max_attempts
+    ).update(status=NewsletterDelivery.Status.PENDING, error='')
+
+
+def render_issue(issue):
+    """Return ``(text, html)`` bodies; they are identical for every recipient."""
+    article = issue.article
+    context = {
+        'issue': issue,
+        'article': article,
+        'article_url': settings.SITE_URL.rstrip('/') + article.get_absolute_url(),
+        'site_url': settings.SITE_URL,
+    }
+    return (
+        render_to_string('updates/email/newsletter.txt', context),
+        render_to_string('updates/email/newsletter.html', context),
+    )
+
+
+def send_issue(issue, batch_size=None, rate=None, connection_factory=get_connection, stdout=None):
+    """
+    Send every pending delivery of ``issue``. ``connection_factory`` returns
+    an email backend (one is opened per batch); ``rate`` is in messages per
+    second. Returns a ``DispatchResult`` for this run.
+    """
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    rate = settings.NEWSLETTER_MAX_PER_SECOND if rate is None else rate
+    throttle = Throttle(rate)
+    text, html = render_issue(issue)
+    result = DispatchResult()
+
+    if issue.started_at is None:
+        issue.started_at = timezone.now()
+    issue.status = NewsletterIssue.Status.SENDING
+    issue.save(update_fields=['status', 'started_at'])
+
+    pending = issue.deliveries.filter(status=NewsletterDelivery.Status.PENDING).order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(pending.filter(pk__gt=last_pk).only('pk', 'email', 'attempts')[:batch_size])
+        if not batch:
+            break
+        done = []
+        try:
+            with connection_factory() as connection:
+                for delivery in batch:
+                    throttle.wait()
+                    message = EmailMultiAlternatives(
+                        subject=issue.subject,
+                        body=text,
+                        from_email=settings.DEFAULT_FROM_EMAIL,
+                        to=[delivery.email],
+                        connection=connection,
+                    )
+                    message.attach_alternative(html, 'text/html')
+                    delivery.attempts += 1
+                    try:
+                        connection.send_messages([message])
+                    except RECIPIENT_ERRORS as exc:
+                        delivery.status = NewsletterDelivery.Status.FAILED
+                        delivery.error = str(exc)[:1000]
+                        result.failed += 1
+                    else:
+                        delivery.status = NewsletterDelivery.Status.SENT
+                        delivery.sent_at = timezone.now()
+                        result.sent += 1
+                    done.append(delivery)
+        finally:
+            NewsletterDelivery.objects.bulk_update(done, ['status', 'attempts', 'sent_at', 'error'])
+        last_pk = batch[-1].pk
+        if stdout is not None:
+            stdout.write(f'  {result.sent} sent, {result.failed} failed (up to delivery {last_pk})')
+
+    if not issue.deliveries.filter(status=NewsletterDelivery.Status.PENDING).exists():
+        issue.status = NewsletterIssue.Status.SENT
+        issue.completed_at = timezone.now()
+        issue.save(update_fields=['status', 'completed_at'])
+    return result
+
+
+def issue_summary(issue):
+    return issue.deliveries.aggregate(
+        total=Count('id'),
+        sent=Count('id', filter=Q(status=NewsletterDelivery.Status.SENT)),
+        failed=Count('id', filter=Q(status=NewsletterDelivery.Status.FAILED)),
+        pending=Count('id', filter=Q(status=NewsletterDelivery.Status.PENDING)),
+    )
@@ -0,0 +1,215 @@
+"""
+Related-articles index.
+
+Every published article is turned into a TF-IDF vector over its title and
+sanitized body (using the Devanagari-aware tokenizer from
+``updates.search``), and its ``RELATED_COUNT`` most similar articles by
+cosine similarity are stored in ``RelatedArticle``. The detail page then
+reads its neighbours with a single indexed lookup on ``(article, rank)``.
+
+Raw term counts live in ``ArticleTerms`` so the corpus can be rebuilt as a
+sparse matrix without re-tokenizing every article:
+
+* ``rebuild_related_index`` (``rebuild_related_articles`` command) recounts
+  every article and recomputes all neighbour lists, multiplying the
+  normalized matrix by its transpose in blocks of rows.
+* ``update_article_related`` runs on the job queue shortly after an article
+  is saved, not in the saving request; a burst of saves of one article
+  shares a single run. It refreshes that article's counts and neighbours,
+  plus the lists of any article whose top-k it enters or leaves. Other
+  articles keep vectors weighted by the IDF of their last refresh, so a
+  periodic full rebuild keeps scores exact.
+"""
+
+import math
+from collections import Counter
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Min
+from scipy import sparse
+
+from main.caching import invalidate_model
+
+from .derived import plain_text
+from .models import ArticleTerms, NewsArticle, RelatedArticle
+from .search import tokenize
+
+RELATED_COUNT = 5
+MIN_SCORE = 0.05
+TITLE_REPEAT = 3
+BLOCK_SIZE = 500
+
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it its of on or that the
+    this to was were will with we our you your their they he she his her
+    र छ छन् हो को का की मा ले लाई बाट पनि यो त्यो तथा गर्न गरेको गरी भएको
+""".split())
+
+
+def term_counts(title, body_html):
+    """Counter of index terms; title terms count ``TITLE_REPEAT`` times."""
+    counts = Counter()
+    for weight, text in ((TITLE_REPEAT, title), (1, plain_text(body_html))):
+        for token in tokenize(text):
+            if len(token) > 1 and not token.isdigit() and token not in STOPWORDS:
+                counts[token] += weight
+    return counts
+
+
+class _Corpus:
+    """L2-normalized TF-IDF matrix (articles x terms) of published articles"""
+
+    def __init__(self, rows):
+        self.ids = np.array([article_id for article_id, _counts in rows], dtype=np.int64)
+        self.position = {int(article_id): i for i, article_id in enumerate(self.ids)}
+
+        vocabulary = {}
+        row_index, col_index, values = [], [], []
+        for i, (_article_id, counts) in enumerate(rows):
+            for term, count in counts.items():
+                row_index.append(i)
+                col_index.append(vocabulary.setdefault(term, len(vocabulary)))
+                values.append(1.0 + math.log(count))  # sublinear tf
+        matrix = sparse.csr_matrix(
+            (values, (row_index, col_index)), shape=(len(rows), len(vocabulary)), dtype=np.float64
+        )
+
+        document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        idf = np.log((1 + len(rows)) / (1 + document_frequency)) + 1
+        matrix = matrix @ sparse.diags(idf)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        self.matrix = sparse.csr_matrix(sparse.diags(1 / norms) @ matrix)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def similarities(self, positions):
+        """Sparse cosine similarities of the given rows against every article."""
+        return self.matrix[positions] @ self.matrix.T
+
+    def neighbours(self, positions):
+        """Return ``{article_id: [(related_id, score), ...]}`` for the given rows."""
+        result = {}
+        for start in range(0, len(positions), BLOCK_SIZE):
+            block = positions[start:start + BLOCK_SIZE]
+            sims = sparse.csr_matrix(self.similarities(block))
+            for offset, position in enumerate(block):
+                row = slice(sims.indptr[offset], sims.indptr[offset + 1])
+                columns, scores = sims.indices[row], sims.data[row]
+                keep = (columns != position) & (scores >= MIN_SCORE)
+                columns, scores = columns[keep], scores[keep]
+                if len(scores) > RELATED_COUNT:
+                    top = np.argpartition(-scores, RELATED_COUNT)[:RELATED_COUNT]
+                    columns, scores = columns[top], scores[top]
+                order = np.lexsort((self.ids[columns], -scores))
+                result[int(self.ids[position])] = [
+                    (int(self.ids[columns[i]]), float(scores[i])) for i in order
+                ]
+        return result
+
+
+def _load_corpus():
+    rows = list(
+        ArticleTerms.objects
+        .filter(article__status=NewsArticle.Status.PUBLISHED)
+        .order_by('article_id')
+        .values_list('article_id', 'counts')
+    )
+    return _Corpus(rows)
+
+
+def _write_neighbours(neighbours):
+    RelatedArticle.objects.filter(article_id__in=list(neighbours)).delete()
+    RelatedArticle.objects.bulk_create(
+        [
+            RelatedArticle(article_id=article_id, related_id=related_id, rank=rank, score=score)
+            for article_id, links in neighbours.items()
+            for rank, (related_id, score) in enumerate(links, start=1)
+        ],
+        batch_size=BLOCK_SIZE,
+    )
+    # bulk_create sends no post_save, so bump the version (and page ETags) here.
+    invalidate_model(RelatedArticle)
+
+
+def _refresh(corpus, article_ids):
+    positions = [corpus.position[pk] for pk in article_ids if pk in corpus.position]
+    neighbours = corpus.neighbours(positions)
+    # Articles no longer in the corpus (unpublished/deleted) lose their lists.
+    neighbours.update({pk: [] for pk in article_ids if pk not in corpus.position})
+    _write_neighbours(neighbours)
+
+
+def _affected_by(corpus, position):
+    """Articles whose top-k could change because of the article at ``position``."""
+    sims = np.asarray(corpus.similarities([position]).todense()).ravel()
+    candidates = [i for i in np.flatnonzero(sims >= MIN_SCORE) if i != position]
+    candidate_ids = [int(corpus.ids[i]) for i in candidates]
+    floors = {}
+    for start in range(0, len(candidate_ids), BLOCK_SIZE):
+        floors.update(
+            (row['article_id'], (row['n'], row['low']))
+            for row in RelatedArticle.objects
+            .filter(article_id__in=candidate_ids[start:start + BLOCK_SIZE])
+            .values('article_id').annotate(n=Count('id'), low=Min('score'))
+        )
+    affected = set()
+    for i, article_id in zip(candidates, candidate_ids):
+        count, low = floors.get(article_id, (0, 0.0))
+        if count < RELATED_COUNT or sims[i] > low:
+            affected.add(article_id)
+    return affected
+
+
+@transaction.atomic
+def update_article_related(article_id):
+    """Incrementally refresh the index after article ``article_id`` changed."""
+    article = NewsArticle.objects.filter(pk=article_id).only('title', 'body_html', 'status').first()
+    # Lists that currently point at the article may need to drop or reorder it.
+    affected = set(RelatedArticle.objects.filter(related_id=article_id).values_list('article_id', flat=True))
+
+    if article is None or article.status != NewsArticle.Status.PUBLISHED:
+        ArticleTerms.objects.filter(article_id=article_id).delete()
+        RelatedArticle.objects.filter(article_id=article_id).delete()
+        if affected:
+            _refresh(_load_corpus(), affected)
+        return
+
+    ArticleTerms.objects.update_or_create(
+        article_id=article_id, defaults={'counts': term_counts(article.title, article.body_html)}
+    )
+    corpus = _load_corpus()
+    affected |= _affected_by(corpus, corpus.position[article_id])
+    _refresh(corpus, affected | {article_id})
+
+
+@transaction.atomic
+def refresh_related(article_ids):
+    """Recompute the neighbour lists of ``article_ids`` against the current corpus."""
+    if article_ids:
+        _refresh(_load_corpus(), set(article_ids))
+
+
+@transaction.atomic
+def rebuild_related_index(chunk_size=BLOCK_SIZE):
+    """Recount every published article and recompute all neighbour lists."""
+    ArticleTerms.objects.all().delete()
+    articles = (
+        NewsArticle.objects.filter(status=NewsArticle.Status.PUBLISHED)
+        .only('title', 'body_html')
+        .iterator(chunk_size=chunk_size)
+    )
+    batch = []
+    for article in articles:
+        batch.append(ArticleTerms(article=article, counts=term_counts(article.title, article.body_html)))
+        if len(batch) >= chunk_size:
+            ArticleTerms.objects.bulk_create(batch)
+            batch = []
+    ArticleTerms.objects.bulk_create(batch)
+
+    corpus = _load_corpus()
+    RelatedArticle.objects.all().delete()
+    _write_neighbours(corpus.neighbours(list(range(len(corpus)))))
+    return len(corpus)
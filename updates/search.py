@@ -0,0 +1,260 @@
+"""
+Full-text search for news articles.
+
+Articles are mirrored into a search index kept in the same database:
+
+* SQLite (development): an FTS5 virtual table ranked with ``bm25()``.
+* PostgreSQL (``coop/production.py``): a side table holding a ``tsvector``
+  with a GIN index, ranked with ``ts_rank()``.
+
+Neither database's default word splitter copes with Devanagari: both break
+words at vowel signs and viramas. ``tokenize`` keeps those combining marks
+inside the token. FTS5 gets the same marks as ``tokenchars``. On PostgreSQL
+the ``tsvector`` and ``tsquery`` are built from our own tokens instead of
+going through the text-search parser.
+
+Results are paged with keyset cursors on ``(score, id)``, so deep pages cost
+the same as the first one.
+"""
+
+import base64
+import binascii
+import json
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import connection
+from django.utils.html import escape
+
+from .derived import plain_text
+
+DEVANAGARI_MARKS = ''.join(
+    chr(code) for code in range(0x0900, 0x0980)
+    if unicodedata.category(chr(code)) in ('Mn', 'Mc')
+)
+JOINERS = '\u200c\u200d'  # ZWNJ / ZWJ appear inside Nepali words
+
+TOKEN_RE = re.compile(rf'[\w{DEVANAGARI_MARKS}{JOINERS}]+')
+TOKEN_SPLIT_RE = re.compile(rf'([\w{DEVANAGARI_MARKS}{JOINERS}]+)')
+
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+SNIPPET_WORDS = 30
+
+
+def normalize(text):
+    return unicodedata.normalize('NFC', text or '').casefold()
+
+
+def tokenize(text):
+    """Split text into lower-cased tokens, keeping Devanagari words whole."""
+    return TOKEN_RE.findall(normalize(text))
+
+
+def article_body(article):
+    """Plain text of an article's sanitized body, as stored in the index."""
+    return plain_text(article.body_html)
+
+
+def make_snippet(text, tokens, words=SNIPPET_WORDS):
+    """
+    Return an HTML-escaped excerpt of ``text`` around the first match with
+    every token that prefixes a query term wrapped in ``<mark>``.
+    """
+    parts = TOKEN_SPLIT_RE.split(text)
+    word_indexes = range(1, len(parts), 2)
+    if not word_indexes:
+        return escape(text[:200])
+    prefixes = tuple(tokens)
+
+    def is_hit(part):
+        return bool(prefixes) and normalize(part).startswith(prefixes)
+
+    first_hit = next((n for n, i in enumerate(word_indexes) if is_hit(parts[i])), 0)
+    start = max(0, first_hit - words // 3)
+    end = min(len(word_indexes), start + words)
+
+    first_part = word_indexes[start]
+    last_part = word_indexes[end - 1]
+    out = ['&hellip;'] if start > 0 else []
+    for i in range(first_part, last_part + 1):
+        part = escape(parts[i])
+        out.append(f'<mark>{part}</mark>' if i % 2 and is_hit(parts[i]) else part)
+    if end < len(word_indexes):
+        out.append('&hellip;')
+    return ''.join(out)
+
+
+def encode_cursor(score, pk):
+    raw = json.dumps([score, pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return ``(score, pk)`` or ``None`` for a missing or malformed token."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        score, pk = json.loads(raw)
+        # Tokens come from the query string: only a finite number and a
+        # positive 64-bit id may reach the query
+        if isinstance(score, bool) or not isinstance(score, (int, float)):
+            return None
+        if isinstance(pk, bool) or not isinstance(pk, int) or not 0 < pk < 2 ** 63:
+            return None
+        score = float(score)
+        if not math.isfinite(score):
+            return None
+        return score, pk
+    except (ValueError, TypeError, OverflowError, binascii.Error):
+        return None
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    pk: int
+    score: float
+    snippet: str
+
+
+class SqliteSearchBackend:
+    table = 'updates_newsarticle_fts'
+
+    def index(self, article):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [article.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, body, status) VALUES (%s, %s, %s, %s)',
+                [article.pk, unicodedata.normalize('NFC', article.title), article_body(article), article.status]
+            )
+
+    def remove(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [pk])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def _match(self, tokens):
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def search(self, tokens, status, after, limit):
+        sql = (
+            f'SELECT id, score, body FROM ('
+            f' SELECT rowid AS id, bm25({self.table}, %s, %s) AS score, body, status'
+            f' FROM {self.table} WHERE {self.table} MATCH %s'
+            f') WHERE status = %s'
+        )
+        params = [TITLE_WEIGHT, BODY_WEIGHT, self._match(tokens), status]
+        return _run_keyset(sql, params, after, limit)
+
+    def matching_ids(self, tokens):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+                [self._match(tokens)]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend:
+    table = 'updates_newsarticle_search'
+
+    @staticmethod
+    def _tsvector(title, body):
+        """Build a tsvector literal with title terms weighted A and body terms B."""
+        positions = defaultdict(list)
+        position = 1
+        for weight, text in (('A', title), ('B', body)):
+            for token in tokenize(text):
+                # PostgreSQL limits positions to 16383, 256 per lexeme, 2KB per lexeme.
+                if len(token.encode()) < 2048 and position < 16384 and len(positions[token]) < 256:
+                    positions[token].append(f'{position}{weight}')
+                position += 1
+        return ' '.join(
+            f"'{token}':{','.join(entries)}" for token, entries in positions.items() if entries
+        )
+
+    def index(self, article):
+        body = article_body(article)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table} (article_id, body, status, document)'
+                f' VALUES (%s, %s, %s, %s::tsvector)'
+                f' ON CONFLICT (article_id) DO UPDATE SET'
+                f' body = EXCLUDED.body, status = EXCLUDED.status, document = EXCLUDED.document',
+                [article.pk, body, article.status, self._tsvector(article.title, body)]
+            )
+
+    def remove(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE article_id = %s', [pk])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def _query(self, tokens):
+        return ' & '.join(f"'{token}':*" for token in tokens)
+
+    def search(self, tokens, status, after, limit):
+        sql = (
+            f'SELECT id, score, body FROM ('
+            f' SELECT s.article_id AS id, -ts_rank(s.document, q) AS score, s.body'
+            f' FROM {self.table} s, CAST(%s AS tsquery) q'
+            f' WHERE s.document @@ q AND s.status = %s'
+            f') hits WHERE TRUE'
+        )
+        return _run_keyset(sql, [self._query(tokens), status], after, limit)
+
+    def matching_ids(self, tokens):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT article_id FROM {self.table} WHERE document @@ CAST(%s AS tsquery)',
+                [self._query(tokens)]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def _run_keyset(sql, params, after, limit):
+    """Append the keyset condition and ordering to a backend's hit query."""
+    if after is not None:
+        sql += ' AND (score > %s OR (score = %s AND id > %s))'
+        params += [after[0], after[0], after[1]]
+    sql += ' ORDER BY score, id LIMIT %s'
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+BACKENDS = {
+    'sqlite': SqliteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend():
+    """Return the search backend for the default database, or None if unsupported."""
+    backend = BACKENDS.get(connection.vendor)
+    return backend() if backend else None
+
+
+def search_articles(query, status, after=None, limit=10):
+    """
+    Run ``query`` against the index and return ``(hits, next_cursor)``.
+    ``after`` is a cursor token from a previous page.
+    """
+    backend = get_backend()
+    tokens = tokenize(query)
+    if backend is None or not tokens:
+        return [], None
+    rows = backend.search(tokens, status, decode_cursor(after), limit + 1)
+    hits = [SearchHit(pk=pk, score=score, snippet=make_snippet(body, tokens)) for pk, score, body in rows[:limit]]
+    next_cursor = encode_cursor(hits[-1].score, hits[-1].pk) if len(rows) > limit else None
+    return hits, next_cursor
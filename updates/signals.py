@@ -0,0 +1,46 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import NewsArticle, RelatedArticle
+from .search import get_backend
+from .tasks import queue_related_update, refresh_related_articles
+
+
+@receiver(post_save, sender=NewsArticle, dispatch_uid='updates_index_article')
+def index_article(sender, instance, raw=False, **kwargs):
+    """Keep the full-text search index in step with the article table."""
+    backend = get_backend()
+    if backend and not raw:
+        backend.index(instance)
+
+
+@receiver(post_delete, sender=NewsArticle, dispatch_uid='updates_unindex_article')
+def unindex_article(sender, instance, **kwargs):
+    backend = get_backend()
+    if backend:
+        backend.remove(instance.pk)
+
+
+@receiver(post_save, sender=NewsArticle, dispatch_uid='updates_relate_article')
+def relate_article(sender, instance, raw=False, **kwargs):
+    """Queue a related-articles refresh once the save is committed."""
+    if not raw:
+        transaction.on_commit(partial(queue_related_update, instance.pk))
+
+
+@receiver(pre_delete, sender=NewsArticle, dispatch_uid='updates_collect_related_referrers')
+def collect_related_referrers(sender, instance, **kwargs):
+    # The cascade removes the links pointing at this article, so note their owners first.
+    instance._related_referrers = list(
+        RelatedArticle.objects.filter(related=instance).values_list('article_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=NewsArticle, dispatch_uid='updates_unrelate_article')
+def unrelate_article(sender, instance, **kwargs):
+    referrers = getattr(instance, '_related_referrers', None)
+    if referrers:
+        transaction.on_commit(partial(refresh_related_articles.enqueue, referrers))
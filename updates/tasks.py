@@ -0,0 +1,28 @@
+from jobs.models import Job
+from jobs.registry import enqueue, task
+
+from .related import refresh_related, update_article_related
+
+# Saves of the same article within this many seconds share one index update
+RELATED_UPDATE_DELAY = 30
+
+
+@task
+def update_related_articles(article_id):
+    update_article_related(article_id)
+    return {'article': article_id}
+
+
+@task
+def refresh_related_articles(article_ids):
+    refresh_related(article_ids)
+    return {'articles': len(article_ids)}
+
+
+def queue_related_update(article_id):
+    """Schedule ``update_related_articles`` unless one for the article is still waiting."""
+    waiting = Job.objects.filter(
+        name=update_related_articles.name, status=Job.Status.QUEUED, args=[article_id],
+    )
+    if not waiting.exists():
+        enqueue(update_related_articles, args=[article_id], delay=RELATED_UPDATE_DELAY)
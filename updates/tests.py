@@ -1,3 +1,203 @@
-from django.test import TestCase
+import base64
+import io
+import json
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from .derived import backfill_derived_fields, derive_article_fields, render_body, sanitize_html
+from .models import Category, NewsArticle, RelatedArticle
+from .related import update_article_related
+from .search import decode_cursor, encode_cursor, make_snippet, search_articles
+
+
+def forge(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(-1.5, 7)), (-1.5, 7))
+
+    def test_forged_cursors_are_ignored(self):
+        for token in (
+            'WzEsIDFlOTk5XQ',  # [1, 1e999]
+            forge([1, 10 ** 400]),
+            forge([10 ** 400, 1]),
+            forge([float('inf'), 1]),
+            forge([float('nan'), 1]),
+            forge([1.0, 1.5]),
+            forge([1.0, '1']),
+            forge(['1', 1]),
+            forge([True, 1]),
+            forge([1.0, 0]),
+            forge([1.0]),
+            forge({'score': 1}),
+            'not base64!',
+        ):
+            with self.subTest(token=token):
+                self.assertIsNone(decode_cursor(token))
+
+
+class SnippetTests(SimpleTestCase):
+    def test_marks_prefix_matches_and_escapes(self):
+        snippet = make_snippet('Apply for <loans> today', ['loan'])
+        self.assertEqual(snippet, 'Apply for &lt;<mark>loans</mark>&gt; today')
+
+    def test_devanagari_word_kept_whole(self):
+        snippet = make_snippet('साधारण सभा सम्पन्न', ['सभा'])
+        self.assertIn('<mark>सभा</mark>', snippet)
+
+    def test_long_text_is_trimmed_around_first_hit(self):
+        text = ' '.join(f'word{i}' for i in range(100)) + ' loan ' + ' '.join(f'tail{i}' for i in range(100))
+        snippet = make_snippet(text, ['loan'], words=12)
+        self.assertTrue(snippet.startswith('&hellip;'))
+        self.assertTrue(snippet.endswith('&hellip;'))
+        self.assertIn('<mark>loan</mark>', snippet)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='editor')
+        category = Category.objects.create(name='Notices')
+
+        def article(title, content, status=NewsArticle.Status.PUBLISHED):
+            return NewsArticle.objects.create(
+                title=title, content=content, status=status, author=author, category=category,
+            )
+
+        cls.in_body = article('Annual meeting', 'Members discussed the new loan rates at length.')
+        cls.in_title = article('Loan rates revised', 'Rates change from next month.')
+        article('Office closed', 'The office is closed for the festival.')
+        article('Loan draft', 'Draft loan notice.', status=NewsArticle.Status.DRAFT)
+
+    def test_title_matches_rank_first(self):
+        hits, next_cursor = search_articles('loan', NewsArticle.Status.PUBLISHED)
+        self.assertEqual([hit.pk for hit in hits], [self.in_title.pk, self.in_body.pk])
+        self.assertIsNone(next_cursor)
+        self.assertIn('<mark>loan</mark>', hits[1].snippet)
+
+    def test_pages_follow_cursor(self):
+        first, cursor = search_articles('loan', NewsArticle.Status.PUBLISHED, limit=1)
+        second, last = search_articles('loan', NewsArticle.Status.PUBLISHED, after=cursor, limit=1)
+        self.assertEqual([first[0].pk, second[0].pk], [self.in_title.pk, self.in_body.pk])
+        self.assertIsNone(last)
+
+    def test_forged_cursor_on_search_page(self):
+        response = self.client.get('/updates/search/', {'q': 'loan', 'after': 'WzEsIDFlOTk5XQ'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Loan rates revised')
+
+
+class RelatedArticleTests(TestCase):
+    def test_saved_article_is_linked_both_ways(self):
+        author = User.objects.create(username='editor')
+        category = Category.objects.create(name='Notices')
+        articles = [
+            NewsArticle.objects.create(
+                title=title, content=content, author=author, category=category,
+                status=NewsArticle.Status.PUBLISHED,
+            )
+            for title, content in (
+                ('Loan interest rates', 'Loan interest rates for members are revised.'),
+                ('Festival holiday', 'The office is closed for the festival holiday.'),
+                ('New loan interest', 'Interest on every loan product changes this month.'),
+            )
+        ]
+        for article in articles:
+            update_article_related(article.pk)
+
+        first, _, last = articles
+        self.assertEqual(list(RelatedArticle.objects.filter(article=last).values_list('related', flat=True)), [first.pk])
+        self.assertEqual(list(RelatedArticle.objects.filter(article=first).values_list('related', flat=True)), [last.pk])
+
+
+class SanitizerTests(SimpleTestCase):
+    def assertSanitized(self, cases):
+        for content, expected in cases:
+            with self.subTest(content=content):
+                self.assertEqual(sanitize_html(content), expected)
+
+    def test_script_urls_are_dropped(self):
+        self.assertSanitized([
+            ('<a href="javascript:alert(1)">x</a>', '<a>x</a>'),
+            ('<a href=" JaVaScRiPt:alert(1)">x</a>', '<a>x</a>'),
+            ('<a href="&#106;avascript:alert(1)">x</a>', '<a>x</a>'),
+            ('<a href="java&#x09;script:alert(1)">x</a>', '<a>x</a>'),
+            ('<a href="data:text/html,&lt;script&gt;">x</a>', '<a>x</a>'),
+            ('<img src="vbscript:x">', '<img>'),
+        ])
+
+    def test_safe_urls_are_kept(self):
+        self.assertSanitized([
+            ('<a href="https://example.com/?a=1&amp;b=2">x</a>', '<a href="https://example.com/?a=1&amp;b=2">x</a>'),
+            ('<a href="mailto:office@example.com">x</a>', '<a href="mailto:office@example.com">x</a>'),
+            ('<a href="/downloads/">x</a>', '<a href="/downloads/">x</a>'),
+        ])
+
+    def test_handlers_and_styles_are_dropped(self):
+        self.assertSanitized([
+            ('<img src=x onerror=alert(1)>', '<img src="x">'),
+            ('<p onclick="alert(1)" style="background:url(x)">t</p>', '<p>t</p>'),
+            ('<div class="x" id="y">t</div>', '<div>t</div>'),
+        ])
+
+    def test_dangerous_elements_lose_their_content(self):
+        self.assertSanitized([
+            ('<svg><script>alert(1)</script></svg>', ''),
+            ('<script>alert(1)</script>after', 'after'),
+            ('<iframe src="//evil.example">hi</iframe>after', 'after'),
+            ('<style>p { color: red }</style><p>ok', '<p>ok</p>'),
+            ('<object data="x"><embed src="y"></object>ok', 'ok'),
+            ('<embed src="y">after', 'after'),
+        ])
+
+    def test_text_is_escaped_and_tags_balanced(self):
+        self.assertSanitized([
+            ('<p>1 &lt; 2 &amp; <unknown>x</unknown></p>', '<p>1 &lt; 2 &amp; x</p>'),
+            ('<b>bold <i>it</b>', '<b>bold <i>it</i></b>'),
+            ('<ul><li>a<li>b</ul>', '<ul><li>a</li><li>b</li></ul>'),
+            ('<p>open', '<p>open</p>'),
+        ])
+
+    def test_target_gets_noopener(self):
+        self.assertEqual(
+            sanitize_html('<a href="https://example.com" target="_blank">x</a>'),
+            '<a href="https://example.com" target="_blank" rel="noopener noreferrer">x</a>',
+        )
+
+    def test_plain_text_is_escaped_with_breaks(self):
+        self.assertEqual(render_body('One & two\nthree\n\n<3 four'), '<p>One &amp; two<br>three</p>\n\n<p>&lt;3 four</p>')
+
+
+class DerivedFieldTests(TestCase):
+    def test_derived_values(self):
+        fields = derive_article_fields('<p>' + 'शब्द ' * 250 + '</p><script>hidden words here</script>')
+        self.assertEqual(fields['word_count'], 250)
+        self.assertEqual(fields['read_time'], 2)
+        self.assertEqual(fields['excerpt'], ' '.join(['शब्द'] * 40) + '…')
+        self.assertNotIn('hidden', fields['body_html'])
+        self.assertEqual(derive_article_fields('')['read_time'], 0)
+        self.assertEqual(derive_article_fields('Short note.')['read_time'], 1)
+
+    def test_backfill_in_chunks(self):
+        author = User.objects.create(username='editor')
+        category = Category.objects.create(name='Notices')
+        for i in range(5):
+            NewsArticle.objects.create(title=f'Article {i}', content=f'Body {i} <b>bold</b>', author=author, category=category)
+        NewsArticle.objects.update(read_time=0, word_count=0, excerpt='', body_html='')
+        NewsArticle.objects.filter(title='Article 0').update(body_html='<p>kept</p>')
+
+        stdout = io.StringIO()
+        self.assertEqual(backfill_derived_fields(NewsArticle, chunk_size=2, only_missing=True, stdout=stdout), 4)
+        self.assertEqual(stdout.getvalue().count('articles updated'), 2)
+        self.assertEqual(NewsArticle.objects.get(title='Article 0').body_html, '<p>kept</p>')
+        article = NewsArticle.objects.get(title='Article 3')
+        self.assertEqual(
+            (article.word_count, article.read_time, article.excerpt, article.body_html),
+            (3, 1, 'Body 3 bold', 'Body 3 <b>bold</b>'),
+        )
+
+        self.assertEqual(backfill_derived_fields(NewsArticle, chunk_size=2), 5)
+        self.assertEqual(NewsArticle.objects.get(title='Article 0').word_count, 3)
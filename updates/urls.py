@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import feeds, views
 
 # Defines a namespace for this app's URLs.
 # This is important for using names like 'updates:list' in templates.
@@ -19,9 +19,20 @@ urlpatterns = [
     # Example: /updates/subscribe/ (for the newsletter form)
     path('subscribe/', views.subscribe_view, name='subscribe'),
     
+    # Example: /updates/search/?q=साधारण+सभा
+    path('search/', views.search_view, name='search'),
+    
     # Example: /updates/all-news/
     path('all-news/', views.all_news_list_view, name='news-all-list'),
     
+    # Example: /updates/feed/atom/ and /updates/feed/json/
+    path('feed/atom/', feeds.news_atom_feed, name='feed-atom'),
+    path('feed/json/', feeds.news_json_feed, name='feed-json'),
+
+    # Example: /updates/category/general-notice/feed/atom/
+    path('category/<slug:category_slug>/feed/atom/', feeds.category_atom_feed, name='category-feed-atom'),
+    path('category/<slug:category_slug>/feed/json/', feeds.category_json_feed, name='category-feed-json'),
+
     # Example: /updates/category/general-notice/
     path('category/<slug:category_slug>/', views.article_by_category_view, name='article-by-category'),
     
@@ -1,49 +1,70 @@
 from django.shortcuts import render, get_object_or_404
 from django.utils import timezone
 from django.http import JsonResponse
-from django.core.paginator import Paginator
-from .models import NewsArticle, Event, Category, Subscriber
+from main.caching import cached
+from main.conditional import content_condition
+from main.pagination import KeysetPaginator
+from counters.middleware import count_response
+from .models import NewsArticle, Event, Category, Subscriber, RelatedArticle
 from .forms import SubscriptionForm
+from .search import search_articles
 
-def calculate_read_time(content):
-    if not content: return 0
-    word_count = len(content.split())
-    read_time = (word_count + 199) // 200
-    return max(1, read_time)
+SEARCH_PAGE_SIZE = 10
+RELATED_ON_PAGE = 2
+ARTICLE_ORDERING = ('-published_date', '-id')
+# Columns list pages never render; they use the stored excerpt instead.
+LIST_DEFERRED_FIELDS = ('content', 'body_html')
+LANDING_MODELS = (NewsArticle, Event, Category)
+ARTICLE_MODELS = (NewsArticle, Category)
 
-def news_list_view(request):
-    news_articles = NewsArticle.objects.filter(status=NewsArticle.Status.PUBLISHED).select_related('author', 'category')[:3]
-    upcoming_events = Event.objects.filter(event_date__gte=timezone.now()).order_by('event_date')[:3]
-    subscription_form = SubscriptionForm()
-    categories = Category.objects.all()
+def published_articles():
+    return NewsArticle.objects.filter(status=NewsArticle.Status.PUBLISHED).select_related('author', 'category')
 
-    for article in news_articles:
-        article.read_time_minutes = calculate_read_time(article.content)
+def passed_events(request=None, *args, **kwargs):
+    """How many events have started; the upcoming/past split moves with the clock, not with edits."""
+    return Event.objects.filter(event_date__lt=timezone.now()).count()
 
-    context = {
-        'news_articles': news_articles,
-        'upcoming_events': upcoming_events,
-        'subscription_form': subscription_form,
-        'categories': categories,
+def build_landing_data():
+    return {
+        'news_articles': list(published_articles().defer(*LIST_DEFERRED_FIELDS)[:3]),
+        'upcoming_events': list(Event.objects.filter(event_date__gte=timezone.now()).order_by('event_date')[:3]),
+        'categories': list(Category.objects.all()),
     }
+
+@content_condition(*LANDING_MODELS, extra=passed_events)
+def news_list_view(request):
+    context = dict(cached('updates:landing', LANDING_MODELS, build_landing_data, parts=(passed_events(),)))
+    context['subscription_form'] = SubscriptionForm()
     return render(request, 'updates/news_events.html', context)
 
+@content_condition(NewsArticle, Category, RelatedArticle)
 def news_detail_view(request, slug):
-    article = get_object_or_404(NewsArticle, slug=slug, status=NewsArticle.Status.PUBLISHED)
-    article.read_time_minutes = calculate_read_time(article.content)
-    related_articles = NewsArticle.objects.filter(category=article.category, status=NewsArticle.Status.PUBLISHED).exclude(pk=article.pk)[:2]
+    article = get_object_or_404(published_articles().defer('content'), slug=slug)
+    links = (
+        RelatedArticle.objects.filter(article=article, related__status=NewsArticle.Status.PUBLISHED)
+        .select_related('related')
+        .only('related__title', 'related__slug', 'related__published_date')[:RELATED_ON_PAGE]
+    )
+    related_articles = [link.related for link in links]
+    if not related_articles:
+        # Not indexed yet (or nothing similar): fall back to the newest in the same category.
+        related_articles = (
+            NewsArticle.objects.filter(category_id=article.category_id, status=NewsArticle.Status.PUBLISHED)
+            .exclude(pk=article.pk)
+            .only('title', 'slug', 'published_date')[:RELATED_ON_PAGE]
+        )
     
     context = {
         'article': article,
         'related_articles': related_articles,
     }
-    return render(request, 'updates/news_detail.html', context)
+    return count_response(render(request, 'updates/news_detail.html', context), article)
 
+@content_condition(*ARTICLE_MODELS)
 def all_news_list_view(request):
-    all_articles = NewsArticle.objects.filter(status=NewsArticle.Status.PUBLISHED).select_related('author', 'category')
-    paginator = Paginator(all_articles, 6) 
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    all_articles = published_articles().defer(*LIST_DEFERRED_FIELDS)
+    paginator = KeysetPaginator(all_articles, ARTICLE_ORDERING, 6)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'page_obj': page_obj, 
@@ -51,12 +72,12 @@ def all_news_list_view(request):
     }
     return render(request, 'updates/all_news_list.html', context)
 
+@content_condition(*ARTICLE_MODELS)
 def article_by_category_view(request, category_slug):
     category = get_object_or_404(Category, slug=category_slug)
-    articles = NewsArticle.objects.filter(category=category, status=NewsArticle.Status.PUBLISHED).select_related('author', 'category')
-    paginator = Paginator(articles, 6)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    articles = published_articles().filter(category=category).defer(*LIST_DEFERRED_FIELDS)
+    paginator = KeysetPaginator(articles, ARTICLE_ORDERING, 6)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'page_obj': page_obj,
@@ -65,22 +86,44 @@ def article_by_category_view(request, category_slug):
     }
     return render(request, 'updates/all_news_list.html', context)
 
+@content_condition(Event, extra=passed_events)
 def event_list_view(request):
-    event_list = Event.objects.filter(event_date__gte=timezone.now()).order_by('event_date')
-    paginator = Paginator(event_list, 5) 
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    event_list = Event.objects.filter(event_date__gte=timezone.now())
+    paginator = KeysetPaginator(event_list, ('event_date', 'id'), 5)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     context = {'page_obj': page_obj, 'page_title': 'All Upcoming Events'}
     return render(request, 'updates/event_list.html', context)
 
+@content_condition(Event, extra=passed_events)
 def past_event_list_view(request):
-    past_events = Event.objects.filter(event_date__lt=timezone.now()).order_by('-event_date')
-    paginator = Paginator(past_events, 5)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    past_events = Event.objects.filter(event_date__lt=timezone.now())
+    paginator = KeysetPaginator(past_events, ('-event_date', '-id'), 5)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     context = {'page_obj': page_obj, 'page_title': 'Past Events Archive'}
     return render(request, 'updates/past_event_list.html', context)
 
+def search_view(request):
+    query = request.GET.get('q', '').strip()[:200]
+    hits, next_cursor = search_articles(
+        query, NewsArticle.Status.PUBLISHED, after=request.GET.get('after'), limit=SEARCH_PAGE_SIZE
+    )
+    articles = NewsArticle.objects.select_related('author', 'category').defer(*LIST_DEFERRED_FIELDS).in_bulk([hit.pk for hit in hits])
+    results = []
+    for hit in hits:
+        article = articles.get(hit.pk)
+        if article:
+            article.snippet = hit.snippet
+            results.append(article)
+
+    context = {
+        'query': query,
+        'results': results,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('after'),
+        'page_title': f'Search results for "{query}"' if query else 'Search News',
+    }
+    return render(request, 'updates/search_results.html', context)
+
 def subscribe_view(request):
     if request.method == 'POST':
         form = SubscriptionForm(request.POST)